@@ -5,11 +5,12 @@
 
 '''
 
-from flask import Flask, request, render_template
-import numpy as np 
-import pandas as pd
+from flask import Flask, request, render_template, jsonify, g
+import json
 import os
 import sys
+import time
+from src.logger import logging, log_event
 
 # Ensure we're in the right directory for deployment
 if not os.path.exists('artifacts') and __name__ == "__main__":
@@ -17,17 +18,53 @@ if not os.path.exists('artifacts') and __name__ == "__main__":
     current_dir = os.path.dirname(os.path.abspath(__file__))
     if os.path.exists(os.path.join(current_dir, 'artifacts')):
         os.chdir(current_dir)
-        print(f"Changed working directory to: {current_dir}")
+        logging.info(f"Changed working directory to: {current_dir}")
     else:
-        print(f"Warning: artifacts directory not found. Current dir: {os.getcwd()}")
+        logging.warning(f"Artifacts directory not found. Current dir: {os.getcwd()}")
 
-from sklearn.preprocessing import StandardScaler
 from src.pipeline.predict_pipeline import CustomData, PredictPipeline
+from src.pipeline.model_registry import model_registry
+from src.pipeline.batcher import MicroBatcher
+from src.pipeline.prediction_cache import prediction_cache
+from src.pipeline.ensemble import shadow_scorer
+from src.pipeline.input_schema import validation_stats
+from src.pipeline.drift import drift_monitor
+from src.metrics import metrics, http_requests_total, http_request_duration_seconds
 
 application= Flask(__name__)
 
 app = application
 
+# groups concurrent /predictdata requests into one model call (COALESCE_PREDICTIONS=1)
+micro_batcher = MicroBatcher(PredictPipeline().predict_rows)
+
+
+def _prefixed(prefix, stats):
+    return {f"{prefix}_{name}": value for name, value in stats.items()}
+
+# existing stats() counters, exported as gauges on /metrics
+metrics.register_collector(lambda: _prefixed("model_registry", model_registry.stats()))
+metrics.register_collector(lambda: _prefixed("prediction_cache", prediction_cache.stats()))
+metrics.register_collector(lambda: _prefixed("micro_batcher", micro_batcher.stats()))
+metrics.register_collector(lambda: _prefixed("shadow", shadow_scorer.stats()))
+metrics.register_collector(lambda: _prefixed("input_validation", validation_stats.stats()))
+metrics.register_collector(lambda: _prefixed("drift", drift_monitor.stats()))
+
+
+@app.before_request
+def start_timer():
+    if metrics.enabled:
+        g.request_start = time.perf_counter()
+
+@app.after_request
+def record_request(response):
+    if metrics.enabled and "request_start" in g:
+        seconds = time.perf_counter() - g.request_start
+        endpoint = request.url_rule.rule if request.url_rule is not None else "unknown"
+        http_requests_total.inc(endpoint, request.method, response.status_code)
+        http_request_duration_seconds.observe(seconds, endpoint)
+    return response
+
 # route for the home page
 
 @app.route('/')
@@ -47,7 +84,8 @@ def debug():
             'model_in_cwd': os.path.exists('artifacts/model.pkl'),
             'preprocessor_in_cwd': os.path.exists('artifacts/preprocessor.pkl'),
             'files_in_cwd': os.listdir('.') if os.path.exists('.') else 'Not accessible',
-            'sys_path': sys.path[0] if sys.path else 'No sys.path'
+            'sys_path': sys.path[0] if sys.path else 'No sys.path',
+            'model_registry': model_registry.stats()
         }
         
         if os.path.exists('artifacts'):
@@ -76,18 +114,101 @@ def predict_datapoint():
                 reading_score=request.form.get('reading_score'),
                 writing_score=request.form.get('writing_score')
             )
-            pred_df = data.get_data_as_data_frame()
-            print("Input data:")
-            print(pred_df)
+            row = data.get_data_as_dict()
+            log_event("prediction_request", logging.DEBUG, record=row)
 
-            predict_pipeline = PredictPipeline()
-            results = predict_pipeline.predict(pred_df)
-            print(f"Prediction results: {results}")
+            if micro_batcher.config.enabled:
+                results = [micro_batcher.predict(row)]
+            else:
+                predict_pipeline = PredictPipeline()
+                results = [predict_pipeline.predict_record(row)]
+            log_event("prediction_result", logging.DEBUG, prediction=results[0])
             return render_template('home.html', results=results[0])
+        except ValueError as e:
+            # rejected by the input schema, before anything was encoded or scored
+            log_event("prediction_rejected", logging.DEBUG, error=str(e))
+            return render_template('home.html', results=f"Error: {str(e)}"), 400
         except Exception as e:
-            print(f"Error in prediction: {str(e)}")
+            logging.exception(f"Error in prediction: {str(e)}")
             return render_template('home.html', results=f"Error: {str(e)}")
-    
+
+@app.route('/metrics')
+def metrics_endpoint():
+    return metrics.render(), 200, {'Content-Type': 'text/plain; version=0.0.4; charset=utf-8'}
+
+@app.route('/stats')
+def stats():
+    return jsonify({
+        'model_registry': model_registry.stats(),
+        'micro_batcher': micro_batcher.stats(),
+        'prediction_cache': prediction_cache.stats(),
+        'shadow': shadow_scorer.stats(),
+        'input_validation': validation_stats.stats(),
+        'drift': drift_monitor.stats(),
+    })
+
+@app.route('/drift')
+def drift():
+    """Served feature statistics against the training baseline; ?refresh=1 recomputes now."""
+    return jsonify(drift_monitor.check(force=request.args.get('refresh') == '1'))
+
+@app.route('/drift/reset', methods=['POST'])
+def drift_reset():
+    drift_monitor.reset()
+    return jsonify(drift_monitor.check(force=True))
+
+
+def parse_batch_body(body):
+    """
+    Parses a JSON array or NDJSON request body into a list of records.
+    NDJSON lines that are not valid JSON become None, and their parse
+    error is returned by line index so it can be reported per record.
+    """
+    text = body.decode('utf-8').strip()
+    if text.startswith('['):
+        records = json.loads(text)
+        return records, {}
+
+    records, parse_errors = [], {}
+    for line in text.splitlines():
+        if not line.strip():
+            continue
+        try:
+            records.append(json.loads(line))
+        except ValueError as e:
+            parse_errors[len(records)] = f"invalid JSON: {e}"
+            records.append(None)
+    return records, parse_errors
+
+@app.route('/predict/batch', methods=['POST'])
+def predict_batch():
+    try:
+        records, parse_errors = parse_batch_body(request.get_data())
+    except ValueError as e:
+        return jsonify({'error': f"invalid JSON body: {e}"}), 400
+    if not isinstance(records, list):
+        return jsonify({'error': "body must be a JSON array or NDJSON"}), 400
+
+    chunk_size = request.args.get('chunk_size', type=int)
+    if chunk_size is not None and chunk_size < 1:
+        return jsonify({'error': "chunk_size must be a positive integer"}), 400
+    try:
+        results = PredictPipeline().predict_batch(records, chunk_size=chunk_size)
+    except Exception as e:
+        logging.exception(f"Error in batch prediction: {str(e)}")
+        return jsonify({'error': str(e)}), 500
+
+    for i, message in parse_errors.items():
+        results[i] = {'error': message}
+    n_errors = sum(1 for result in results if 'error' in result)
+    log_event("batch_prediction", n_records=len(results), n_errors=n_errors)
+
+    return jsonify({
+        'results': results,
+        'n_records': len(results),
+        'n_errors': n_errors,
+    })
+
 
 if __name__=="__main__":
     app.run(host = "0.0.0.0")
\ No newline at end of file
@@ -0,0 +1,174 @@
+#  ASGI entry point for the Flask app
+'''
+    running command : uvicorn asgi:app --host 0.0.0.0 --port 8000 --workers 2
+
+    Every request is run by the Flask app on a bounded thread pool, so the
+    event loop keeps accepting connections while predictions run. Once
+    ASGI_THREADS requests are running and ASGI_MAX_QUEUE more are waiting,
+    further requests are rejected with 503 instead of queueing without bound.
+'''
+
+import asyncio
+import io
+import os
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from src.logger import logging
+from app import app as flask_app
+
+
+@dataclass
+class AsgiConfig:
+    # requests executed concurrently by the Flask app per worker process
+    max_threads: int = int(os.environ.get("ASGI_THREADS", 4))
+    # requests allowed to wait for a free thread before answering 503
+    max_queue: int = int(os.environ.get("ASGI_MAX_QUEUE", 32))
+    # seconds sent in the Retry-After header of a 503
+    retry_after: int = int(os.environ.get("ASGI_RETRY_AFTER", 1))
+
+
+class WsgiBridge:
+    """
+    Minimal WSGI-in-ASGI adapter with admission control.
+
+    The request body is read on the event loop, the WSGI app runs (and its
+    response is fully collected) on the thread pool, then the response is
+    sent back on the loop. Requests beyond max_threads + max_queue in flight
+    get an immediate 503 with Retry-After.
+    """
+    def __init__(self, wsgi_app, config=None):
+        self.wsgi_app = wsgi_app
+        self.config = config or AsgiConfig()
+        self.executor = ThreadPoolExecutor(max_workers=self.config.max_threads, thread_name_prefix="wsgi")
+        self._in_flight = 0
+        self._lock = threading.Lock()
+        self._stats = {"requests": 0, "rejected": 0, "max_in_flight": 0}
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "lifespan":
+            await self.lifespan(receive, send)
+        elif scope["type"] == "http":
+            await self.http(scope, receive, send)
+        else:
+            raise NotImplementedError(f"unsupported ASGI scope type {scope['type']}")
+
+    async def lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                self.executor.shutdown(wait=True)
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+    def _admit(self):
+        with self._lock:
+            self._stats["requests"] += 1
+            if self._in_flight >= self.config.max_threads + self.config.max_queue:
+                self._stats["rejected"] += 1
+                return False
+            self._in_flight += 1
+            self._stats["max_in_flight"] = max(self._stats["max_in_flight"], self._in_flight)
+            return True
+
+    def _release(self):
+        with self._lock:
+            self._in_flight -= 1
+
+    async def http(self, scope, receive, send):
+        if not self._admit():
+            await send({
+                "type": "http.response.start",
+                "status": 503,
+                "headers": [(b"content-type", b"application/json"),
+                            (b"retry-after", str(self.config.retry_after).encode())],
+            })
+            await send({"type": "http.response.body", "body": b'{"error": "server busy, retry later"}'})
+            return
+
+        try:
+            body = bytearray()
+            while True:
+                message = await receive()
+                if message["type"] == "http.disconnect":
+                    return
+                body.extend(message.get("body", b""))
+                if not message.get("more_body", False):
+                    break
+
+            environ = self.build_environ(scope, bytes(body))
+            loop = asyncio.get_running_loop()
+            status, headers, content = await loop.run_in_executor(self.executor, self.run_wsgi, environ)
+        finally:
+            self._release()
+
+        await send({"type": "http.response.start", "status": status, "headers": headers})
+        await send({"type": "http.response.body", "body": content})
+
+    def build_environ(self, scope, body):
+        server = scope.get("server") or ("localhost", 80)
+        client = scope.get("client") or ("", 0)
+        environ = {
+            "REQUEST_METHOD": scope["method"],
+            "SCRIPT_NAME": scope.get("root_path", "").encode("utf-8").decode("latin-1"),
+            "PATH_INFO": scope["path"].encode("utf-8").decode("latin-1"),
+            "QUERY_STRING": scope["query_string"].decode("latin-1"),
+            "SERVER_NAME": server[0],
+            "SERVER_PORT": str(server[1]),
+            "SERVER_PROTOCOL": f"HTTP/{scope['http_version']}",
+            "REMOTE_ADDR": client[0],
+            "CONTENT_LENGTH": str(len(body)),
+            "wsgi.version": (1, 0),
+            "wsgi.url_scheme": scope.get("scheme", "http"),
+            "wsgi.input": io.BytesIO(body),
+            "wsgi.errors": sys.stderr,
+            "wsgi.multithread": True,
+            "wsgi.multiprocess": True,
+            "wsgi.run_once": False,
+        }
+        for name, value in scope["headers"]:
+            name = name.decode("latin-1").upper().replace("-", "_")
+            value = value.decode("latin-1")
+            if name == "CONTENT_TYPE":
+                environ["CONTENT_TYPE"] = value
+            elif name != "CONTENT_LENGTH":
+                key = f"HTTP_{name}"
+                environ[key] = f"{environ[key]},{value}" if key in environ else value
+        return environ
+
+    def run_wsgi(self, environ):
+        response = {}
+
+        def start_response(status, headers, exc_info=None):
+            response["status"] = int(status.split(" ", 1)[0])
+            response["headers"] = [(name.lower().encode("latin-1"), value.encode("latin-1")) for name, value in headers]
+
+        try:
+            result = self.wsgi_app(environ, start_response)
+            try:
+                content = b"".join(result)
+            finally:
+                if hasattr(result, "close"):
+                    result.close()
+        except Exception as e:
+            logging.exception(f"Unhandled error in WSGI app: {e}")
+            return 500, [(b"content-type", b"text/plain")], b"Internal Server Error"
+        return response["status"], response["headers"], content
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            stats["in_flight"] = self._in_flight
+        stats.update(max_threads=self.config.max_threads, max_queue=self.config.max_queue)
+        return stats
+
+
+app = WsgiBridge(flask_app)
+
+
+@flask_app.route('/asgi/stats')
+def asgi_stats():
+    return app.stats()
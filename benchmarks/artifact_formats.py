@@ -0,0 +1,59 @@
+'''
+    Compares the stage-to-stage handoff (DataIngestion writes a split,
+    DataTransformation reads it back) for CSV, Feather and Parquet:
+    write time, read time and size on disk.
+
+    running command : python benchmarks/artifact_formats.py [--scale 100]
+'''
+
+import argparse
+import os
+import tempfile
+import time
+import numpy as np
+import pandas as pd
+from src.components.data_ingestion import DataIngestionConfig, INGESTION_DTYPES
+from src.utils import save_frame, load_frame
+
+
+def synthetic_frame(scale):
+    """stud.csv repeated `scale` times, with a little noise on the scores."""
+    df = pd.read_csv(DataIngestionConfig().source_data_path, dtype=INGESTION_DTYPES)
+    df = pd.concat([df] * scale, ignore_index=True)
+    rng = np.random.RandomState(42)
+    for column in ("math_score", "reading_score", "writing_score"):
+        df[column] = (df[column].astype("int16") + rng.randint(-3, 4, len(df))).clip(0, 100).astype("Int16")
+    return df
+
+
+def best_of(fn, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--scale", type=int, default=100, help="multiple of stud.csv rows")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    df = synthetic_frame(args.scale)
+    print(f"{len(df)} rows")
+    print(f"{'file':<14}{'write (ms)':>10}{'read (ms)':>12}{'size (KB)':>12}  dtypes kept")
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for file_name in ("train_csv", "train.feather", "train.parquet"):
+            file_path = os.path.join(tmp_dir, file_name)
+            write_s = best_of(lambda: save_frame(df, file_path), args.repeat)
+            read_s = best_of(lambda: load_frame(file_path), args.repeat)
+            dtypes_kept = (load_frame(file_path).dtypes == df.dtypes).all()
+            size_kb = os.path.getsize(file_path) / 1024
+            print(f"{file_name:<14}{write_s * 1000:>10.1f}{read_s * 1000:>12.1f}{size_kb:>12.0f}  {dtypes_kept}")
+
+
+if __name__ == "__main__":
+    main()
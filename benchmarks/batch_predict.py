@@ -0,0 +1,73 @@
+'''
+    Throughput of the offline bulk scorer (src/pipeline/batch_predict.py) as
+    the number of worker processes grows. A synthetic input is built by
+    resampling notebook/data/stud.csv to --rows rows (with a few invalid
+    rows mixed in) and scored once per worker count. Reports rows/second,
+    speedup over one worker and the peak RSS of the parent and of the
+    largest worker, which should stay flat as the input grows because only
+    a bounded number of chunks is in flight.
+
+    running command : python benchmarks/batch_predict.py [--rows 500000] [--workers 1,2,4] [--format parquet]
+'''
+
+import argparse
+import os
+import resource
+import sys
+import tempfile
+import numpy as np
+import pandas as pd
+from src.components.data_ingestion import DataIngestionConfig
+from src.pipeline.batch_predict import BatchPredictor, BatchPredictConfig
+from src.utils import FrameWriter
+
+
+def synthetic_input(rows, file_path, seed=42, chunk_rows=100_000):
+    # written in chunks, so building the input does not raise this process's peak RSS
+    source = pd.read_csv(DataIngestionConfig().source_data_path).drop(columns=["math_score"])
+    source["reading_score"] = source["reading_score"].astype(str)
+    rng = np.random.RandomState(seed)
+    with FrameWriter(file_path) as writer:
+        for start in range(0, rows, chunk_rows):
+            n = min(chunk_rows, rows - start)
+            df = source.iloc[rng.randint(0, len(source), n)].reset_index(drop=True)
+            # about 0.1% of rows fail validation, so the error path is exercised
+            df.loc[rng.rand(n) < 0.001, "reading_score"] = "n/a"
+            writer.append(df)
+
+
+def peak_rss_mb(who):
+    # ru_maxrss is in kilobytes on Linux (bytes on macOS); for children it is the largest one
+    peak = resource.getrusage(who).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=500_000)
+    parser.add_argument("--workers", default=None, help="comma-separated worker counts (default: 1, 2, 4 ... cores)")
+    parser.add_argument("--chunk-rows", type=int, default=BatchPredictConfig.chunk_rows)
+    parser.add_argument("--format", choices=("csv", "parquet", "feather"), default="parquet")
+    args = parser.parse_args()
+
+    cores = os.cpu_count() or 1
+    if args.workers:
+        worker_counts = [int(count) for count in args.workers.split(",")]
+    else:
+        worker_counts = sorted({min(2 ** i, cores) for i in range(cores.bit_length() + 1)})
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        input_path = os.path.join(tmp_dir, f"input.{args.format}")
+        synthetic_input(args.rows, input_path)
+        print(f"{args.rows} rows, {args.format}, chunks of {args.chunk_rows}, {cores} cores\n")
+        print(f"{'workers':>8}{'seconds':>10}{'rows/s':>12}{'speedup':>9}{'errors':>8}"
+              f"{'parent MB':>11}{'worker MB':>11}")
+
+        predictor = BatchPredictor(BatchPredictConfig(chunk_rows=args.chunk_rows))
+        baseline = None
+        for workers in worker_counts:
+            report = predictor.run(input_path, os.path.join(tmp_dir, f"output.{args.format}"), workers=workers)
+            baseline = baseline or report["rows_per_second"]
+            print(f"{workers:>8}{report['seconds']:>10.2f}{report['rows_per_second']:>12.0f}"
+                  f"{report['rows_per_second'] / baseline:>8.2f}x{report['errors']:>8}"
+                  f"{peak_rss_mb(resource.RUSAGE_SELF):>11.0f}{peak_rss_mb(resource.RUSAGE_CHILDREN):>11.0f}")
@@ -0,0 +1,77 @@
+'''
+    Request-path cost of the drift monitor (src/pipeline/drift.py): the
+    per-record cost of DriftMonitor.observe for single records and batches,
+    POST /predictdata with the monitor switched on and off at runtime (in
+    shuffled rounds, median reported), and the time of one comparison
+    against the baseline. Needs artifacts/drift_baseline.json, written by
+    `python -m src.pipeline.train_pipeline`. Prediction cache, lookup table
+    and micro-batching are off, so every request reaches the model.
+
+    running command : python benchmarks/drift.py [--requests 100] [--rounds 40]
+'''
+
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import time
+
+os.environ.update(PREDICTION_CACHE="0", LOOKUP_TABLE="0", COALESCE_PREDICTIONS="0")
+
+import pandas as pd
+from app import app
+from src.components.data_ingestion import DataIngestionConfig
+from src.pipeline.drift import DriftConfig, DriftMonitor, drift_monitor
+from src.pipeline.predict_pipeline import FEATURE_COLUMNS, normalize_record
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=100)
+    parser.add_argument("--rounds", type=int, default=40)
+    args = parser.parse_args()
+
+    if drift_monitor.check(force=True)["baseline_records"] is None:
+        sys.exit("artifacts/drift_baseline.json not found: run python -m src.pipeline.train_pipeline")
+
+    df = pd.read_csv(DataIngestionConfig().source_data_path)
+    rows = [normalize_record(record) for record in df[FEATURE_COLUMNS].to_dict("records")]
+    predictions = df["math_score"].astype(float).tolist()
+
+    monitor = DriftMonitor(DriftConfig(enabled=True))
+    print(f"{'observe()':<28}{'µs/record':>10}")
+    for batch_size in (1, 64):
+        batches = [(rows[i:i + batch_size], predictions[i:i + batch_size])
+                   for i in range(0, len(rows) - batch_size + 1, batch_size)]
+        n, start = 0, time.perf_counter()
+        while n < 50_000:
+            for batch_rows, batch_predictions in batches:
+                monitor.observe(batch_rows, batch_predictions)
+                n += len(batch_rows)
+        print(f"{f'batch size {batch_size}':<28}{(time.perf_counter() - start) / n * 1e6:>10.2f}")
+
+    start = time.perf_counter()
+    for _ in range(20):
+        report = monitor.check(force=True)
+    print(f"\ncomparison against the baseline: {(time.perf_counter() - start) / 20 * 1e3:.2f} ms "
+          f"(reused for DRIFT_CHECK_INTERVAL={monitor.config.check_interval:g}s)")
+    print(f"served stats size: {len(json.dumps(monitor._current.to_dict()))} bytes after {report['records']} records")
+
+    client = app.test_client()
+    form = {"gender": "female", "race_ethnicity": "group B", "parental_level_of_education": "bachelor's degree",
+            "lunch": "standard", "test_preparation_course": "none", "reading_score": "72", "writing_score": "74"}
+    for _ in range(200):
+        client.post("/predictdata", data=form)
+    timings = {True: [], False: []}
+    for _ in range(args.rounds):
+        for enabled in random.sample([True, False], 2):
+            drift_monitor.config.enabled = enabled
+            start = time.perf_counter()
+            for _ in range(args.requests):
+                client.post("/predictdata", data=form)
+            timings[enabled].append((time.perf_counter() - start) / args.requests * 1e6)
+    off, on = statistics.median(timings[False]), statistics.median(timings[True])
+    print(f"\nPOST /predictdata: {off:.1f} µs/request with DRIFT_MONITOR=0, {on:.1f} µs with it on "
+          f"({on - off:+.1f} µs, {(on / off - 1) * 100:+.1f}%)")
@@ -0,0 +1,159 @@
+'''
+    Added latency and CPU of each serving mode (SERVING_MODE, see
+    src/pipeline/ensemble.py) against the single primary model, for single
+    records and batches. Needs top models saved by training with TRAIN_TOP_K,
+    e.g. `TRAIN_TOP_K=3 python -m src.pipeline.train_pipeline --force`.
+
+    Latency is what the caller waits for. CPU is process CPU time per
+    request, including the shadow thread, measured after the shadow queue
+    has drained. "ensemble, unshared" re-runs the preprocessor for every
+    model, to show what the shared transform saves. Prediction cache and
+    lookup table are off so every request reaches the models.
+
+    Shadow batches that find the queue full are dropped, not waited for
+    (and SHADOW_SAMPLE_RATE skips a share on purpose); the coverage line
+    shows how many were scored.
+
+    A second table compares single and shadow mode with the prediction
+    cache and lookup table on (as served by default), where the shadow
+    thread transforms the rows itself. Finally it checks that shadow mode
+    with both on submits every request to the challengers (exit status 1
+    otherwise).
+
+    running command : python benchmarks/ensemble.py [--requests 2000] [--batch-size 64]
+'''
+
+import argparse
+import statistics
+import sys
+import time
+import numpy as np
+import pandas as pd
+from src.components.data_ingestion import DataIngestionConfig
+from src.pipeline.ensemble import load_manifest, ensemble_members, shadow_scorer
+from src.pipeline.model_registry import model_registry
+from src.pipeline.predict_pipeline import (
+    FEATURE_COLUMNS, PredictPipeline, PredictPipelineConfig, get_compiled_preprocessor, normalize_record,
+)
+from src.pipeline.prediction_cache import PredictionCache, PredictionCacheConfig
+
+
+def unshared_ensemble(pipeline):
+    """Ensemble scoring as separate pipelines: one transform per model."""
+    members = ensemble_members(pipeline.config.tree_engine)
+
+    def predict(rows):
+        plan = get_compiled_preprocessor(model_registry.get_preprocessor())
+        predictions = []
+        for _, model, engine in members:
+            X = plan.transform_records(rows)
+            if engine is not None and X.shape[0] <= pipeline.config.tree_engine_max_rows:
+                predictions.append(engine.predict(X))
+            else:
+                predictions.append(model.predict(X))
+        return np.mean(predictions, axis=0)
+    return predict
+
+
+def measure(predict, batches, drain=None):
+    for batch in batches[:50]:
+        predict(batch)
+    if drain:
+        drain()
+    latencies = []
+    cpu_start = time.process_time()
+    for batch in batches:
+        start = time.perf_counter()
+        predict(batch)
+        latencies.append(time.perf_counter() - start)
+    if drain:
+        drain()
+    cpu = time.process_time() - cpu_start
+    latencies.sort()
+    return {
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p99_ms": latencies[int(len(latencies) * 0.99) - 1] * 1000,
+        "cpu_ms": cpu / len(batches) * 1000,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--batch-size", type=int, default=64)
+    args = parser.parse_args()
+
+    entries = load_manifest()
+    if len(entries) < 2:
+        sys.exit("artifacts/models/manifest.json lists fewer than 2 models: "
+                 "train with TRAIN_TOP_K=3 python -m src.pipeline.train_pipeline --force")
+    print("models: " + ", ".join(f"{entry['rank']}. {entry['name']}" for entry in entries) + "\n")
+
+    df = pd.read_csv(DataIngestionConfig().source_data_path)
+    records = [normalize_record(record) for record in df[FEATURE_COLUMNS].to_dict("records")]
+    no_cache = PredictionCache(PredictionCacheConfig(enabled=False))
+
+    def pipeline(mode):
+        return PredictPipeline(PredictPipelineConfig(serving_mode=mode, lookup_table=False), cache=no_cache)
+
+    modes = [
+        ("single", pipeline("single").predict_rows, None),
+        (f"ensemble ({len(entries)} models)", pipeline("ensemble").predict_rows, None),
+        ("ensemble, unshared", unshared_ensemble(pipeline("ensemble")), None),
+        (f"shadow ({len(entries) - 1} challengers)", pipeline("shadow").predict_rows, shadow_scorer.join),
+    ]
+
+    for batch_size in (1, args.batch_size):
+        rng = np.random.RandomState(0)
+        batches = [[records[i] for i in rng.randint(0, len(records), batch_size)] for _ in range(args.requests)]
+        print(f"batch size {batch_size}")
+        print(f"{'mode':<28}{'p50 ms':>9}{'p99 ms':>9}{'CPU ms/req':>12}{'+p50':>9}{'+CPU':>9}")
+        baseline = None
+        for name, predict, drain in modes:
+            before = shadow_scorer.stats()
+            result = measure(predict, batches, drain)
+            after = shadow_scorer.stats()
+            baseline = baseline or result
+            print(f"{name:<28}{result['p50_ms']:>9.3f}{result['p99_ms']:>9.3f}{result['cpu_ms']:>12.3f}"
+                  f"{result['p50_ms'] - baseline['p50_ms']:>+9.3f}{result['cpu_ms'] - baseline['cpu_ms']:>+9.3f}")
+            if drain:
+                scored = after["batches"] - before["batches"]
+                dropped = after["dropped"] - before["dropped"]
+                shadow_coverage = f"{scored} of {len(batches) + 50} requests shadow-scored, {dropped} dropped"
+        print(f"({shadow_coverage})\n")
+    print(f"shadow: {shadow_scorer.stats()}\n")
+
+    def cached_pipeline(mode):
+        return PredictPipeline(PredictPipelineConfig(serving_mode=mode, lookup_table=True),
+                               cache=PredictionCache(PredictionCacheConfig(enabled=True)))
+
+    cached_modes = [
+        ("single", cached_pipeline("single").predict_rows, None),
+        (f"shadow ({len(entries) - 1} challengers)", cached_pipeline("shadow").predict_rows, shadow_scorer.join),
+    ]
+    for batch_size in (1, args.batch_size):
+        rng = np.random.RandomState(0)
+        batches = [[records[i] for i in rng.randint(0, len(records), batch_size)] for _ in range(args.requests)]
+        print(f"batch size {batch_size}, prediction cache and lookup table on")
+        print(f"{'mode':<28}{'p50 ms':>9}{'p99 ms':>9}{'CPU ms/req':>12}{'+p50':>9}{'+CPU':>9}")
+        baseline = None
+        for name, predict, drain in cached_modes:
+            result = measure(predict, batches, drain)
+            baseline = baseline or result
+            print(f"{name:<28}{result['p50_ms']:>9.3f}{result['p99_ms']:>9.3f}{result['cpu_ms']:>12.3f}"
+                  f"{result['p50_ms'] - baseline['p50_ms']:>+9.3f}{result['cpu_ms'] - baseline['cpu_ms']:>+9.3f}")
+        print()
+
+    # shadow mode with the default cache and lookup table: repeated records must still be shadowed
+    shadow_scorer.config.shadow_sample_rate = 1.0
+    shadow = cached_pipeline("shadow")
+    n_checks = 200
+    before = shadow_scorer.stats()["submitted"]
+    for i in range(n_checks):
+        shadow.predict_rows([records[i % 10]])
+        # one request at a time, so a full queue cannot drop any
+        shadow_scorer.join()
+    submitted = shadow_scorer.stats()["submitted"] - before
+    print(f"shadow with cache and lookup table on: {submitted} of {n_checks} requests submitted")
+    if submitted != n_checks:
+        sys.exit(1)
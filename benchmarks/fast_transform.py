@@ -0,0 +1,69 @@
+'''
+    Compares single-record encoding latency of the current pandas path
+    (CustomData -> DataFrame -> preprocessor.transform) against the
+    compiled, pandas-free CompiledPreprocessor, and checks both produce
+    bit-identical rows for every record in the ingested test split.
+
+    running command : python benchmarks/fast_transform.py [--repeat 2000]
+'''
+
+import argparse
+import time
+import numpy as np
+import pandas as pd
+from src.components.data_ingestion import DataIngestionConfig
+from src.pipeline.model_registry import model_registry
+from src.pipeline.fast_transform import CompiledPreprocessor
+from src.pipeline.predict_pipeline import FEATURE_COLUMNS, normalize_record
+from src.utils import load_frame
+
+
+def time_per_call(fn, records, repeat):
+    start = time.perf_counter()
+    for i in range(repeat):
+        fn(records[i % len(records)])
+    return (time.perf_counter() - start) / repeat * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=2000)
+    args = parser.parse_args()
+
+    preprocessor = model_registry.get_preprocessor()
+    model = model_registry.get_model()
+    plan = CompiledPreprocessor.from_preprocessor(preprocessor)
+
+    test_df = load_frame(DataIngestionConfig().test_data_path)
+    records = [normalize_record(r) for r in test_df[FEATURE_COLUMNS].to_dict("records")]
+
+    print(f"bit-for-bit match on {len(records)} test records: {plan.verify(preprocessor, records)}")
+
+    def pandas_transform(record):
+        return preprocessor.transform(pd.DataFrame({k: [v] for k, v in record.items()}))
+
+    row = np.zeros(plan.n_features_out)
+
+    def compiled_transform(record):
+        row[:] = 0.0
+        return plan.encode(record, row)
+
+    def pandas_predict(record):
+        return model.predict(pandas_transform(record))
+
+    def compiled_predict(record):
+        return model.predict(compiled_transform(record).reshape(1, -1))
+
+    results = {
+        "transform (pandas)": time_per_call(pandas_transform, records, args.repeat),
+        "transform (compiled)": time_per_call(compiled_transform, records, args.repeat),
+        "transform+predict (pandas)": time_per_call(pandas_predict, records, args.repeat),
+        "transform+predict (compiled)": time_per_call(compiled_predict, records, args.repeat),
+    }
+    for name, us in results.items():
+        print(f"{name:<30} {us:10.1f} us/record")
+    print(f"transform speedup: {results['transform (pandas)'] / results['transform (compiled)']:.0f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+'''
+    Import-time regression check for the serving entry point. Runs
+    `python -X importtime -c "import app"` in fresh interpreters and fails
+    (exit status 1) when the median import time exceeds the budget or when a
+    training-only package is imported. Training code imports those lazily,
+    and serving only pays for sklearn when it unpickles the artifacts. Prints
+    the import time per top-level package, so a new heavy dependency is easy
+    to spot.
+
+    running command : python benchmarks/import_time.py [--max-ms 1500] [--runs 5] [--module app]
+'''
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+from collections import defaultdict
+
+# must not be imported by `import app`; they are loaded on first use
+TRAINING_ONLY_PACKAGES = ("sklearn", "scipy", "xgboost", "joblib", "seaborn", "matplotlib")
+
+
+def import_profile(module):
+    """(total ms, {top-level package: self ms}) for one fresh `import module`."""
+    env = dict(os.environ, PYTHONPATH=os.getcwd())
+    stderr = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                            env=env, capture_output=True, text=True, check=True).stderr
+    total_us, self_by_package = None, defaultdict(float)
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        name = name.strip()
+        self_by_package[name.split(".")[0]] += int(self_us) / 1000
+        if name == module:
+            total_us = int(cumulative_us)
+    return total_us / 1000, dict(self_by_package)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--module", default="app")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--max-ms", type=float, default=1500.0)
+    parser.add_argument("--top", type=int, default=10)
+    args = parser.parse_args()
+
+    profiles = sorted((import_profile(args.module) for _ in range(args.runs)), key=lambda profile: profile[0])
+    totals = [total for total, _ in profiles]
+    median_total = statistics.median(totals)
+    packages = profiles[len(profiles) // 2][1]
+
+    print(f"import {args.module}: median {median_total:.0f} ms over {args.runs} runs "
+          f"(min {min(totals):.0f}, max {max(totals):.0f}), budget {args.max_ms:.0f} ms\n")
+    print(f"{'package':<24}{'self ms':>10}")
+    for package, ms in sorted(packages.items(), key=lambda item: -item[1])[:args.top]:
+        print(f"{package:<24}{ms:>10.1f}")
+
+    failures = []
+    if median_total > args.max_ms:
+        failures.append(f"median import time {median_total:.0f} ms is over the {args.max_ms:.0f} ms budget")
+    leaked = sorted(set(TRAINING_ONLY_PACKAGES) & set(packages))
+    if leaked:
+        failures.append(f"training-only packages imported: {', '.join(leaked)}")
+
+    if failures:
+        print("\nFAIL: " + "; ".join(failures))
+        sys.exit(1)
+    print("\nOK")
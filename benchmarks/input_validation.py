@@ -0,0 +1,87 @@
+'''
+    Cost of validating a request against the input schema
+    (src/pipeline/input_schema.py), for valid records and for each kind of
+    rejection, next to the pandas path a record used to reach before
+    anything could be rejected (DataFrame + preprocessor.transform).
+
+    Also scores notebook/data/stud.csv with the old lowercased categoricals
+    ("group a", which the one-hot encoder ignores) and with the fitted
+    spellings the schema returns, to show what the case fix changes.
+
+    running command : python benchmarks/input_validation.py [--repeat 20000]
+'''
+
+import argparse
+import time
+import numpy as np
+import pandas as pd
+from src.components.data_ingestion import DataIngestionConfig
+from src.pipeline.input_schema import InputSchema, InputSchemaConfig
+from src.pipeline.model_registry import model_registry
+from src.pipeline.predict_pipeline import FEATURE_COLUMNS, CATEGORICAL_FEATURES, get_compiled_preprocessor
+
+
+def per_call_us(fn, record, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        try:
+            fn(record)
+        except ValueError:
+            pass
+    return (time.perf_counter() - start) / repeat * 1e6
+
+
+def r2(y, predictions):
+    return 1 - np.sum((y - predictions) ** 2) / np.sum((y - y.mean()) ** 2)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=20000)
+    args = parser.parse_args()
+
+    preprocessor = model_registry.get_preprocessor()
+    model = model_registry.get_model()
+    schema = InputSchema.from_preprocessor(preprocessor, InputSchemaConfig(mode="strict"))
+
+    valid = {
+        "gender": "female", "race_ethnicity": "group B", "parental_level_of_education": "bachelor's degree",
+        "lunch": "standard", "test_preparation_course": "none", "reading_score": "72", "writing_score": "74",
+    }
+    cases = [
+        ("valid", valid),
+        ("valid, other case", {**valid, "race_ethnicity": "GROUP b"}),
+        ("missing field", {**valid, "lunch": ""}),
+        ("unknown category", {**valid, "gender": "unknown"}),
+        ("score not a number", {**valid, "writing_score": "n/a"}),
+        ("score out of range", {**valid, "writing_score": "140"}),
+    ]
+
+    def pandas_path(record):
+        return preprocessor.transform(pd.DataFrame.from_records([record], columns=FEATURE_COLUMNS))
+
+    print(f"{'record':<22}{'schema µs':>11}")
+    for name, record in cases:
+        print(f"{name:<22}{per_call_us(schema.validate, record, args.repeat):>11.2f}")
+    row = schema.validate(valid)
+    print(f"\nfor comparison, one valid record through:")
+    print(f"  DataFrame + preprocessor.transform {per_call_us(pandas_path, row, max(args.repeat // 20, 1)):>10.1f} µs")
+    plan = get_compiled_preprocessor(preprocessor)
+    if plan is not None:
+        print(f"  compiled preprocessor encode       {per_call_us(plan.transform_records, [row], args.repeat):>10.1f} µs")
+
+    df = pd.read_csv(DataIngestionConfig().source_data_path)
+    y = df["math_score"].to_numpy(dtype=np.float64)
+    records = df[FEATURE_COLUMNS].to_dict("records")
+    lowercased = pd.DataFrame.from_records(
+        [{**record, **{column: record[column].lower() for column in CATEGORICAL_FEATURES}} for record in records],
+        columns=FEATURE_COLUMNS)
+    fitted = pd.DataFrame.from_records([schema.validate(record) for record in records], columns=FEATURE_COLUMNS)
+
+    def score(features):
+        X = preprocessor.transform(features)
+        return model.predict(X.toarray() if hasattr(X, "toarray") else X)
+
+    old, new = score(lowercased), score(fitted)
+    print(f"\nstud.csv ({len(df)} rows): lowercased categoricals R² {r2(y, old):.4f}, "
+          f"fitted spellings R² {r2(y, new):.4f}, mean |change| {np.mean(np.abs(new - old)):.2f} points")
@@ -0,0 +1,75 @@
+'''
+    Per-request cost of the logging and metrics instrumentation (src/logger.py,
+    src/metrics.py), timed on POST /predictdata through Flask's test client.
+    The metrics switch and the log level are flipped at runtime inside one
+    interpreter, in rounds that run the variants in shuffled order and whose
+    median is reported, since separate interpreters (and a fixed order)
+    differ by more than the instrumentation costs.
+    LOG_ASYNC is read at import time, so each handler mode gets its own
+    process. Prediction cache, lookup table and micro-batching are off, so
+    every request reaches the model.
+
+    running command : python benchmarks/instrumentation.py [--requests 100] [--rounds 60]
+'''
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+# (name, metrics enabled, log level)
+VARIANTS = [
+    ("off (METRICS=0, WARNING)", False, "WARNING"),
+    ("metrics, WARNING", True, "WARNING"),
+    ("metrics + INFO", True, "INFO"),
+    ("metrics + DEBUG", True, "DEBUG"),
+]
+
+CHILD = '''
+import json, logging, random, statistics, sys, time
+from app import app
+from src.metrics import metrics
+variants, n, rounds = json.loads(sys.argv[1]), int(sys.argv[2]), int(sys.argv[3])
+client = app.test_client()
+form = {"gender": "female", "race_ethnicity": "group B", "parental_level_of_education": "bachelor's degree",
+        "lunch": "standard", "test_preparation_course": "none", "reading_score": "72", "writing_score": "74"}
+for _ in range(200):
+    client.post("/predictdata", data=form)
+timings = {name: [] for name, _, _ in variants}
+for _ in range(rounds):
+    for name, enabled, level in random.sample(variants, len(variants)):
+        metrics.config.enabled = enabled
+        logging.getLogger().setLevel(level)
+        start = time.perf_counter()
+        for _ in range(n):
+            client.post("/predictdata", data=form)
+        timings[name].append((time.perf_counter() - start) / n * 1e6)
+print(json.dumps({name: statistics.median(values) for name, values in timings.items()}))
+'''
+
+
+def run_mode(log_async, n_requests, rounds, log_dir):
+    env = dict(os.environ, PYTHONPATH=os.getcwd(), PREDICTION_CACHE="0", LOOKUP_TABLE="0",
+               COALESCE_PREDICTIONS="0", LOG_ASYNC=log_async, LOG_FILE_PATH=os.path.join(log_dir, "bench.log"))
+    output = subprocess.run([sys.executable, "-c", CHILD, json.dumps(VARIANTS), str(n_requests), str(rounds)],
+                            env=env, capture_output=True, text=True, check=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=100)
+    parser.add_argument("--rounds", type=int, default=60)
+    args = parser.parse_args()
+
+    print(f"{'LOG_ASYNC':<11}{'variant':<28}{'µs/request':>12}{'overhead µs':>13}{'overhead %':>12}")
+    with tempfile.TemporaryDirectory() as log_dir:
+        for log_async in ("1", "0"):
+            timings = run_mode(log_async, args.requests, args.rounds, log_dir)
+            baseline = timings[VARIANTS[0][0]]
+            for name, _, _ in VARIANTS:
+                value = timings[name]
+                print(f"{log_async:<11}{name:<28}{value:>12.1f}{value - baseline:>13.1f}"
+                      f"{(value / baseline - 1) * 100:>11.1f}%")
@@ -0,0 +1,110 @@
+'''
+    Closed-loop HTTP load test: `--concurrency` clients each POST the sample
+    /predictdata form back to back for `--duration` seconds, then throughput,
+    latency percentiles and the number of 503 (backpressure) responses are
+    printed. With `--server` the command is started first (and stopped
+    afterwards), so serving setups can be compared one after another:
+
+    running command : python benchmarks/load_test.py --server "gunicorn app:app -b 127.0.0.1:8000"
+                      python benchmarks/load_test.py --server "gunicorn app:app -b 127.0.0.1:8000 --threads 8"
+                      python benchmarks/load_test.py --server "uvicorn asgi:app --port 8000 --workers 2"
+'''
+
+import argparse
+import http.client
+import shlex
+import subprocess
+import threading
+import time
+import urllib.parse
+import numpy as np
+
+SAMPLE_FORM = {
+    "gender": "female",
+    "race_ethnicity": "group B",
+    "parental_level_of_education": "bachelor's degree",
+    "lunch": "standard",
+    "test_preparation_course": "none",
+}
+
+
+def wait_for_server(host, port, timeout):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            connection = http.client.HTTPConnection(host, port, timeout=1)
+            connection.request("GET", "/stats")
+            connection.getresponse().read()
+            return
+        except OSError:
+            time.sleep(0.2)
+    raise TimeoutError(f"server on {host}:{port} did not come up within {timeout}s")
+
+
+def client(host, port, path, deadline, latencies, statuses, seed):
+    rng = np.random.RandomState(seed)
+    connection = http.client.HTTPConnection(host, port, timeout=30)
+    headers = {"Content-Type": "application/x-www-form-urlencoded"}
+    while time.monotonic() < deadline:
+        form = dict(SAMPLE_FORM, reading_score=rng.randint(0, 101), writing_score=rng.randint(0, 101))
+        body = urllib.parse.urlencode(form)
+        start = time.perf_counter()
+        try:
+            connection.request("POST", path, body=body, headers=headers)
+            response = connection.getresponse()
+            response.read()
+            status = response.status
+        except (OSError, http.client.HTTPException):
+            status = "error"
+            connection.close()
+            connection = http.client.HTTPConnection(host, port, timeout=30)
+        latencies.append(time.perf_counter() - start)
+        statuses.append(status)
+    connection.close()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--url", default="http://127.0.0.1:8000/predictdata")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=15)
+    parser.add_argument("--server", help="command that starts the server under test")
+    args = parser.parse_args()
+
+    url = urllib.parse.urlparse(args.url)
+    host, port = url.hostname, url.port or 80
+
+    server = subprocess.Popen(shlex.split(args.server), stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL) \
+        if args.server else None
+    try:
+        wait_for_server(host, port, timeout=60)
+        # one warm-up request so artifact loading is not counted
+        client(host, port, url.path, time.monotonic() + 0.5, [], [], seed=0)
+
+        latencies, statuses = [], []
+        deadline = time.monotonic() + args.duration
+        threads = [
+            threading.Thread(target=client, args=(host, port, url.path, deadline, latencies, statuses, seed))
+            for seed in range(args.concurrency)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+
+    latencies = np.array(latencies) * 1000
+    ok = sum(1 for status in statuses if status == 200)
+    rejected = sum(1 for status in statuses if status == 503)
+    p50, p95, p99 = np.percentile(latencies, [50, 95, 99])
+    print(f"server: {args.server or args.url}")
+    print(f"concurrency {args.concurrency}, {args.duration:.0f}s: {len(statuses)} requests, "
+          f"{ok / args.duration:.1f} ok/s, {rejected} x 503, {len(statuses) - ok - rejected} other errors")
+    print(f"latency ms: p50 {p50:.1f}  p95 {p95:.1f}  p99 {p99:.1f}  max {latencies.max():.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+'''
+    File size and load time of each artifact serializer (dill .pkl,
+    joblib .joblib with memory-mapped arrays, XGBoost native .ubj/.json)
+    for every candidate model type, plus the preprocessor as a dill pickle
+    vs its flat .npz parameter export.
+
+    "warm" is the best in-process load time; "cold" is measured in a fresh
+    interpreter and includes the imports the loader pulls in, which is what
+    a new worker pays on boot.
+
+    running command : python benchmarks/serialization.py [--repeat 5]
+'''
+
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from sklearn.ensemble import AdaBoostRegressor, GradientBoostingRegressor, RandomForestRegressor
+from sklearn.neighbors import KNeighborsRegressor
+from sklearn.tree import DecisionTreeRegressor
+from xgboost import XGBRegressor
+from src.components.data_ingestion import DataIngestionConfig
+from src.components.data_transformation import DataTransformation
+from src.pipeline.fast_transform import CompiledPreprocessor
+from src.utils import save_object, load_object
+
+
+def best_load_ms(file_path, load, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        load(file_path)
+        timings.append(time.perf_counter() - start)
+    return min(timings) * 1000
+
+
+COLD_LOAD = """
+import time
+start = time.perf_counter()
+from {module} import {name}
+{loader}({path!r})
+print((time.perf_counter() - start) * 1000)
+"""
+
+
+def cold_load_ms(file_path, module, loader):
+    code = COLD_LOAD.format(module=module, name=loader.split(".")[0], loader=loader, path=file_path)
+    output = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True).stdout
+    return float(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    ingestion_config = DataIngestionConfig()
+    X_train, y_train, _, _, _ = DataTransformation().initiate_data_transformation(
+        ingestion_config.train_data_path, ingestion_config.test_data_path
+    )
+    X_train = X_train.toarray() if hasattr(X_train, "toarray") else X_train
+
+    models = {
+        "Random Forest": RandomForestRegressor(n_estimators=128, random_state=42),
+        "Decision Tree": DecisionTreeRegressor(random_state=42),
+        "Gradient Boosting": GradientBoostingRegressor(n_estimators=128, random_state=42),
+        "KNN Regressor": KNeighborsRegressor(),
+        "XGBRegressor": XGBRegressor(n_estimators=128),
+        "AdaBoost Regressor": AdaBoostRegressor(n_estimators=128, random_state=42),
+    }
+
+    print(f"{'artifact':<22}{'format':<10}{'size (KB)':>10}{'warm (ms)':>11}{'cold (ms)':>11}")
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for name, model in models.items():
+            model.fit(X_train, y_train)
+            extensions = [".pkl", ".joblib"] + ([".ubj", ".json"] if isinstance(model, XGBRegressor) else [])
+            for extension in extensions:
+                file_path = os.path.join(tmp_dir, f"model{extension}")
+                save_object(file_path, model)
+                load_ms = best_load_ms(file_path, load_object, args.repeat)
+                cold_ms = cold_load_ms(file_path, "src.utils", "load_object")
+                print(f"{name:<22}{extension:<10}{os.path.getsize(file_path) / 1024:>10.1f}{load_ms:>11.2f}{cold_ms:>11.1f}")
+
+        preprocessor_path = DataTransformation().data_transformation_config.preprocessor_obj_file_path
+        params_path = os.path.join(tmp_dir, "preprocessor_params.npz")
+        CompiledPreprocessor.from_preprocessor(load_object(preprocessor_path)).save(params_path)
+        loaders = (
+            (preprocessor_path, load_object, "src.utils", "load_object"),
+            (params_path, CompiledPreprocessor.load, "src.pipeline.fast_transform", "CompiledPreprocessor.load"),
+        )
+        for file_path, load, module, loader in loaders:
+            extension = os.path.splitext(file_path)[1]
+            load_ms = best_load_ms(file_path, load, args.repeat)
+            cold_ms = cold_load_ms(file_path, module, loader)
+            print(f"{'preprocessor':<22}{extension:<10}{os.path.getsize(file_path) / 1024:>10.1f}{load_ms:>11.2f}{cold_ms:>11.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,340 @@
+'''
+    Latency/throughput benchmark of the serving path.
+
+    Replays CustomData payloads (synthetic, or recorded ones from an NDJSON
+    file with one record per line) against /predictdata and /predict/batch,
+    through Flask's test client in-process and through a local gunicorn, and
+    reports throughput and p50/p95/p99 latency. A per-stage breakdown times
+    parsing, DataFrame construction, preprocessor.transform and
+    model.predict on the same payloads, next to the compiled fast path.
+
+    The prediction cache and lookup table are disabled unless --with-cache
+    is given, so every request reaches the model. Records that were not
+    scored (an "Error: ..." page from /predictdata, an {"error": ...} entry
+    from /predict/batch, or a non-200 status) are counted per endpoint, and
+    the run exits with status 1 when their share exceeds --max-error-rate
+    (default 0), so a broken model cannot benchmark as fast. Results are
+    written as JSON; --compare prints the change against an earlier
+    results file.
+
+    running command : python benchmarks/serving.py [--requests 2000] [--payloads recorded.ndjson]
+                      python benchmarks/serving.py --compare benchmarks/results/serving_<old>.json
+'''
+
+import argparse
+import http.client
+import json
+import os
+import platform
+import subprocess
+import sys
+import threading
+import time
+import urllib.parse
+import numpy as np
+
+PORT = 8020
+SCORE_COLUMNS = ["reading_score", "writing_score"]
+
+
+def synthetic_payloads(n, seed=42):
+    """Random CustomData form payloads drawn from the fitted categories."""
+    from src.pipeline.model_registry import model_registry
+    from src.pipeline.fast_transform import CompiledPreprocessor
+
+    plan = CompiledPreprocessor.from_preprocessor(model_registry.get_preprocessor())
+    rng = np.random.RandomState(seed)
+    payloads = []
+    for _ in range(n):
+        payload = {column: str(rng.choice(list(lookup))) for column, lookup, _ in plan.categorical}
+        payload.update({column: str(rng.randint(0, 101)) for column in SCORE_COLUMNS})
+        payloads.append(payload)
+    return payloads
+
+
+def recorded_payloads(file_path, n):
+    with open(file_path) as file_obj:
+        records = [json.loads(line) for line in file_obj if line.strip()]
+    return [{key: str(value) for key, value in records[i % len(records)].items()} for i in range(n)]
+
+
+def failed_records(path, status, body, n_records):
+    """
+    Records a response did not score: /predictdata answers 200 with an
+    "Error: ..." page on a generic failure, /predict/batch answers 200 with
+    per-record {"error": ...} entries (counted in n_errors).
+    """
+    if status != 200:
+        return n_records
+    if path == "/predictdata":
+        return int(b"Error: " in body)
+    return json.loads(body)["n_errors"]
+
+
+def summarize(latencies, seconds, n_records, n_errors):
+    latencies_ms = np.array(latencies) * 1000
+    p50, p95, p99 = np.percentile(latencies_ms, [50, 95, 99])
+    return {
+        "requests": len(latencies),
+        "records": n_records,
+        "errors": n_errors,
+        "error_rate": n_errors / n_records if n_records else 0.0,
+        "seconds": seconds,
+        "requests_per_second": len(latencies) / seconds,
+        "records_per_second": n_records / seconds,
+        "p50_ms": p50, "p95_ms": p95, "p99_ms": p99, "max_ms": latencies_ms.max(),
+    }
+
+
+def batches(payloads, batch_size):
+    return [payloads[i:i + batch_size] for i in range(0, len(payloads), batch_size)]
+
+
+# ---------------- in-process (Flask test client) ----------------
+
+def run_inprocess(payloads, batch_size):
+    from app import app
+
+    client = app.test_client()
+    client.post("/predictdata", data=payloads[0])
+    results = {}
+
+    latencies, errors, start = [], 0, time.perf_counter()
+    for payload in payloads:
+        t0 = time.perf_counter()
+        response = client.post("/predictdata", data=payload)
+        latencies.append(time.perf_counter() - t0)
+        errors += failed_records("/predictdata", response.status_code, response.data, 1)
+    results["predictdata"] = summarize(latencies, time.perf_counter() - start, len(payloads), errors)
+
+    latencies, errors, start = [], 0, time.perf_counter()
+    for batch in batches(payloads, batch_size):
+        t0 = time.perf_counter()
+        response = client.post("/predict/batch", json=batch)
+        latencies.append(time.perf_counter() - t0)
+        errors += failed_records("/predict/batch", response.status_code, response.data, len(batch))
+    results["predict_batch"] = summarize(latencies, time.perf_counter() - start, len(payloads), errors)
+    return results
+
+
+# ---------------- local gunicorn ----------------
+
+def http_client(jobs, latencies, failures, errors):
+    connection = http.client.HTTPConnection("127.0.0.1", PORT, timeout=60)
+    for path, body, content_type, n_records in jobs:
+        t0 = time.perf_counter()
+        try:
+            connection.request("POST", path, body=body, headers={"Content-Type": content_type})
+            response = connection.getresponse()
+            data = response.read()
+        except (OSError, http.client.HTTPException) as e:
+            failures.append(repr(e))
+            connection.close()
+            connection = http.client.HTTPConnection("127.0.0.1", PORT, timeout=60)
+            continue
+        latencies.append(time.perf_counter() - t0)
+        errors.append(failed_records(path, response.status, data, n_records))
+    connection.close()
+
+
+def drive(jobs, concurrency):
+    latencies, failures, errors = [], [], []
+    threads = [threading.Thread(target=http_client, args=(jobs[i::concurrency], latencies, failures, errors))
+               for i in range(concurrency)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    if failures:
+        raise RuntimeError(f"{len(failures)} requests failed, e.g. {failures[0]}")
+    return latencies, time.perf_counter() - start, sum(errors)
+
+
+def run_gunicorn(payloads, batch_size, workers, concurrency, env):
+    server = subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", "app:app", "-b", f"127.0.0.1:{PORT}", "-w", str(workers)],
+        env=dict(env, PYTHONPATH=os.getcwd()), stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        deadline = time.monotonic() + 120
+        warm_up = [("/predictdata", urllib.parse.urlencode(payloads[0]), "application/x-www-form-urlencoded", 1)]
+        while True:
+            failures = []
+            http_client(warm_up, [], failures, [])
+            if not failures:
+                break
+            if time.monotonic() > deadline:
+                raise TimeoutError(f"gunicorn did not come up: {failures[0]}")
+            time.sleep(0.2)
+
+        results = {}
+        jobs = [("/predictdata", urllib.parse.urlencode(p), "application/x-www-form-urlencoded", 1) for p in payloads]
+        latencies, seconds, errors = drive(jobs, concurrency)
+        results["predictdata"] = summarize(latencies, seconds, len(payloads), errors)
+
+        jobs = [("/predict/batch", json.dumps(batch), "application/json", len(batch))
+                for batch in batches(payloads, batch_size)]
+        latencies, seconds, errors = drive(jobs, concurrency)
+        results["predict_batch"] = summarize(latencies, seconds, len(payloads), errors)
+        return results
+    finally:
+        server.terminate()
+        server.wait()
+
+
+# ---------------- stage breakdown ----------------
+
+def stage_breakdown(payloads):
+    """Times each step of a single-record prediction, in microseconds."""
+    import pandas as pd
+    from src.pipeline.model_registry import model_registry
+    from src.pipeline.predict_pipeline import (
+        CustomData, FEATURE_COLUMNS, get_compiled_preprocessor, get_compiled_model,
+    )
+
+    model = model_registry.get_model()
+    preprocessor = model_registry.get_preprocessor()
+    plan = get_compiled_preprocessor(preprocessor)
+    engine = get_compiled_model(model)
+
+    stages = {name: [] for name in (
+        "parse", "dataframe", "preprocessor_transform", "model_predict", "compiled_encode", "tree_engine_predict",
+    )}
+    for payload in payloads:
+        t0 = time.perf_counter()
+        row = CustomData(**payload).get_data_as_dict()
+        t1 = time.perf_counter()
+        features = pd.DataFrame.from_records([row], columns=FEATURE_COLUMNS)
+        t2 = time.perf_counter()
+        X = preprocessor.transform(features)
+        X = X.toarray() if hasattr(X, "toarray") else X
+        t3 = time.perf_counter()
+        model.predict(X)
+        t4 = time.perf_counter()
+        stages["parse"].append(t1 - t0)
+        stages["dataframe"].append(t2 - t1)
+        stages["preprocessor_transform"].append(t3 - t2)
+        stages["model_predict"].append(t4 - t3)
+
+        if plan is not None:
+            t0 = time.perf_counter()
+            X = plan.transform_records([row])
+            stages["compiled_encode"].append(time.perf_counter() - t0)
+        if engine is not None:
+            t0 = time.perf_counter()
+            engine.predict(X)
+            stages["tree_engine_predict"].append(time.perf_counter() - t0)
+
+    breakdown = {}
+    for name, timings in stages.items():
+        if timings:
+            timings_us = np.array(timings) * 1e6
+            breakdown[name] = {
+                "mean_us": timings_us.mean(),
+                "p50_us": np.percentile(timings_us, 50),
+                "p99_us": np.percentile(timings_us, 99),
+            }
+    return breakdown
+
+
+# ---------------- reporting ----------------
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_results(results):
+    print(f"{'mode':<12}{'endpoint':<16}{'req/s':>9}{'records/s':>11}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}"
+          f"{'errors':>8}")
+    for mode in ("inprocess", "gunicorn"):
+        for endpoint, row in results.get(mode, {}).items():
+            print(f"{mode:<12}{endpoint:<16}{row['requests_per_second']:>9.1f}{row['records_per_second']:>11.1f}"
+                  f"{row['p50_ms']:>9.2f}{row['p95_ms']:>9.2f}{row['p99_ms']:>9.2f}{row['errors']:>8}")
+    if "stages" not in results:
+        return
+    print(f"\n{'stage':<24}{'mean us':>10}{'p50 us':>10}{'p99 us':>10}")
+    for stage, row in results["stages"].items():
+        print(f"{stage:<24}{row['mean_us']:>10.1f}{row['p50_us']:>10.1f}{row['p99_us']:>10.1f}")
+
+
+def print_comparison(old, new):
+    print(f"\nchange vs {old['timestamp']} ({(old.get('git_commit') or '?')[:10]}):")
+    for mode in ("inprocess", "gunicorn"):
+        for endpoint, row in new.get(mode, {}).items():
+            before = old.get(mode, {}).get(endpoint)
+            if before:
+                changes = "  ".join(
+                    f"{key} {(row[key] - before[key]) / before[key] * 100:+.1f}%"
+                    for key in ("records_per_second", "p50_ms", "p99_ms")
+                )
+                print(f"  {mode:<12}{endpoint:<16}{changes}")
+    for stage, row in new["stages"].items():
+        before = old["stages"].get(stage)
+        if before:
+            print(f"  {'stage':<12}{stage:<24}mean_us {(row['mean_us'] - before['mean_us']) / before['mean_us'] * 100:+.1f}%")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=2000, help="payloads replayed per endpoint")
+    parser.add_argument("--payloads", help="NDJSON file of recorded CustomData records (default: synthetic)")
+    parser.add_argument("--batch-size", type=int, default=100, help="records per /predict/batch request")
+    parser.add_argument("--workers", type=int, default=2, help="gunicorn workers")
+    parser.add_argument("--concurrency", type=int, default=8, help="concurrent clients against gunicorn")
+    parser.add_argument("--modes", default="inprocess,gunicorn")
+    parser.add_argument("--with-cache", action="store_true", help="keep the prediction cache and lookup table on")
+    parser.add_argument("--output", help="results file (default: benchmarks/results/serving_<timestamp>.json)")
+    parser.add_argument("--compare", help="earlier results file to compare against")
+    parser.add_argument("--max-error-rate", type=float, default=0.0,
+                        help="exit with status 1 when a larger share of records is not scored")
+    args = parser.parse_args()
+
+    # the serving config is read from the environment when src.pipeline is first imported
+    if not args.with_cache:
+        os.environ["PREDICTION_CACHE"] = "0"
+        os.environ["LOOKUP_TABLE"] = "0"
+    from src.pipeline.model_registry import model_registry
+
+    payloads = recorded_payloads(args.payloads, args.requests) if args.payloads else synthetic_payloads(args.requests)
+    modes = args.modes.split(",")
+
+    timestamp = time.strftime("%Y%m%d-%H%M%S")
+    results = {
+        "timestamp": timestamp,
+        "git_commit": git_commit(),
+        "python": platform.python_version(),
+        "cpu_count": os.cpu_count(),
+        "model": type(model_registry.get_model()).__name__,
+        "settings": {key: value for key, value in vars(args).items() if key not in ("output", "compare")},
+    }
+    if "inprocess" in modes:
+        results["inprocess"] = run_inprocess(payloads, args.batch_size)
+    if "gunicorn" in modes:
+        results["gunicorn"] = run_gunicorn(payloads, args.batch_size, args.workers, args.concurrency, os.environ)
+
+    failing = [f"{mode} {endpoint}: {row['errors']} of {row['records']} records not scored"
+               for mode in ("inprocess", "gunicorn") for endpoint, row in results.get(mode, {}).items()
+               if row["error_rate"] > args.max_error_rate]
+    if failing:
+        print_results(results)
+        sys.exit("\nerror rate above --max-error-rate, no results written: " + "; ".join(failing))
+    results["stages"] = stage_breakdown(payloads)
+
+    print_results(results)
+    if args.compare:
+        with open(args.compare) as file_obj:
+            print_comparison(json.load(file_obj), results)
+
+    output = args.output or os.path.join("benchmarks", "results", f"serving_{timestamp}.json")
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    with open(output, "w") as file_obj:
+        json.dump(results, file_obj, indent=2, default=float)
+    print(f"\nresults written to {output}")
+
+
+if __name__ == "__main__":
+    main()
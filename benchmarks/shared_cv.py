@@ -0,0 +1,100 @@
+'''
+    Training time and peak memory of evaluate_models with the shared CV
+    workspace (src/utils.py CVWorkspace, TRAIN_SHARED_CV=1) against one
+    GridSearchCV per model (TRAIN_SHARED_CV=0), on stud.csv resampled to
+    each --scales multiple (as in src/components/training_profiler.py).
+
+    Each run is a fresh interpreter. Memory is the peak PSS summed over that
+    process and all its search workers, read from /proc/<pid>/smaps_rollup
+    (Linux) every 50 ms. PSS splits shared pages between the processes that
+    map them, so memory-mapped folds are not counted once per worker.
+
+    running command : python benchmarks/shared_cv.py [--scales 1,10] [--n-jobs 1,4] [--strategy grid]
+                      [--models "Decision Tree,XGBRegressor"]
+'''
+
+import argparse
+import glob
+import json
+import os
+import subprocess
+import sys
+import time
+
+CHILD = '''
+import json, sys, time, warnings
+warnings.filterwarnings("ignore")
+from src.components.model_trainer import ModelTrainer
+from src.components.training_profiler import TrainingProfiler
+from src.utils import evaluate_models
+scale, n_jobs, strategy, shared_cv = int(sys.argv[1]), int(sys.argv[2]), sys.argv[3], sys.argv[4] == "1"
+X_train, y_train, X_test, y_test = TrainingProfiler().synthetic_split(scale)
+trainer = ModelTrainer()
+models, params = trainer.get_models_and_params()
+if sys.argv[5]:
+    models = {name: models[name] for name in sys.argv[5].split(",")}
+start = time.perf_counter()
+report, _ = evaluate_models(X_train, y_train, X_test, y_test, models, params, n_jobs=n_jobs, cache_dir=None,
+                            strategy=strategy, dense_only=trainer.model_trainer_config.dense_only_models,
+                            shared_cv=shared_cv)
+print(json.dumps({"seconds": time.perf_counter() - start, "best_r2": max(report.values())}))
+'''
+
+
+def process_tree(pid):
+    pids, stack = [], [pid]
+    while stack:
+        current = stack.pop()
+        pids.append(current)
+        for children_file in glob.glob(f"/proc/{current}/task/*/children"):
+            try:
+                with open(children_file) as file_obj:
+                    stack.extend(int(child) for child in file_obj.read().split())
+            except OSError:
+                pass
+    return pids
+
+
+def pss_mb(pid):
+    try:
+        with open(f"/proc/{pid}/smaps_rollup") as file_obj:
+            for line in file_obj:
+                if line.startswith("Pss:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return 0.0
+
+
+def run(scale, n_jobs, strategy, shared_cv, models=""):
+    env = dict(os.environ, PYTHONPATH=os.getcwd())
+    child = subprocess.Popen(
+        [sys.executable, "-c", CHILD, str(scale), str(n_jobs), strategy, "1" if shared_cv else "0", models],
+        env=env, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True)
+    peak = 0.0
+    while child.poll() is None:
+        peak = max(peak, sum(pss_mb(pid) for pid in process_tree(child.pid)))
+        time.sleep(0.05)
+    output = child.stdout.read()
+    if child.returncode != 0:
+        raise RuntimeError(f"training run failed (exit {child.returncode})")
+    result = json.loads(output.strip().splitlines()[-1])
+    result["peak_pss_mb"] = peak
+    return result
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--scales", default="1,10")
+    parser.add_argument("--n-jobs", default=str(os.cpu_count() or 1), help="comma-separated TRAIN_N_JOBS values")
+    parser.add_argument("--strategy", choices=("grid", "random"), default="grid")
+    parser.add_argument("--models", default="", help='comma-separated model names (default: all)')
+    args = parser.parse_args()
+
+    print(f"{'scale':>5}{'n_jobs':>8}  {'mode':<22}{'seconds':>9}{'peak PSS MB':>13}{'best R²':>9}")
+    for scale in (int(value) for value in args.scales.split(",")):
+        for n_jobs in (int(value) for value in args.n_jobs.split(",")):
+            for shared_cv, mode in ((False, "GridSearchCV per model"), (True, "shared CV workspace")):
+                result = run(scale, n_jobs, args.strategy, shared_cv, args.models)
+                print(f"{scale:>5}{n_jobs:>8}  {mode:<22}{result['seconds']:>9.1f}"
+                      f"{result['peak_pss_mb']:>13.0f}{result['best_r2']:>9.4f}", flush=True)
@@ -0,0 +1,81 @@
+'''
+    Compares DataTransformation's old output (dense ColumnTransformer
+    output glued to the target with np.c_, then sliced back into X/y)
+    with the current one (CSR features and a separate target) on a large
+    synthetic dataset: transform time, peak memory and matrix size.
+
+    running command : python benchmarks/sparse_features.py [--rows 200000] [--levels 50]
+'''
+
+import argparse
+import time
+import tracemalloc
+import numpy as np
+import pandas as pd
+from src.components.data_ingestion import DataIngestionConfig, INGESTION_DTYPES
+from src.components.data_transformation import DataTransformation
+
+CATEGORICAL_COLUMNS = ['gender', 'race_ethnicity', 'parental_level_of_education', 'lunch', 'test_preparation_course']
+
+
+def synthetic_frame(rows, levels):
+    """
+    Samples `rows` students from stud.csv and splits every category into
+    `levels` sub-levels, to mimic the one-hot block growing with more categories.
+    """
+    df = pd.read_csv(DataIngestionConfig().source_data_path, dtype=INGESTION_DTYPES)
+    rng = np.random.RandomState(42)
+    df = df.iloc[rng.randint(0, len(df), rows)].reset_index(drop=True)
+    for column in CATEGORICAL_COLUMNS:
+        suffix = pd.Series(rng.randint(0, levels, rows)).astype(str)
+        df[column] = df[column].astype(str) + "_" + suffix
+    return df
+
+
+def measure(fn):
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = fn()
+    seconds = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, seconds, peak / 1024 ** 2
+
+
+def nbytes(X):
+    if hasattr(X, "indices"):
+        return X.data.nbytes + X.indices.nbytes + X.indptr.nbytes
+    return X.nbytes
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--levels", type=int, default=50, help="sub-levels per category")
+    args = parser.parse_args()
+
+    df = synthetic_frame(args.rows, args.levels)
+    features, target = df.drop(columns=["math_score"]), df["math_score"]
+
+    def dense_concat():
+        transformation = DataTransformation()
+        transformation.data_transformation_config.sparse_output = False
+        arr = transformation.get_data_transformer_object().fit_transform(features)
+        train_arr = np.c_[arr, np.array(target)]
+        return train_arr[:, :-1], train_arr[:, -1]
+
+    def sparse_separate():
+        transformation = DataTransformation()
+        transformation.data_transformation_config.sparse_output = True
+        X = transformation.get_data_transformer_object().fit_transform(features)
+        return X, target.to_numpy(dtype=np.float64)
+
+    print(f"{args.rows} rows, {args.levels} sub-levels per category")
+    print(f"{'variant':<28}{'time (s)':>10}{'peak (MB)':>12}{'X (MB)':>10}  shape")
+    for name, fn in (("dense + np.c_ (before)", dense_concat), ("sparse CSR, X/y (after)", sparse_separate)):
+        (X, _), seconds, peak = measure(fn)
+        print(f"{name:<28}{seconds:>10.2f}{peak:>12.1f}{nbytes(X) / 1024 ** 2:>10.1f}  {X.shape}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+'''
+    model.predict vs the compiled tree engine (src/pipeline/tree_engine.py)
+    for every supported tree model, fitted on the transformed training data,
+    at several batch sizes. Also reports the largest difference between the
+    two predictions.
+
+    running command : python benchmarks/tree_engine.py [--repeat 50] [--n-estimators 128]
+'''
+
+import argparse
+import time
+import numpy as np
+from sklearn.ensemble import AdaBoostRegressor, GradientBoostingRegressor, RandomForestRegressor
+from sklearn.tree import DecisionTreeRegressor
+from src.components.data_ingestion import DataIngestionConfig
+from src.components.data_transformation import DataTransformation
+from src.pipeline.tree_engine import compile_tree_model
+
+BATCH_SIZES = (1, 8, 64, 256, 1024)
+
+
+def best_ms(fn, X, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(X)
+        timings.append(time.perf_counter() - start)
+    return min(timings) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=50)
+    parser.add_argument("--n-estimators", type=int, default=128)
+    args = parser.parse_args()
+
+    ingestion_config = DataIngestionConfig()
+    X_train, y_train, X_test, _, _ = DataTransformation().initiate_data_transformation(
+        ingestion_config.train_data_path, ingestion_config.test_data_path
+    )
+    X_train = X_train.toarray() if hasattr(X_train, "toarray") else X_train
+    X_test = X_test.toarray() if hasattr(X_test, "toarray") else X_test
+    X_bench = np.resize(X_test, (max(BATCH_SIZES), X_test.shape[1]))
+
+    models = {
+        "Decision Tree": DecisionTreeRegressor(random_state=42),
+        "Random Forest": RandomForestRegressor(n_estimators=args.n_estimators, random_state=42),
+        "Gradient Boosting": GradientBoostingRegressor(n_estimators=args.n_estimators, random_state=42),
+        "AdaBoost Regressor": AdaBoostRegressor(n_estimators=args.n_estimators, random_state=42),
+    }
+
+    print(f"{'model':<20}{'rows':>6}{'predict (ms)':>14}{'engine (ms)':>13}{'speedup':>9}{'max |diff|':>12}")
+    for name, model in models.items():
+        model.fit(X_train, y_train)
+        engine = compile_tree_model(model)
+        if engine is None:
+            print(f"{name:<20} could not be compiled")
+            continue
+        for rows in BATCH_SIZES:
+            X = X_bench[:rows]
+            max_diff = np.abs(engine.predict(X) - model.predict(X)).max()
+            predict_ms = best_ms(model.predict, X, args.repeat)
+            engine_ms = best_ms(engine.predict, X, args.repeat)
+            print(f"{name:<20}{rows:>6}{predict_ms:>14.3f}{engine_ms:>13.3f}"
+                  f"{predict_ms / engine_ms:>8.1f}x{max_diff:>12.1e}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+'''
+    Per-process memory of a gunicorn deployment with and without preloading
+    (PRELOAD_APP, see gunicorn.conf.py). Every worker is sent requests first
+    so the serving path has touched its pages, then RSS, PSS and the
+    shared/private split are read from /proc/<pid>/smaps_rollup (Linux).
+
+    PSS divides each shared page between the processes mapping it, so the
+    PSS total is the real physical footprint of the deployment, while the
+    RSS total counts shared pages once per process.
+
+    running command : python benchmarks/worker_memory.py [--workers 4] [--model-file model.joblib]
+'''
+
+import argparse
+import http.client
+import os
+import subprocess
+import sys
+import time
+import urllib.parse
+
+PORT = 8010
+SAMPLE_FORM = urllib.parse.urlencode({
+    "gender": "female", "race_ethnicity": "group B", "parental_level_of_education": "bachelor's degree",
+    "lunch": "standard", "test_preparation_course": "none", "reading_score": 72, "writing_score": 74,
+})
+
+
+def smaps_rollup_kb(pid):
+    values = {}
+    with open(f"/proc/{pid}/smaps_rollup") as file_obj:
+        for line in file_obj:
+            parts = line.split()
+            if len(parts) == 3 and parts[2] == "kB":
+                values[parts[0].rstrip(":")] = int(parts[1])
+    return values
+
+
+def children(pid):
+    with open(f"/proc/{pid}/task/{pid}/children") as file_obj:
+        return [int(child) for child in file_obj.read().split()]
+
+
+def request(path, body=None):
+    connection = http.client.HTTPConnection("127.0.0.1", PORT, timeout=30)
+    headers = {"Content-Type": "application/x-www-form-urlencoded"}
+    connection.request("POST" if body else "GET", path, body=body, headers=headers)
+    connection.getresponse().read()
+    connection.close()
+
+
+def measure(preload, workers, model_file):
+    env = dict(os.environ, PRELOAD_APP="1" if preload else "0", PYTHONPATH=os.getcwd())
+    if model_file:
+        env["MODEL_FILE"] = model_file
+    server = subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", "app:app", "-b", f"127.0.0.1:{PORT}", "-w", str(workers)],
+        env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        deadline = time.monotonic() + 120
+        while True:
+            try:
+                request("/stats")
+                break
+            except OSError:
+                if time.monotonic() > deadline:
+                    raise TimeoutError("gunicorn did not come up")
+                time.sleep(0.2)
+        while len(children(server.pid)) < workers:
+            time.sleep(0.2)
+        # spread requests over the workers so each one has served predictions
+        for _ in range(50 * workers):
+            request("/predictdata", SAMPLE_FORM)
+        time.sleep(1)
+
+        rows = [("master", smaps_rollup_kb(server.pid))]
+        rows += [(f"worker {pid}", smaps_rollup_kb(pid)) for pid in children(server.pid)]
+    finally:
+        server.terminate()
+        server.wait()
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--model-file", help="e.g. model.joblib to memory-map the model's arrays")
+    args = parser.parse_args()
+
+    for preload in (False, True):
+        rows = measure(preload, args.workers, args.model_file)
+        print(f"\nPRELOAD_APP={int(preload)}, {args.workers} workers, MODEL_FILE={args.model_file or '(model_pointer.json)'}")
+        print(f"{'process':<16}{'RSS (MB)':>10}{'PSS (MB)':>10}{'shared (MB)':>13}{'private (MB)':>14}")
+        for name, kb in rows:
+            shared = kb.get("Shared_Clean", 0) + kb.get("Shared_Dirty", 0)
+            private = kb.get("Private_Clean", 0) + kb.get("Private_Dirty", 0)
+            print(f"{name:<16}{kb['Rss'] / 1024:>10.1f}{kb['Pss'] / 1024:>10.1f}{shared / 1024:>13.1f}{private / 1024:>14.1f}")
+        total_rss = sum(kb["Rss"] for _, kb in rows) / 1024
+        total_pss = sum(kb["Pss"] for _, kb in rows) / 1024
+        print(f"{'total':<16}{total_rss:>10.1f}{total_pss:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
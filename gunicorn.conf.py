@@ -0,0 +1,56 @@
+#  gunicorn settings, picked up automatically by `gunicorn app:app` (see Procfile)
+'''
+    With PRELOAD_APP=1 (the default) the app is imported and the model,
+    preprocessor and their compiled forms are loaded once in the master,
+    then gc.freeze() moves everything allocated so far out of the garbage
+    collector's reach before the workers are forked. Workers share those
+    pages copy-on-write instead of each holding its own copy, and start
+    serving without paying the load cost.
+
+    With PRELOAD_APP=0 every worker imports the app and loads the artifacts
+    itself after it is forked.
+
+    A missing or unreadable artifact never stops the server: if preloading
+    fails, the error is logged and each worker tries again after it is
+    forked; if that fails too, the artifacts are loaded on first use, so
+    / and /debug are still served.
+
+    Worker count and bind address follow gunicorn's own WEB_CONCURRENCY and
+    PORT environment variables.
+'''
+
+import gc
+import os
+
+preload_app = os.environ.get("PRELOAD_APP", "1") == "1"
+# set once the master has loaded the artifacts; otherwise every worker loads its own
+_preloaded = False
+
+
+def _warm_up(log):
+    from src.pipeline.predict_pipeline import warm_up
+
+    try:
+        warm_up()
+        return True
+    except Exception:
+        log.exception("Could not load the artifacts; they will be loaded on first use")
+        return False
+
+
+def on_starting(server):
+    global _preloaded
+    if preload_app:
+        _preloaded = _warm_up(server.log)
+        if not _preloaded:
+            server.log.warning("Preloading failed, each worker loads the artifacts after it is forked")
+            return
+        # keep the cyclic GC from writing to (and so un-sharing) the preloaded objects
+        gc.collect()
+        gc.freeze()
+        server.log.info(f"Artifacts preloaded in master, {gc.get_freeze_count()} objects frozen")
+
+
+def post_worker_init(worker):
+    if not _preloaded:
+        _warm_up(worker.log)
@@ -13,6 +13,13 @@ from src.logger import logging              # custom logger for tracking the pro
 import pandas as pd                         # used for data manipulation and analysis
 from sklearn.model_selection import train_test_split   # used to split dataset into training and testing data
 from dataclasses import dataclass            # used to create data classes (for storing config info easily)
+from contextlib import ExitStack              # closes all the streaming writers together
+from src.utils import save_frame, FrameWriter  # Feather/Parquet/CSV artifact read/write helpers
+
+try:
+    import resource                          # peak memory (RSS) of this process; not available on Windows
+except ImportError:
+    resource = None
 
 from src.components.data_transformation import DataTransformation
 from src.components.data_transformation import DataTransformationConfig
@@ -27,9 +34,78 @@ from src.components.model_trainer import ModelTrainer
 # --------------------------------------------
 @dataclass
 class DataIngestionConfig: # this class will store all the o/p of input data coming
-    train_data_path: str = os.path.join('artifacts', "train_csv") # artifacts-o/p folder, train.csv- o/p file
-    test_data_path: str = os.path.join('artifacts', "test_csv")   # test.csv- o/p file
-    raw_data_path: str = os.path.join('artifacts', "data_csv")    # raw data before train-test split
+    # format the stages hand data over in: "feather" (Arrow IPC, memory-mapped on read),
+    # "parquet" or "csv". The columnar formats keep the dtypes below, categoricals included.
+    artifact_format: str = os.environ.get("ARTIFACT_FORMAT", "feather")
+    train_data_path: str = None  # artifacts/train.<format> (artifacts/train_csv for csv)
+    test_data_path: str = None   # artifacts/test.<format>
+    raw_data_path: str = None    # raw data before train-test split
+    # also write the old train_csv / test_csv / data_csv text files
+    export_csv: bool = os.environ.get("EXPORT_CSV", "0") == "1"
+    source_data_path: str = os.path.join('notebook', 'data', 'stud.csv')  # dataset to ingest
+    test_size: float = 0.2
+
+    # streaming mode: read the source in chunks and split rows by hash, so the
+    # full dataset is never held in memory (for large district exports)
+    streaming: bool = os.environ.get("INGESTION_STREAMING", "0") == "1"
+    chunk_size: int = int(os.environ.get("INGESTION_CHUNK_SIZE", 100_000))
+
+    def __post_init__(self):
+        self.train_data_path = self.train_data_path or artifact_path("train", self.artifact_format)
+        self.test_data_path = self.test_data_path or artifact_path("test", self.artifact_format)
+        self.raw_data_path = self.raw_data_path or artifact_path("data", self.artifact_format)
+
+    def output_paths(self):
+        """(raw, train, test) paths to write: the artifacts plus the optional CSV export."""
+        paths = [(self.raw_data_path, self.train_data_path, self.test_data_path)]
+        if self.export_csv and self.artifact_format != "csv":
+            paths.append(tuple(artifact_path(name, "csv") for name in ("data", "train", "test")))
+        return paths
+
+
+def artifact_path(name, artifact_format):
+    if artifact_format == "csv":
+        return os.path.join('artifacts', f"{name}_csv")
+    return os.path.join('artifacts', f"{name}.{artifact_format}")
+
+
+# explicit dtypes so pandas does not infer (and over-allocate) per chunk:
+# categoricals for the five string columns, small ints for the scores
+INGESTION_DTYPES = {
+    "gender": "category",
+    "race_ethnicity": "category",
+    "parental_level_of_education": "category",
+    "lunch": "category",
+    "test_preparation_course": "category",
+    "math_score": "Int16",
+    "reading_score": "Int16",
+    "writing_score": "Int16",
+}
+
+
+def streaming_dtypes(source_path, chunk_size):
+    """
+    INGESTION_DTYPES with every categorical's levels filled in, for the
+    streaming writers: one extra pass over the categorical columns only, so
+    every chunk is written with the same categories (one Arrow dictionary).
+    """
+    columns = [column for column, dtype in INGESTION_DTYPES.items() if dtype == "category"]
+    levels = {column: set() for column in columns}
+    for chunk in pd.read_csv(source_path, usecols=columns, dtype="category", chunksize=chunk_size):
+        for column in columns:
+            levels[column].update(chunk[column].cat.categories)
+    return {
+        **INGESTION_DTYPES,
+        **{column: pd.CategoricalDtype(sorted(values)) for column, values in levels.items()},
+    }
+
+
+def peak_rss_mb():
+    if resource is None:
+        return None
+    # ru_maxrss is in kilobytes on Linux (bytes on macOS)
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
 
 # --------------------------------------------
 # Class: DataIngestion
@@ -51,26 +127,27 @@ class DataIngestion:
     # --------------------------------------------
     def initiate_data_ingestion(self):
         logging.info("Entered the data ingestion method or component")
+        if self.ingestion_config.streaming:
+            return self.initiate_streaming_ingestion()
         try:
             # here you read the data from mongoDb, mySQL, or anywhere 
             # and other code will remain the same — just the path provided in the first line will be changed
-            df = pd.read_csv('notebook\data\stud.csv')
+            df = pd.read_csv(self.ingestion_config.source_data_path, dtype=INGESTION_DTYPES)
             logging.info('Read the dataset as dataframe')
 
             # creates the artifacts folder if it doesn’t exist already
             os.makedirs(os.path.dirname(self.ingestion_config.train_data_path), exist_ok=True)
 
-            # used to save the csv file to given folder and file named raw_data_path
-            df.to_csv(self.ingestion_config.raw_data_path, index=False, header=True)
-
             logging.info("Train test split initiated")
 
             # splitting the dataset into train and test sets (80% train, 20% test)
-            train_set, test_set = train_test_split(df, test_size=0.2, random_state=42)
+            train_set, test_set = train_test_split(df, test_size=self.ingestion_config.test_size, random_state=42)
 
-            # saving both train and test datasets into separate CSV files
-            train_set.to_csv(self.ingestion_config.train_data_path, index=False, header=True)
-            test_set.to_csv(self.ingestion_config.test_data_path, index=False, header=True)
+            # saving the raw data and both splits (Feather/Parquet/CSV, plus the optional CSV export)
+            for raw_path, train_path, test_path in self.ingestion_config.output_paths():
+                save_frame(df, raw_path)
+                save_frame(train_set, train_path)
+                save_frame(test_set, test_path)
 
             logging.info('Ingestion of the data is completed')
 
@@ -84,6 +161,63 @@ class DataIngestion:
         except Exception as e:
             raise CustomException(e, sys)
 
+    # --------------------------------------------
+    # Function: initiate_streaming_ingestion
+    # Same outputs as initiate_data_ingestion, but:
+    # 1. Reads the dataset chunk by chunk with explicit dtypes
+    # 2. Sends every row to train or test by a hash of its values
+    #    (deterministic, independent of chunk size and row order)
+    # 3. Appends each chunk to the raw/train/test files as it goes
+    #    (Feather, Parquet or CSV, see DataIngestionConfig.artifact_format),
+    #    with the categories collected by a first pass (streaming_dtypes)
+    # --------------------------------------------
+    def initiate_streaming_ingestion(self):
+        logging.info("Entered the streaming data ingestion method")
+        try:
+            config = self.ingestion_config
+            os.makedirs(os.path.dirname(config.train_data_path), exist_ok=True)
+
+            # rows whose hash bucket falls below this go to the test set
+            test_buckets = int(config.test_size * 10_000)
+            n_train = n_test = 0
+
+            # categories fixed up front, so the Feather/Parquet files keep them as one categorical
+            dtypes = streaming_dtypes(config.source_data_path, config.chunk_size) \
+                if config.artifact_format != "csv" else None
+            writers = [
+                tuple(FrameWriter(path, dtypes) for path in paths) for paths in config.output_paths()
+            ]
+            with ExitStack() as stack:
+                for group in writers:
+                    for writer in group:
+                        stack.enter_context(writer)
+
+                reader = pd.read_csv(config.source_data_path, dtype=INGESTION_DTYPES, chunksize=config.chunk_size)
+                for chunk in reader:
+                    is_test = (pd.util.hash_pandas_object(chunk, index=False).to_numpy() % 10_000) < test_buckets
+                    train_chunk, test_chunk = chunk[~is_test], chunk[is_test]
+
+                    for raw_writer, train_writer, test_writer in writers:
+                        raw_writer.append(chunk)
+                        train_writer.append(train_chunk)
+                        test_writer.append(test_chunk)
+
+                    n_test += len(test_chunk)
+                    n_train += len(train_chunk)
+
+            peak = peak_rss_mb()
+            peak_msg = f"{peak:.1f} MB" if peak is not None else "n/a"
+            logging.info(f"Streaming ingestion completed: {n_train} train rows, {n_test} test rows, peak RSS {peak_msg}")
+            print(f"Streaming ingestion: {n_train} train / {n_test} test rows, peak RSS {peak_msg}")
+
+            return (
+                config.train_data_path,
+                config.test_data_path
+            )
+
+        except Exception as e:
+            raise CustomException(e, sys)
+
 # --------------------------------------------
 # Main function: runs the ingestion process when the file is executed directly
 # --------------------------------------------
@@ -92,7 +226,7 @@ if __name__ == "__main__":
     train_data, test_data = obj.initiate_data_ingestion()       # call the function to start data ingestion
 
     data_transformation = DataTransformation()
-    train_arr, test_arr,_ = data_transformation.initiate_data_transformation(train_data, test_data)
+    X_train, y_train, X_test, y_test, _ = data_transformation.initiate_data_transformation(train_data, test_data)
 
     modeltrainer = ModelTrainer()
-    print(modeltrainer.initiate_model_trainer(train_arr, test_arr))
+    print(modeltrainer.initiate_model_trainer(X_train, y_train, X_test, y_test))
@@ -9,11 +9,16 @@ from sklearn.pipeline import Pipeline
 from sklearn.preprocessing import OneHotEncoder, StandardScaler
 from src.exception import CustomException
 from src.logger import logging
-from src.utils import save_object
+from src.utils import save_object, load_frame
+from src.pipeline.fast_transform import compile_preprocessor
 
 @dataclass
 class DataTransformationConfig:
     preprocessor_obj_file_path = os.path.join('artifacts', "preprocessor.pkl")
+    # keep the one-hot block sparse (CSR feature matrices) instead of densifying it
+    sparse_output = os.environ.get("SPARSE_FEATURES", "1") == "1"
+    # flat export of the fitted imputer/encoder/scaler parameters (see CompiledPreprocessor.save)
+    preprocessor_params_file_path = os.path.join('artifacts', "preprocessor_params.npz")
 
 class DataTransformation:
     def __init__(self):
@@ -37,10 +42,11 @@ class DataTransformation:
             logging.info(f"Numerical columns: {numerical_columns}")
             logging.info(f"Categorical columns: {categorical_columns}")
 
+            # sparse_threshold=1.0: the stacked output stays CSR whenever the one-hot block is sparse
             preprocessor = ColumnTransformer([
                 ("cat_pipeline", cat_pipeline, categorical_columns),
                 ("num_pipeline", num_pipeline, numerical_columns)
-            ])
+            ], sparse_threshold=1.0 if self.data_transformation_config.sparse_output else 0.0)
 
             return preprocessor
 
@@ -49,8 +55,9 @@ class DataTransformation:
 
     def initiate_data_transformation(self, train_path, test_path):
         try:
-            train_df = pd.read_csv(train_path)
-            test_df = pd.read_csv(test_path)
+            # Feather/Parquet splits are memory-mapped and keep their dtypes; CSV is re-parsed
+            train_df = load_frame(train_path)
+            test_df = load_frame(test_path)
 
             logging.info("Read train and test data completed")
             preprocessing_obj = self.get_data_transformer_object()
@@ -65,11 +72,12 @@ class DataTransformation:
 
             logging.info("Applying preprocessing on train and test dataframes")
 
-            input_feature_train_arr = preprocessing_obj.fit_transform(input_feature_train_df)
-            input_feature_test_arr = preprocessing_obj.transform(input_feature_test_df)
+            # features and target are returned separately: no np.c_ copy of the feature matrix
+            X_train = preprocessing_obj.fit_transform(input_feature_train_df)
+            X_test = preprocessing_obj.transform(input_feature_test_df)
 
-            train_arr = np.c_[input_feature_train_arr, np.array(target_feature_train_df)]
-            test_arr = np.c_[input_feature_test_arr, np.array(target_feature_test_df)]
+            y_train = target_feature_train_df.to_numpy(dtype=np.float64)
+            y_test = target_feature_test_df.to_numpy(dtype=np.float64)
 
             logging.info("Saved preprocessing object")
 
@@ -78,7 +86,11 @@ class DataTransformation:
                 obj=preprocessing_obj
             )
 
-            return (train_arr, test_arr, self.data_transformation_config.preprocessor_obj_file_path)
+            plan = compile_preprocessor(preprocessing_obj)
+            if plan is not None:
+                plan.save(self.data_transformation_config.preprocessor_params_file_path)
+
+            return (X_train, y_train, X_test, y_test, self.data_transformation_config.preprocessor_obj_file_path)
 
         except Exception as e:
             raise CustomException(e, sys)
@@ -1,3 +1,4 @@
+import json
 import os
 import sys
 from dataclasses import dataclass
@@ -13,60 +14,92 @@ from sklearn.tree import DecisionTreeRegressor
 from xgboost import XGBRegressor
 from src.exception import CustomException
 from src.logger import logging
-from src.utils import save_object, evaluate_models
+from src.utils import save_object, evaluate_models, SEARCH_STRATEGIES
 
 @dataclass
 class ModelTrainerConfig:
-    trained_model_file_path = os.path.join("artifacts", "model.pkl")
+    # "pkl" (dill), "joblib" (memory-mappable arrays) or "ubj" (XGBoost native,
+    # used only when XGBRegressor wins - other models fall back to joblib).
+    # The file actually written is recorded in model_pointer_path, which
+    # ModelRegistry follows unless MODEL_FILE is set.
+    model_format = os.environ.get("MODEL_FORMAT", "pkl")
+    trained_model_file_path = os.path.join("artifacts", f"model.{model_format}")
+    model_pointer_path = os.path.join("artifacts", "model_pointer.json")
+    # fitted searches keyed by (model, params, data hash); None disables the cache
+    search_cache_dir = os.path.join("artifacts", "search_cache")
+    # total cores shared by all model searches (None = all cores)
+    n_jobs = int(os.environ["TRAIN_N_JOBS"]) if os.environ.get("TRAIN_N_JOBS") else None
+    # "grid" | "halving" | "random" | "early_stopping" (see src.utils.SEARCH_STRATEGIES)
+    search_strategy = os.environ.get("TRAIN_SEARCH_STRATEGY", "grid")
+    # "random" strategy budgets: candidates per model and seconds per model
+    search_n_iter = int(os.environ.get("TRAIN_SEARCH_N_ITER", 10))
+    search_time_budget = float(os.environ["TRAIN_SEARCH_TIME_BUDGET"]) if os.environ.get("TRAIN_SEARCH_TIME_BUDGET") else None
+    # models that get a dense copy of a sparse feature matrix. XGBoost reads
+    # entries missing from a CSR matrix as "missing", not 0, which would not
+    # match the dense rows it sees at prediction time.
+    dense_only_models = ("XGBRegressor",)
+    # "grid"/"random": split the CV folds once and share them, memory-mapped,
+    # across every model's search (src.utils.CVWorkspace)
+    shared_cv = os.environ.get("TRAIN_SHARED_CV", "0") == "1"
+    # also save the best TRAIN_TOP_K models (by test R²) under artifacts/models/
+    # with a manifest, for SERVING_MODE=ensemble / shadow; 1 = best model only
+    top_k_models = int(os.environ.get("TRAIN_TOP_K", 1))
+    top_models_dir = os.path.join("artifacts", "models")
+    top_models_manifest_path = os.path.join("artifacts", "models", "manifest.json")
+    min_r2_score = 0.6
 
 class ModelTrainer:
     def __init__(self):
         self.model_trainer_config = ModelTrainerConfig()
 
-    def initiate_model_trainer(self, train_array, test_array):
-        try:
-            logging.info("Splitting training and test input data")
-            X_train, y_train, X_test, y_test = (
-                train_array[:, :-1],
-                train_array[:, -1],
-                test_array[:, :-1],
-                test_array[:, -1],
-            )
+    def get_models_and_params(self):
+        models = {
+            "Random Forest": RandomForestRegressor(),
+            "Decision Tree": DecisionTreeRegressor(),
+            "Gradient Boosting": GradientBoostingRegressor(),
+            # "Linear Regression": LinearRegression(),
+            "KNN Regressor": KNeighborsRegressor(),
+            "XGBRegressor": XGBRegressor(),
+            "AdaBoost Regressor": AdaBoostRegressor(),
+        }
+
+        params = {
+            "Decision Tree": {'criterion': ['squared_error', 'friedman_mse']},
+            "Random Forest": {'n_estimators': [64, 128, 256]},
+            "Gradient Boosting": {
+                'learning_rate': [0.1, 0.05],
+                'n_estimators': [64, 128],
+            },
+            # "Linear Regression": {},
+            "KNN Regressor": {'n_neighbors': [3, 5, 7]},
+            "XGBRegressor": {
+                'learning_rate': [0.1, 0.05],
+                'n_estimators': [64, 128],
+            },
+            "AdaBoost Regressor": {
+                'learning_rate': [0.1, 0.05],
+                'n_estimators': [64, 128],
+            },
+        }
 
-            models = {
-                "Random Forest": RandomForestRegressor(),
-                "Decision Tree": DecisionTreeRegressor(),
-                "Gradient Boosting": GradientBoostingRegressor(),
-                # "Linear Regression": LinearRegression(),
-                "KNN Regressor": KNeighborsRegressor(),
-                "XGBRegressor": XGBRegressor(),
-                "AdaBoost Regressor": AdaBoostRegressor(),
-            }
-
-            params = {
-                "Decision Tree": {'criterion': ['squared_error', 'friedman_mse']},
-                "Random Forest": {'n_estimators': [64, 128, 256]},
-                "Gradient Boosting": {
-                    'learning_rate': [0.1, 0.05],
-                    'n_estimators': [64, 128],
-                },
-                # "Linear Regression": {},
-                "KNN Regressor": {'n_neighbors': [3, 5, 7]},
-                "XGBRegressor": {
-                    'learning_rate': [0.1, 0.05],
-                    'n_estimators': [64, 128],
-                },
-                "AdaBoost Regressor": {
-                    'learning_rate': [0.1, 0.05],
-                    'n_estimators': [64, 128],
-                },
-            }
+        return models, params
+
+    def initiate_model_trainer(self, X_train, y_train, X_test, y_test):
+        try:
+            models, params = self.get_models_and_params()
 
             # ✅ Now returns both trained models and scores
             model_report, trained_models = evaluate_models(
                 X_train=X_train, y_train=y_train,
                 X_test=X_test, y_test=y_test,
-                models=models, param=params
+                models=models, param=params,
+                n_jobs=self.model_trainer_config.n_jobs,
+                cache_dir=self.model_trainer_config.search_cache_dir,
+                strategy=self.model_trainer_config.search_strategy,
+                n_iter=self.model_trainer_config.search_n_iter,
+                time_budget=self.model_trainer_config.search_time_budget,
+                dense_only=self.model_trainer_config.dense_only_models,
+                shared_cv=self.model_trainer_config.shared_cv,
             )
 
             best_model_name = max(model_report, key=model_report.get)
@@ -75,7 +108,7 @@ class ModelTrainer:
 
             logging.info(f"Best model: {best_model_name} | R2 Score: {best_model_score}")
 
-            if best_model_score < 0.6:
+            if best_model_score < self.model_trainer_config.min_r2_score:
                 raise CustomException("No good model found (R2 < 0.6)")
             
             # just extra-----------------
@@ -86,13 +119,162 @@ class ModelTrainer:
 
             # ---------------------------
 
+            if self.model_trainer_config.model_format == "ubj" and not isinstance(best_model, XGBRegressor):
+                self.model_trainer_config.trained_model_file_path = os.path.join("artifacts", "model.joblib")
+
             save_object(
                 file_path=self.model_trainer_config.trained_model_file_path,
                 obj=best_model
             )
+            self.save_model_pointer(best_model_name, best_model_score)
+
+            if self.model_trainer_config.top_k_models > 1:
+                self.save_top_models(model_report, trained_models)
+            else:
+                # no stale ensemble/shadow members from an earlier TRAIN_TOP_K run next to the new model
+                self.remove_top_models()
 
+            if best_model_name in self.model_trainer_config.dense_only_models and hasattr(X_test, "toarray"):
+                X_test = X_test.toarray()
             predicted = best_model.predict(X_test)
             return r2_score(y_test, predicted)
 
         except Exception as e:
             raise CustomException(e, sys)
+
+    def save_model_pointer(self, model_name, r2_score_value):
+        """
+        Records which file holds the served model in artifacts/model_pointer.json,
+        replaced atomically so a reloading worker never reads half of it.
+        """
+        try:
+            config = self.model_trainer_config
+            file_name = os.path.basename(config.trained_model_file_path)
+            tmp_path = f"{config.model_pointer_path}.tmp"
+            with open(tmp_path, "w") as file_obj:
+                json.dump({"file": file_name, "name": model_name, "r2_score": r2_score_value}, file_obj, indent=2)
+            os.replace(tmp_path, config.model_pointer_path)
+
+            served = os.environ.get("MODEL_FILE")
+            if served and served != file_name:
+                logging.warning(f"MODEL_FILE={served} overrides {config.model_pointer_path}: "
+                                f"serving will not load the new {file_name}")
+        except Exception as e:
+            raise CustomException(e, sys)
+
+    def save_top_models(self, model_report, trained_models):
+        """
+        Saves the top_k_models best models that clear min_r2_score to
+        artifacts/models/<rank>_<name>.<format> and lists them, best first,
+        in artifacts/models/manifest.json (paths relative to artifacts/).
+        """
+        try:
+            config = self.model_trainer_config
+            ranked = sorted(model_report, key=model_report.get, reverse=True)
+            ranked = [name for name in ranked if model_report[name] >= config.min_r2_score][:config.top_k_models]
+
+            entries = []
+            for rank, model_name in enumerate(ranked, start=1):
+                model = trained_models[model_name]
+                extension = config.model_format
+                if extension == "ubj" and not isinstance(model, XGBRegressor):
+                    extension = "joblib"
+                file_name = f"{rank}_{model_name.lower().replace(' ', '_')}.{extension}"
+                save_object(file_path=os.path.join(config.top_models_dir, file_name), obj=model)
+                entries.append({
+                    "rank": rank,
+                    "name": model_name,
+                    "file": os.path.join(os.path.basename(config.top_models_dir), file_name),
+                    "r2_score": model_report[model_name],
+                })
+
+            tmp_path = f"{config.top_models_manifest_path}.tmp"
+            with open(tmp_path, "w") as file_obj:
+                json.dump({"models": entries}, file_obj, indent=2)
+            os.replace(tmp_path, config.top_models_manifest_path)
+
+            # models of an earlier run (other ranks, names or formats) once the manifest no longer lists them
+            current = {os.path.basename(entry["file"]) for entry in entries}
+            for file_name in os.listdir(config.top_models_dir):
+                if file_name.split("_", 1)[0].isdigit() and file_name not in current:
+                    os.remove(os.path.join(config.top_models_dir, file_name))
+            logging.info(f"Saved top {len(entries)} models: {[entry['name'] for entry in entries]}")
+            return entries
+
+        except Exception as e:
+            raise CustomException(e, sys)
+
+    def remove_top_models(self):
+        """Deletes artifacts/models/ (manifest first, so serving stops listing its models)."""
+        try:
+            import shutil
+
+            config = self.model_trainer_config
+            if os.path.exists(config.top_models_manifest_path):
+                os.remove(config.top_models_manifest_path)
+            if os.path.isdir(config.top_models_dir):
+                shutil.rmtree(config.top_models_dir)
+                logging.info(f"Removed {config.top_models_dir} (TRAIN_TOP_K={config.top_k_models})")
+
+        except Exception as e:
+            raise CustomException(e, sys)
+
+    def compare_search_strategies(self, X_train, y_train, X_test, y_test, strategies=SEARCH_STRATEGIES):
+        """
+        Runs every search strategy on the same data (without the search cache)
+        and reports wall-clock time, number of fits and best test R² for each,
+        to trade training time against accuracy.
+        """
+        try:
+            import time
+
+            models, params = self.get_models_and_params()
+
+            comparison = {}
+            for strategy in strategies:
+                started = time.perf_counter()
+                report, _, stats = evaluate_models(
+                    X_train=X_train, y_train=y_train,
+                    X_test=X_test, y_test=y_test,
+                    models=models, param=params,
+                    n_jobs=self.model_trainer_config.n_jobs,
+                    cache_dir=None,
+                    strategy=strategy,
+                    n_iter=self.model_trainer_config.search_n_iter,
+                    time_budget=self.model_trainer_config.search_time_budget,
+                    dense_only=self.model_trainer_config.dense_only_models,
+                    return_stats=True,
+                    shared_cv=self.model_trainer_config.shared_cv,
+                )
+                best_model_name = max(report, key=report.get)
+                comparison[strategy] = {
+                    "wall_seconds": time.perf_counter() - started,
+                    "n_fits": sum(model_stats["n_fits"] for model_stats in stats.values()),
+                    "best_model": best_model_name,
+                    "best_r2": report[best_model_name],
+                    "models": stats,
+                }
+
+            print(f"\n{'strategy':<16}{'wall (s)':>10}{'fits':>8}{'best R²':>10}  best model")
+            for strategy, row in comparison.items():
+                print(f"{strategy:<16}{row['wall_seconds']:>10.1f}{row['n_fits']:>8}{row['best_r2']:>10.4f}  {row['best_model']}")
+
+            return comparison
+
+        except Exception as e:
+            raise CustomException(e, sys)
+
+
+# --------------------------------------------
+# Compares the search strategies on the current train/test split:
+#   python -m src.components.model_trainer
+# --------------------------------------------
+if __name__ == "__main__":
+    from src.components.data_transformation import DataTransformation
+    from src.components.data_ingestion import DataIngestionConfig
+
+    ingestion_config = DataIngestionConfig()
+    X_train, y_train, X_test, y_test, _ = DataTransformation().initiate_data_transformation(
+        ingestion_config.train_data_path, ingestion_config.test_data_path
+    )
+    ModelTrainer().compare_search_strategies(X_train, y_train, X_test, y_test)
@@ -0,0 +1,237 @@
+import json
+import multiprocessing
+import os
+import sys
+import time
+from dataclasses import dataclass
+import numpy as np
+import pandas as pd
+from sklearn.base import clone
+from sklearn.metrics import r2_score
+from sklearn.model_selection import KFold, ParameterGrid
+from src.exception import CustomException
+from src.logger import logging
+from src.components.data_ingestion import DataIngestionConfig, INGESTION_DTYPES, peak_rss_mb
+from src.components.data_transformation import DataTransformation
+from src.components.model_trainer import ModelTrainer
+
+TARGET_COLUMN = "math_score"
+SCORE_COLUMNS = ["math_score", "reading_score", "writing_score"]
+
+
+@dataclass
+class TrainingProfilerConfig:
+    report_file_path = os.path.join("artifacts", "training_profile.json")
+    summary_file_path = os.path.join("artifacts", "training_profile.txt")
+    # dataset sizes, as multiples of stud.csv; scale 1 is the real data
+    scales = (1, 10, 100)
+    # same folds as the GridSearchCV(cv=3) in src.utils._run_search
+    cv_folds = 3
+    # above scale 1 only each grid's first combination is profiled,
+    # enough to show how the estimator scales without the full grid cost
+    full_grid_max_scale = 1
+
+
+def timed(fn):
+    """Runs fn() and returns (result, wall seconds, CPU seconds across all threads)."""
+    wall, cpu = time.perf_counter(), time.process_time()
+    result = fn()
+    return result, time.perf_counter() - wall, time.process_time() - cpu
+
+
+# (X_train, y_train, X_test, y_test) in the child process, set by the pool initializer
+_dataset = None
+
+
+def _set_dataset(*dataset):
+    global _dataset
+    _dataset = dataset
+
+
+def _profile_combination(model, params, cv_folds):
+    """CV fits, refit and test predict for one combination (runs in a child process)."""
+    X_train, y_train, X_test, y_test = _dataset
+    baseline_rss = peak_rss_mb()
+    estimator = clone(model).set_params(**params)
+    folds = []
+    cpu_seconds, wall_seconds = 0.0, 0.0
+    for train_index, val_index in KFold(n_splits=cv_folds).split(X_train):
+        fold_model = clone(estimator)
+        _, fit_seconds, fit_cpu = timed(lambda: fold_model.fit(X_train[train_index], y_train[train_index]))
+        predicted, predict_seconds, predict_cpu = timed(lambda: fold_model.predict(X_train[val_index]))
+        folds.append({
+            "fit_seconds": fit_seconds,
+            "predict_seconds": predict_seconds,
+            "r2": r2_score(y_train[val_index], predicted),
+        })
+        cpu_seconds += fit_cpu + predict_cpu
+        wall_seconds += fit_seconds + predict_seconds
+
+    _, fit_seconds, fit_cpu = timed(lambda: estimator.fit(X_train, y_train))
+    predicted, predict_seconds, predict_cpu = timed(lambda: estimator.predict(X_test))
+    cpu_seconds += fit_cpu + predict_cpu
+    wall_seconds += fit_seconds + predict_seconds
+
+    peak_rss = peak_rss_mb()
+    return {
+        "params": params,
+        "cv_folds": folds,
+        "cv_r2": float(np.mean([fold["r2"] for fold in folds])),
+        "fit_seconds": fit_seconds,
+        "predict_seconds": predict_seconds,
+        "test_r2": r2_score(y_test, predicted),
+        # growth of the child's peak RSS over its size once the data arrived
+        "peak_memory_mb": peak_rss - baseline_rss if peak_rss is not None else None,
+        "cpu_seconds": cpu_seconds,
+        "cores_used": cpu_seconds / wall_seconds if wall_seconds else None,
+    }
+
+
+class TrainingProfiler:
+    """
+    Fits every model and parameter combination of ModelTrainer's grids the
+    way the grid search does (3-fold CV, then a refit on the full training
+    set) and records, per combination: per-fold fit/predict times and R²,
+    full fit and test predict time, peak memory (RSS growth of the fresh
+    child process that runs the combination) and cores used (CPU time /
+    wall time). Repeats at larger synthetic dataset sizes to show how each
+    estimator scales.
+    """
+    def __init__(self, config=None):
+        self.config = config or TrainingProfilerConfig()
+        self.model_trainer = ModelTrainer()
+
+    def synthetic_split(self, scale, seed=42):
+        """
+        stud.csv resampled to `scale` times its size, scores jittered so the
+        extra rows are not exact duplicates, then split and transformed like
+        the real pipeline.
+        """
+        try:
+            df = pd.read_csv(DataIngestionConfig().source_data_path, dtype=INGESTION_DTYPES)
+            if scale > 1:
+                rng = np.random.RandomState(seed)
+                df = df.iloc[rng.randint(0, len(df), len(df) * scale)].reset_index(drop=True)
+                for column in SCORE_COLUMNS:
+                    jitter = rng.normal(0, 2, len(df))
+                    df[column] = np.clip(df[column].astype(np.float64) + jitter, 0, 100)
+
+            test_size = DataIngestionConfig().test_size
+            test_mask = np.random.RandomState(seed).rand(len(df)) < test_size
+            train_df, test_df = df[~test_mask], df[test_mask]
+
+            preprocessor = DataTransformation().get_data_transformer_object()
+            X_train = preprocessor.fit_transform(train_df.drop(columns=[TARGET_COLUMN]))
+            X_test = preprocessor.transform(test_df.drop(columns=[TARGET_COLUMN]))
+            y_train = train_df[TARGET_COLUMN].to_numpy(dtype=np.float64)
+            y_test = test_df[TARGET_COLUMN].to_numpy(dtype=np.float64)
+            return X_train, y_train, X_test, y_test
+        except Exception as e:
+            raise CustomException(e, sys)
+
+    def profile_combination(self, model, params, X_train, y_train, X_test, y_test):
+        # a fresh child process per combination, so its peak RSS belongs to this fit alone.
+        # The data goes through the initializer: a forked child inherits it without
+        # a pickled copy, which would otherwise set the peak before fitting starts
+        with multiprocessing.Pool(processes=1, initializer=_set_dataset,
+                                  initargs=(X_train, y_train, X_test, y_test)) as pool:
+            return pool.apply(_profile_combination, (model, params, self.config.cv_folds))
+
+    def run(self, scales=None, model_names=None):
+        try:
+            scales = scales or self.config.scales
+            models, params = self.model_trainer.get_models_and_params()
+            dense_only = self.model_trainer.model_trainer_config.dense_only_models
+            model_names = model_names or list(models)
+
+            rows = []
+            for scale in scales:
+                X_train, y_train, X_test, y_test = self.synthetic_split(scale)
+                print(f"\nscale {scale}x: {X_train.shape[0]} train rows, {X_test.shape[0]} test rows")
+                for model_name in model_names:
+                    X_fit, X_eval = X_train, X_test
+                    if model_name in dense_only and hasattr(X_train, "toarray"):
+                        X_fit, X_eval = X_train.toarray(), X_test.toarray()
+
+                    grid = list(ParameterGrid(params.get(model_name, {})))
+                    if scale > self.config.full_grid_max_scale:
+                        grid = grid[:1]
+                    for combination in grid:
+                        try:
+                            row = self.profile_combination(models[model_name], combination, X_fit, y_train, X_eval, y_test)
+                        except Exception as e:
+                            # e.g. a grid value the installed sklearn rejects; keep profiling the rest
+                            logging.warning(f"Profiling {model_name}{combination} failed: {e}")
+                            row = {"params": combination, "error": str(e)}
+                        row.update(model=model_name, scale=scale, n_train_rows=X_fit.shape[0])
+                        rows.append(row)
+                        if "error" not in row:
+                            print(f"  {model_name} {combination}: fit {row['fit_seconds']:.2f}s, "
+                                  f"{row['cores_used']:.1f} cores, cv R² {row['cv_r2']:.4f}")
+
+            report = {
+                "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                "cpu_count": os.cpu_count(),
+                "scales": list(scales),
+                "cv_folds": self.config.cv_folds,
+                "results": rows,
+            }
+            summary = self.summary(rows, scales)
+
+            os.makedirs(os.path.dirname(self.config.report_file_path), exist_ok=True)
+            with open(self.config.report_file_path, "w") as file_obj:
+                json.dump(report, file_obj, indent=2, default=float)
+            with open(self.config.summary_file_path, "w") as file_obj:
+                file_obj.write(summary)
+            print("\n" + summary)
+            logging.info(f"Training profile written to {self.config.report_file_path}")
+            return report
+        except Exception as e:
+            raise CustomException(e, sys)
+
+    def summary(self, rows, scales):
+        lines = [f"{'scale':>5}  {'model':<20}{'params':<44}{'fold fit s':>11}{'fold pred ms':>13}"
+                 f"{'fit s':>8}{'peak MB':>9}{'cores':>7}{'cv R²':>8}"]
+        for row in rows:
+            params = ", ".join(f"{k}={v}" for k, v in row["params"].items())
+            if "error" in row:
+                lines.append(f"{row['scale']:>5}  {row['model']:<20}{params:<44}  failed: {row['error'][:60]}")
+                continue
+            fold_fit = np.mean([fold["fit_seconds"] for fold in row["cv_folds"]])
+            fold_predict = np.mean([fold["predict_seconds"] for fold in row["cv_folds"]]) * 1000
+            peak = f"{row['peak_memory_mb']:.1f}" if row["peak_memory_mb"] is not None else "n/a"
+            lines.append(f"{row['scale']:>5}  {row['model']:<20}{params:<44}{fold_fit:>11.3f}{fold_predict:>13.2f}"
+                         f"{row['fit_seconds']:>8.2f}{peak:>9}{row['cores_used']:>7.1f}{row['cv_r2']:>8.4f}")
+
+        # fit time of each model's first combination, relative to the smallest scale
+        lines.append("")
+        lines.append(f"{'model':<20}" + "".join(f"{f'{scale}x fit s':>14}" for scale in scales) + "  growth")
+        first = {}
+        for row in rows:
+            if "error" not in row:
+                first.setdefault((row["model"], row["scale"]), row["fit_seconds"])
+        for model_name in dict.fromkeys(row["model"] for row in rows):
+            times = [first.get((model_name, scale)) for scale in scales]
+            cells = "".join(f"{t:>14.3f}" if t is not None else f"{'n/a':>14}" for t in times)
+            growth = f"{times[-1] / times[0]:.1f}x" if None not in (times[0], times[-1]) and times[0] > 0 else "n/a"
+            lines.append(f"{model_name:<20}{cells}  {growth}")
+        return "\n".join(lines) + "\n"
+
+
+# --------------------------------------------
+# Profiles every model/parameter combination and writes
+# artifacts/training_profile.json and training_profile.txt:
+#   python -m src.components.training_profiler [--scales 1,10,100] [--models "Random Forest,KNN Regressor"]
+# --------------------------------------------
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--scales", default=",".join(map(str, TrainingProfilerConfig.scales)))
+    parser.add_argument("--models", help="comma-separated model names (default: all)")
+    args = parser.parse_args()
+
+    TrainingProfiler().run(
+        scales=[int(scale) for scale in args.scales.split(",")],
+        model_names=args.models.split(",") if args.models else None,
+    )
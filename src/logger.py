@@ -1,6 +1,11 @@
+import atexit
+import copy
+import json
 import logging
+import logging.handlers
 import os
-from datetime import datetime
+import queue
+from datetime import datetime, timezone
 
 # Get the directory of this file
 LOG_DIR = os.path.dirname(os.path.abspath(__file__))
@@ -8,17 +13,119 @@ LOG_DIR = os.path.dirname(os.path.abspath(__file__))
 # Go one level up (project root)
 ROOT_DIR = os.path.dirname(LOG_DIR)
 
-LOG_FILE = f"{datetime.now().strftime('%d_%m_%Y_%H_%M_%S')}.log"
+LOG_FILE = "app.log"
 logs_path = os.path.join(ROOT_DIR, "logs")
-os.makedirs(logs_path, exist_ok=True)
 
-LOG_FILE_PATH = os.path.join(logs_path, LOG_FILE)
+# one file appended to by every process (app, training, benchmarks, tools);
+# LOG_FILE_PATH points it elsewhere
+LOG_FILE_PATH = os.environ.get("LOG_FILE_PATH") or os.path.join(logs_path, LOG_FILE)
+# "json": one JSON object per line; "text": the original line format
+LOG_FORMAT = os.environ.get("LOG_FORMAT", "json")
+LOG_LEVEL = os.environ.get("LOG_LEVEL", "INFO").upper()
+# hand records to a background thread instead of writing the file on the caller's thread
+LOG_ASYNC = os.environ.get("LOG_ASYNC", "1") == "1"
 
-logging.basicConfig(
-    filename=LOG_FILE_PATH,
-    format="[%(asctime)s ] %(lineno)d %(name)s - %(levelname)s - %(message)s",
-    level=logging.INFO,
-)
+TEXT_FORMAT = "[%(asctime)s ] %(lineno)d %(name)s - %(levelname)s - %(message)s"
+
+
+class JsonFormatter(logging.Formatter):
+    """
+    One JSON object per record. Fields passed with log_event (or
+    extra={"fields": {...}}) are merged into the object.
+    """
+    def format(self, record):
+        event = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "module": record.module,
+            "line": record.lineno,
+            "pid": record.process,
+        }
+        event.update(getattr(record, "fields", None) or {})
+        if record.exc_info:
+            event["exception"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            # rendered by _QueueHandler.prepare before the record was queued
+            event["exception"] = record.exc_text
+        return json.dumps(event, default=str)
+
+
+class _QueueHandler(logging.handlers.QueueHandler):
+    """
+    QueueHandler.prepare() formats the whole record into its message and
+    drops exc_info, so the JSON formatter on the listener thread would find
+    the traceback inside "message" and none in "exception". This keeps the
+    message unformatted and only renders the traceback into exc_text (the
+    traceback objects themselves cannot be kept for another thread).
+    """
+    _exception_formatter = logging.Formatter()
+
+    def prepare(self, record):
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            if not record.exc_text:
+                record.exc_text = self._exception_formatter.formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+_event_logger = logging.getLogger("src")
+
+
+def log_event(event, level=logging.INFO, **fields):
+    """
+    Logs a structured event, e.g. log_event("prediction", records=3).
+    Cheap when the level is disabled: nothing is formatted or queued.
+    """
+    if _event_logger.isEnabledFor(level):
+        _event_logger.log(level, event, extra={"fields": fields}, stacklevel=2)
+
+
+def _file_handler():
+    os.makedirs(os.path.dirname(LOG_FILE_PATH), exist_ok=True)
+    handler = logging.FileHandler(LOG_FILE_PATH)
+    handler.setFormatter(JsonFormatter() if LOG_FORMAT == "json" else logging.Formatter(TEXT_FORMAT))
+    return handler
+
+
+_listener = None
+
+
+def _start_listener(queue_handler):
+    global _listener
+    queue_handler.queue = queue.SimpleQueue()
+    _listener = logging.handlers.QueueListener(queue_handler.queue, _file_handler(), respect_handler_level=True)
+    _listener.start()
+
+
+def _stop_listener():
+    if _listener is not None:
+        _listener.stop()
+
+
+def _setup():
+    root = logging.getLogger()
+    root.setLevel(LOG_LEVEL)
+    if not LOG_ASYNC:
+        root.addHandler(_file_handler())
+        return
+
+    queue_handler = _QueueHandler(queue.SimpleQueue())
+    root.addHandler(queue_handler)
+    _start_listener(queue_handler)
+    # flush whatever is still queued on interpreter exit
+    atexit.register(_stop_listener)
+    # the listener thread does not survive fork() (e.g. gunicorn preload):
+    # give each child its own queue and listener
+    if hasattr(os, "register_at_fork"):
+        os.register_at_fork(after_in_child=lambda: _start_listener(queue_handler))
+
+
+_setup()
 
 if __name__ == "__main__":
     logging.info("Logging has started")
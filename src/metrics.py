@@ -0,0 +1,142 @@
+import bisect
+import os
+import threading
+from dataclasses import dataclass
+
+# latency buckets in seconds, from sub-millisecond cache hits to slow batch requests
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+
+@dataclass
+class MetricsConfig:
+    # METRICS=0 turns every counter/histogram update into a no-op
+    enabled: bool = os.environ.get("METRICS", "1") == "1"
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names, values, extra=()):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in list(zip(names, values)) + list(extra)]
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class Counter:
+    def __init__(self, name, help_text, labels=(), config=None):
+        self.name, self.help_text, self.labels = name, help_text, tuple(labels)
+        self.config = config or MetricsConfig()
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *label_values, amount=1):
+        if not self.config.enabled:
+            return
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for label_values, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_format_labels(self.labels, label_values)} {value}")
+        return lines
+
+
+class Histogram:
+    def __init__(self, name, help_text, labels=(), buckets=DEFAULT_BUCKETS, config=None):
+        self.name, self.help_text, self.labels = name, help_text, tuple(labels)
+        self.config = config or MetricsConfig()
+        self.buckets = tuple(buckets)
+        # label values -> [per-bucket counts (+Inf last), sum, count]
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, *label_values):
+        if not self.config.enabled:
+            return
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            entry = self._values.get(label_values)
+            if entry is None:
+                entry = self._values[label_values] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            entry[0][index] += 1
+            entry[1] += value
+            entry[2] += 1
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for label_values, (counts, total, count) in sorted(self._values.items()):
+                cumulative = 0
+                for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                    cumulative += bucket_count
+                    le = "+Inf" if bound == float("inf") else repr(bound)
+                    lines.append(f"{self.name}_bucket{_format_labels(self.labels, label_values, [('le', le)])} {cumulative}")
+                lines.append(f"{self.name}_sum{_format_labels(self.labels, label_values)} {total}")
+                lines.append(f"{self.name}_count{_format_labels(self.labels, label_values)} {count}")
+        return lines
+
+
+class MetricsRegistry:
+    """
+    Minimal Prometheus text-format registry (no client library needed).
+
+    Counters and histograms are updated on the request path; gauges are
+    read at scrape time from collector callbacks returning
+    {metric name: value}, so existing stats() methods can be exported
+    without extra bookkeeping. Values are per worker process.
+    """
+    def __init__(self, config=None):
+        self.config = config or MetricsConfig()
+        self._metrics = []
+        self._collectors = []
+
+    @property
+    def enabled(self):
+        return self.config.enabled
+
+    def counter(self, name, help_text, labels=()):
+        metric = Counter(name, help_text, labels, self.config)
+        self._metrics.append(metric)
+        return metric
+
+    def histogram(self, name, help_text, labels=(), buckets=DEFAULT_BUCKETS):
+        metric = Histogram(name, help_text, labels, buckets, self.config)
+        self._metrics.append(metric)
+        return metric
+
+    def register_collector(self, collector):
+        self._collectors.append(collector)
+
+    def render(self):
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        for collector in self._collectors:
+            for name, value in sorted(collector().items()):
+                if isinstance(value, bool) or not isinstance(value, (int, float)) or value is None:
+                    continue
+                lines.append(f"# TYPE {name} gauge")
+                lines.append(f"{name} {value}")
+        return "\n".join(lines) + "\n"
+
+
+# one registry per worker process
+metrics = MetricsRegistry()
+
+http_requests_total = metrics.counter(
+    "http_requests_total", "HTTP requests handled, by endpoint, method and status.", ("endpoint", "method", "status"))
+http_request_duration_seconds = metrics.histogram(
+    "http_request_duration_seconds", "HTTP request latency, by endpoint.", ("endpoint",))
+predictions_total = metrics.counter(
+    "predictions_total", "Records scored by PredictPipeline.predict_rows.")
+model_load_seconds = metrics.histogram(
+    "model_load_seconds", "Time to deserialize an artifact, by file.", ("artifact",),
+    buckets=(0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0))
+input_validation_total = metrics.counter(
+    "input_validation_total", "Records checked against the input schema, by result (ok or rejection reason).",
+    ("result",))
+input_validation_seconds = metrics.histogram(
+    "input_validation_seconds", "Time to validate one record against the input schema.",
+    buckets=(1e-06, 2.5e-06, 5e-06, 1e-05, 2.5e-05, 5e-05, 0.0001, 0.001))
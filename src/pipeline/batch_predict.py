@@ -0,0 +1,187 @@
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+import numpy as np
+import pandas as pd
+from src.exception import CustomException
+from src.logger import log_event
+from src.utils import FrameWriter, iter_frame_chunks
+from src.pipeline.model_registry import model_registry
+from src.pipeline.predict_pipeline import (
+    CATEGORICAL_FEATURES, NUMERICAL_FEATURES, FEATURE_COLUMNS, PredictPipeline, get_input_schema,
+)
+
+
+@dataclass
+class BatchPredictConfig:
+    # rows read, sent to a worker and written per chunk
+    chunk_rows: int = int(os.environ.get("BATCH_PREDICT_CHUNK_ROWS", 50_000))
+    # worker processes; 0 = one per core
+    workers: int = int(os.environ.get("BATCH_PREDICT_WORKERS", 0))
+    # chunks in flight per worker: memory stays bounded at roughly
+    # workers * max_pending_per_worker chunks, whatever the file size
+    max_pending_per_worker: int = 2
+    prediction_column: str = "predicted_math_score"
+    error_column: str = "prediction_error"
+
+
+def prepare_chunk(df, schema=None):
+    """
+    Vectorized normalize_record: categoricals in their fitted spelling and
+    float scores, checked against the input schema.
+    Returns (features of the valid rows, per-row error message or NA).
+    """
+    missing_columns = [column for column in FEATURE_COLUMNS if column not in df.columns]
+    if missing_columns:
+        raise ValueError(f"input is missing columns: {missing_columns}")
+
+    features = pd.DataFrame(index=df.index)
+    errors = pd.Series(pd.NA, index=df.index, dtype="string")
+    for column in CATEGORICAL_FEATURES:
+        raw = df[column].astype("string")
+        errors = errors.mask(errors.isna() & (raw.isna() | (raw == "")), f"missing field: {column}")
+        values = raw.str.lower()
+        if schema is not None and column in schema.lookups:
+            fitted = raw.str.casefold().map(schema.lookups[column]).astype("string")
+            unknown = raw.notna() & (raw != "") & fitted.isna()
+            if schema.strict:
+                errors = errors.mask(errors.isna() & unknown, f"unknown {column}")
+            values = fitted.fillna(values)
+        features[column] = values
+    for column in NUMERICAL_FEATURES:
+        values = pd.to_numeric(df[column], errors="coerce").astype(np.float64)
+        errors = errors.mask(errors.isna() & values.isna(), f"{column} must be a number")
+        if schema is not None and schema.strict:
+            config = schema.config
+            out_of_range = (values < config.score_min) | (values > config.score_max)
+            errors = errors.mask(errors.isna() & out_of_range,
+                                 f"{column} must be between {config.score_min:g} and {config.score_max:g}")
+        features[column] = values
+
+    valid = errors.isna().to_numpy()
+    features = features[valid].astype({column: object for column in CATEGORICAL_FEATURES})
+    return features, errors
+
+
+def input_dtypes(input_path):
+    """
+    Column dtypes of the input, fixed before the first chunk is read: every
+    CSV column as a string (prepare_chunk parses the scores, and the other
+    columns are written back as read); the Arrow types of a Feather/Parquet
+    file, with dictionary columns as strings.
+    """
+    if input_path.endswith((".feather", ".parquet")):
+        import pyarrow as pa
+
+        if input_path.endswith(".feather"):
+            import pyarrow.feather as feather
+            schema = feather.read_table(input_path, memory_map=True).schema
+        else:
+            import pyarrow.parquet as pq
+            schema = pq.read_schema(input_path)
+        return {
+            field.name: "string" if pa.types.is_dictionary(field.type) or pa.types.is_string(field.type)
+            or pa.types.is_large_string(field.type) else pd.ArrowDtype(field.type)
+            for field in schema
+        }
+    return {column: "string" for column in pd.read_csv(input_path, nrows=0).columns}
+
+
+def _init_worker():
+    # loads the artifacts once per worker (already in memory when forked from a loaded parent)
+    model_registry.get_preprocessor()
+    model_registry.get_model()
+
+
+def score_chunk(df):
+    """Returns (predictions with NaN for invalid rows, error messages) for one chunk."""
+    features, errors = prepare_chunk(df, get_input_schema())
+    predictions = np.full(len(df), np.nan)
+    if len(features):
+        predictions[errors.isna().to_numpy()] = PredictPipeline().predict(features)
+    return predictions, errors.to_numpy(dtype=object, na_value=None)
+
+
+class BatchPredictor:
+    """
+    Scores a large CSV/Parquet/Feather file offline. The input is streamed
+    in chunks, each chunk is scored in a worker process (vectorized
+    preprocessor.transform + model.predict), and the input rows are written
+    back with the prediction and error columns, in input order.
+    """
+    def __init__(self, config=None):
+        self.config = config or BatchPredictConfig()
+
+    def run(self, input_path, output_path, workers=None):
+        try:
+            workers = workers or self.config.workers or os.cpu_count() or 1
+            max_pending = workers * self.config.max_pending_per_worker
+            # load in the parent first: fails fast on missing artifacts, and forked workers inherit them
+            _init_worker()
+
+            n_rows, n_errors, n_chunks = 0, 0, 0
+            start = time.perf_counter()
+            dtypes = input_dtypes(input_path)
+            # the output schema is fixed up front: an all-null first chunk cannot decide a column's type
+            output_dtypes = {**dtypes, self.config.prediction_column: "float64", self.config.error_column: "string"}
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool, \
+                    FrameWriter(output_path, output_dtypes) as writer:
+                pending = deque()
+
+                def write_oldest():
+                    nonlocal n_rows, n_errors
+                    chunk, future = pending.popleft()
+                    predictions, errors = future.result()
+                    chunk[self.config.prediction_column] = predictions
+                    chunk[self.config.error_column] = pd.array(errors, dtype="string")
+                    writer.append(chunk)
+                    n_rows += len(chunk)
+                    n_errors += int(sum(error is not None for error in errors))
+
+                for chunk in iter_frame_chunks(input_path, self.config.chunk_rows, dtype=dtypes):
+                    pending.append((chunk, pool.submit(score_chunk, chunk)))
+                    n_chunks += 1
+                    if len(pending) >= max_pending:
+                        write_oldest()
+                while pending:
+                    write_oldest()
+
+            seconds = time.perf_counter() - start
+            report = {
+                "input": input_path,
+                "output": output_path,
+                "rows": n_rows,
+                "errors": n_errors,
+                "chunks": n_chunks,
+                "workers": workers,
+                "seconds": seconds,
+                "rows_per_second": n_rows / seconds if seconds else None,
+            }
+            log_event("batch_predict", **report)
+            return report
+        except Exception as e:
+            raise CustomException(e, sys)
+
+
+# --------------------------------------------
+# Scores a file and writes it back with predicted_math_score / prediction_error
+# columns (output format follows the extension: .csv, .parquet or .feather):
+#   python -m src.pipeline.batch_predict students.csv predictions.parquet [--workers 4] [--chunk-rows 50000]
+# --------------------------------------------
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("input_path")
+    parser.add_argument("output_path")
+    parser.add_argument("--workers", type=int, default=None, help="default: BATCH_PREDICT_WORKERS or one per core")
+    parser.add_argument("--chunk-rows", type=int, default=BatchPredictConfig.chunk_rows)
+    args = parser.parse_args()
+
+    report = BatchPredictor(BatchPredictConfig(chunk_rows=args.chunk_rows)).run(
+        args.input_path, args.output_path, workers=args.workers)
+    print(f"{report['rows']} rows ({report['errors']} errors) in {report['seconds']:.2f}s "
+          f"on {report['workers']} workers: {report['rows_per_second']:.0f} rows/s -> {report['output']}")
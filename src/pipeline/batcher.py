@@ -0,0 +1,133 @@
+import os
+import queue
+import sys
+import threading
+import time
+from concurrent.futures import Future
+from dataclasses import dataclass
+from src.exception import CustomException
+from src.logger import logging
+
+
+@dataclass
+class MicroBatcherConfig:
+    enabled: bool = os.environ.get("COALESCE_PREDICTIONS", "0") == "1"
+    # a batch is dispatched as soon as it holds max_batch_size records
+    # or its oldest record has waited max_wait_ms, whichever comes first
+    max_batch_size: int = int(os.environ.get("COALESCE_MAX_BATCH_SIZE", 32))
+    max_wait_ms: float = float(os.environ.get("COALESCE_MAX_WAIT_MS", 5))
+
+
+class MicroBatcher:
+    """
+    Coalesces concurrent single-record predictions into small batches.
+
+    Request threads call predict(row) and block; a background thread drains
+    the queue, calls predict_fn once on the stacked rows and hands each
+    caller its own result. Useful with threaded workers (gunicorn --threads)
+    where several requests are in flight in the same process.
+    """
+    def __init__(self, predict_fn, config=None):
+        self.config = config or MicroBatcherConfig()
+        self.predict_fn = predict_fn
+        self._queue = queue.Queue()
+        self._thread = None
+        self._pid = None
+        self._start_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._reset_stats()
+
+    def _reset_stats(self):
+        self._batches = 0
+        self._records = 0
+        self._errors = 0
+        self._wait_ms_total = 0.0
+        self._wait_ms_max = 0.0
+        self._batch_size_histogram = {}
+
+    def _ensure_started(self):
+        # threads do not survive fork(), so (re)start in every worker process
+        if self._thread is not None and self._thread.is_alive() and self._pid == os.getpid():
+            return
+        with self._start_lock:
+            if self._thread is not None and self._thread.is_alive() and self._pid == os.getpid():
+                return
+            self._queue = queue.Queue()
+            self._pid = os.getpid()
+            self._thread = threading.Thread(target=self._run, name="micro-batcher", daemon=True)
+            self._thread.start()
+
+    def submit(self, row):
+        self._ensure_started()
+        future = Future()
+        self._queue.put((row, future, time.perf_counter()))
+        return future
+
+    def predict(self, row, timeout=None):
+        try:
+            return self.submit(row).result(timeout=timeout)
+        except Exception as e:
+            raise CustomException(e, sys)
+
+    def _collect(self):
+        batch = [self._queue.get()]
+        deadline = time.perf_counter() + self.config.max_wait_ms / 1000.0
+        while len(batch) < self.config.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            dispatched_at = time.perf_counter()
+            rows = [row for row, _, _ in batch]
+            failed = False
+            try:
+                preds = self.predict_fn(rows)
+                if len(preds) != len(batch):
+                    raise ValueError(f"predict_fn returned {len(preds)} results for {len(batch)} records")
+                for (_, future, _), pred in zip(batch, preds):
+                    future.set_result(pred)
+            except Exception as e:
+                failed = True
+                logging.error(f"Micro-batch of {len(batch)} records failed: {e}")
+                for _, future, _ in batch:
+                    if not future.done():
+                        future.set_exception(e)
+            self._record(batch, dispatched_at, failed)
+
+    def _record(self, batch, dispatched_at, failed):
+        waits = [(dispatched_at - enqueued_at) * 1000.0 for _, _, enqueued_at in batch]
+        # power-of-two buckets: 1, 2, 4, 8, ...
+        bucket = 1
+        while bucket < len(batch):
+            bucket *= 2
+        with self._stats_lock:
+            self._batches += 1
+            self._records += len(batch)
+            self._errors += len(batch) if failed else 0
+            self._wait_ms_total += sum(waits)
+            self._wait_ms_max = max(self._wait_ms_max, max(waits))
+            self._batch_size_histogram[bucket] = self._batch_size_histogram.get(bucket, 0) + 1
+
+    def stats(self):
+        with self._stats_lock:
+            return {
+                "enabled": self.config.enabled,
+                "max_batch_size": self.config.max_batch_size,
+                "max_wait_ms": self.config.max_wait_ms,
+                "queue_depth": self._queue.qsize(),
+                "batches": self._batches,
+                "records": self._records,
+                "errors": self._errors,
+                "mean_batch_size": self._records / self._batches if self._batches else 0.0,
+                "batch_size_histogram": {f"le_{k}": v for k, v in sorted(self._batch_size_histogram.items())},
+                "mean_wait_ms": self._wait_ms_total / self._records if self._records else 0.0,
+                "max_wait_ms_observed": self._wait_ms_max,
+            }
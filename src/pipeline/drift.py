@@ -0,0 +1,362 @@
+import json
+import math
+import os
+import sys
+import threading
+import time
+from dataclasses import dataclass
+import numpy as np
+from src.exception import CustomException
+from src.logger import logging, log_event
+from src.pipeline.model_registry import model_registry
+
+PREDICTION_COLUMN = "prediction"
+OTHER_CATEGORY = "__other__"
+
+
+@dataclass
+class DriftConfig:
+    # DRIFT_MONITOR=0 turns DriftMonitor.observe into a no-op
+    enabled: bool = os.environ.get("DRIFT_MONITOR", "1") == "1"
+    # written by the train pipeline from train_csv, relative to artifacts/
+    baseline_file_name: str = "drift_baseline.json"
+    # seconds a drift report is reused before the served stats are compared again
+    check_interval: float = float(os.environ.get("DRIFT_CHECK_INTERVAL", 60))
+    # served records needed before any feature is flagged
+    min_records: int = int(os.environ.get("DRIFT_MIN_RECORDS", 500))
+    # population stability index above which a feature is flagged (> 0.25 is usually read as a major shift)
+    psi_threshold: float = float(os.environ.get("DRIFT_PSI_THRESHOLD", 0.2))
+    # numerical histograms: one bin per score point in [0, 101), plus an under- and an overflow bin
+    histogram_low: float = 0.0
+    histogram_high: float = 101.0
+    histogram_bins: int = 101
+    # numerical PSI is computed on the histogram regrouped into this many bins
+    psi_bins: int = 10
+    # distinct levels counted per categorical column; later unseen ones share OTHER_CATEGORY
+    max_categories: int = 64
+
+
+class FeatureStats:
+    """
+    Constant-memory summary of a stream of records. Per numerical column
+    (the scores and the prediction): count, mean and M2 updated with
+    Welford's algorithm, and a fixed-width histogram that doubles as a
+    quantile sketch (error at most one bin, one score point). Per
+    categorical column: a count per level, capped at max_categories.
+    """
+    def __init__(self, categorical, numerical, config=None):
+        self.config = config or DriftConfig()
+        self.categorical = list(categorical)
+        # feature columns first, the prediction last
+        self.numerical = list(numerical) + [PREDICTION_COLUMN]
+        self.count = 0
+        # column -> [n, mean, M2]
+        self.moments = {column: [0, 0.0, 0.0] for column in self.numerical}
+        self.histograms = {column: [0] * (self.config.histogram_bins + 2) for column in self.numerical}
+        self.categories = {column: {} for column in self.categorical}
+        self._scale = self.config.histogram_bins / (self.config.histogram_high - self.config.histogram_low)
+
+    def update(self, rows, predictions):
+        """Adds normalized records and their predictions, one at a time (request path)."""
+        low, high, last_bin = self.config.histogram_low, self.config.histogram_high, self.config.histogram_bins + 1
+        scale, max_categories = self._scale, self.config.max_categories
+        features = self.numerical[:-1]
+        for row, prediction in zip(rows, predictions):
+            self.count += 1
+            for column, value in zip(self.numerical, [row[c] for c in features] + [prediction]):
+                value = float(value)
+                if value != value:
+                    continue
+                moments = self.moments[column]
+                moments[0] += 1
+                delta = value - moments[1]
+                moments[1] += delta / moments[0]
+                moments[2] += delta * (value - moments[1])
+                index = 0 if value < low else last_bin if value >= high else 1 + int((value - low) * scale)
+                self.histograms[column][index] += 1
+            for column in self.categorical:
+                counts, value = self.categories[column], row[column]
+                if value not in counts and len(counts) >= max_categories:
+                    value = OTHER_CATEGORY
+                counts[value] = counts.get(value, 0) + 1
+
+    def update_frame(self, df, predictions):
+        """Vectorized update() for a whole DataFrame (used to build the baseline)."""
+        config = self.config
+        self.count += len(df)
+        columns = [df[column].to_numpy(dtype=np.float64) for column in self.numerical[:-1]]
+        for column, values in zip(self.numerical, columns + [np.asarray(predictions, dtype=np.float64)]):
+            values = values[~np.isnan(values)]
+            if not len(values):
+                continue
+            # Chan et al.'s parallel merge of (n, mean, M2), equal to Welford over the same values
+            n_a, mean_a, m2_a = self.moments[column]
+            n_b, mean_b = len(values), float(values.mean())
+            m2_b = float(((values - mean_b) ** 2).sum())
+            n = n_a + n_b
+            delta = mean_b - mean_a
+            self.moments[column] = [n, mean_a + delta * n_b / n, m2_a + m2_b + delta * delta * n_a * n_b / n]
+            index = np.clip(np.floor((values - config.histogram_low) * self._scale) + 1, 0, config.histogram_bins + 1)
+            counts = np.bincount(index.astype(np.int64), minlength=config.histogram_bins + 2)
+            self.histograms[column] = [a + int(b) for a, b in zip(self.histograms[column], counts)]
+        for column in self.categorical:
+            counts = self.categories[column]
+            for value, count in df[column].value_counts().items():
+                if value not in counts and len(counts) >= config.max_categories:
+                    value = OTHER_CATEGORY
+                counts[value] = counts.get(value, 0) + int(count)
+
+    def mean(self, column):
+        return self.moments[column][1] if self.moments[column][0] else None
+
+    def std(self, column):
+        n, _, m2 = self.moments[column]
+        return math.sqrt(m2 / (n - 1)) if n > 1 else None
+
+    def quantile(self, column, q):
+        """Quantile read from the histogram, linearly interpolated inside its bin."""
+        histogram = self.histograms[column]
+        total = sum(histogram)
+        if not total:
+            return None
+        width = 1 / self._scale
+        target, cumulative = q * total, 0
+        for index, count in enumerate(histogram):
+            if count and cumulative + count >= target:
+                if index == 0:
+                    return self.config.histogram_low
+                if index == len(histogram) - 1:
+                    return self.config.histogram_high
+                return self.config.histogram_low + (index - 1 + (target - cumulative) / count) * width
+            cumulative += count
+        return self.config.histogram_high
+
+    def to_dict(self):
+        return {
+            "count": self.count,
+            "categorical": self.categorical,
+            "numerical": self.numerical[:-1],
+            "moments": self.moments,
+            "histograms": self.histograms,
+            "categories": self.categories,
+        }
+
+    @classmethod
+    def from_dict(cls, data, config=None):
+        stats = cls(data["categorical"], data["numerical"], config)
+        if len(next(iter(data["histograms"].values()), [])) != stats.config.histogram_bins + 2:
+            raise ValueError("baseline histograms do not match DriftConfig.histogram_bins")
+        stats.count = data["count"]
+        stats.moments = {column: list(value) for column, value in data["moments"].items()}
+        stats.histograms = {column: list(value) for column, value in data["histograms"].items()}
+        stats.categories = {column: dict(value) for column, value in data["categories"].items()}
+        return stats
+
+
+def psi(expected, actual, epsilon=1e-4):
+    """Population stability index between two count vectors over the same bins."""
+    expected = np.asarray(expected, dtype=np.float64)
+    actual = np.asarray(actual, dtype=np.float64)
+    if not expected.sum() or not actual.sum():
+        return None
+    expected = np.maximum(expected / expected.sum(), epsilon)
+    actual = np.maximum(actual / actual.sum(), epsilon)
+    return float(np.sum((actual - expected) * np.log(actual / expected)))
+
+
+def _grouped(histogram, n_groups):
+    # underflow, n_groups groups of adjacent bins, overflow
+    inner = np.asarray(histogram[1:-1])
+    return [histogram[0]] + [int(group.sum()) for group in np.array_split(inner, n_groups)] + [histogram[-1]]
+
+
+def compare(baseline, current, config=None):
+    """Per-feature drift of `current` against `baseline` (two FeatureStats)."""
+    config = config or DriftConfig()
+    enough = current.count >= config.min_records
+    features = {}
+    for column in current.numerical:
+        value = psi(_grouped(baseline.histograms[column], config.psi_bins),
+                    _grouped(current.histograms[column], config.psi_bins))
+        baseline_std = baseline.std(column)
+        mean = current.mean(column)
+        features[column] = {
+            "psi": value,
+            "drifted": bool(enough and value is not None and value > config.psi_threshold),
+            "mean": mean,
+            "baseline_mean": baseline.mean(column),
+            # shift of the mean in baseline standard deviations
+            "mean_shift_std": (mean - baseline.mean(column)) / baseline_std
+            if mean is not None and baseline_std else None,
+            "std": current.std(column),
+            "baseline_std": baseline_std,
+            **{f"p{q}": current.quantile(column, q / 100) for q in (5, 50, 95)},
+            **{f"baseline_p{q}": baseline.quantile(column, q / 100) for q in (5, 50, 95)},
+        }
+    for column in current.categorical:
+        expected, actual = baseline.categories[column], current.categories[column]
+        levels = sorted(set(expected) | set(actual), key=str)
+        value = psi([expected.get(level, 0) for level in levels], [actual.get(level, 0) for level in levels])
+        served = sum(actual.values())
+        features[column] = {
+            "psi": value,
+            "drifted": bool(enough and value is not None and value > config.psi_threshold),
+            "frequencies": {level: count / served for level, count in actual.items()} if served else {},
+            "baseline_frequencies": {level: count / baseline.count for level, count in expected.items()},
+            # share of served records with a level the baseline never saw
+            "unseen_share": sum(count for level, count in actual.items() if level not in expected) / served
+            if served else 0.0,
+        }
+    return features
+
+
+class DriftMonitor:
+    """
+    Feature statistics of every record served through PredictPipeline
+    .predict_rows, compared against the baseline the train pipeline saved
+    from train_csv (artifacts/drift_baseline.json).
+
+    observe() only updates counters under a lock. The comparison runs when
+    the report is asked for (GET /drift, /stats or a /metrics scrape) and is
+    reused for check_interval seconds. Stats are per worker process, since
+    the last reset or baseline change. Without a baseline nothing is
+    collected.
+    """
+    def __init__(self, config=None):
+        self.config = config or DriftConfig()
+        self._lock = threading.Lock()
+        # (baseline mtime/size, baseline FeatureStats)
+        self._baseline = (None, None)
+        self._loaded = False
+        self._current = None
+        self._started = time.time()
+        # (time of the last comparison, report)
+        self._report = (0.0, None)
+        self._drifted = False
+
+    def _load_baseline(self):
+        path = model_registry.path_for(self.config.baseline_file_name)
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            self._baseline, self._current = (None, None), None
+            return None
+        version = (stat.st_mtime_ns, stat.st_size)
+        if self._baseline[0] != version:
+            try:
+                with open(path) as file_obj:
+                    baseline = FeatureStats.from_dict(json.load(file_obj), self.config)
+            except Exception as e:
+                logging.warning(f"Could not load drift baseline {path}: {e}")
+                self._baseline, self._current = (version, None), None
+                return None
+            # served stats are only comparable with the baseline (and model) they were collected under
+            self._baseline = (version, baseline)
+            self._current = FeatureStats(baseline.categorical, baseline.numerical[:-1], self.config)
+            self._started = time.time()
+            self._report = (0.0, None)
+            log_event("drift_baseline_loaded", path=path, records=baseline.count)
+        return self._baseline[1]
+
+    def observe(self, rows, predictions):
+        if not self.config.enabled:
+            return
+        with self._lock:
+            if not self._loaded:
+                self._load_baseline()
+                self._loaded = True
+            if self._current is not None:
+                self._current.update(rows, predictions)
+
+    def reset(self):
+        with self._lock:
+            if self._current is not None:
+                self._current = FeatureStats(self._current.categorical, self._current.numerical[:-1], self.config)
+            self._started = time.time()
+            self._report = (0.0, None)
+
+    def check(self, force=False):
+        """The drift report, recomputed at most every check_interval seconds unless force=True."""
+        try:
+            checked_at, report = self._report
+            if not force and report is not None and time.time() - checked_at < self.config.check_interval:
+                return report
+
+            with self._lock:
+                baseline = self._load_baseline()
+                self._loaded = True
+                # compared on a copy, so requests are not held up by the comparison
+                current = FeatureStats.from_dict(self._current.to_dict(), self.config) \
+                    if self._current is not None else None
+                started = self._started
+
+            report = {
+                "enabled": self.config.enabled,
+                "baseline_records": baseline.count if baseline is not None else None,
+                "records": current.count if current is not None else 0,
+                "since": started,
+                "checked_at": time.time(),
+                "drift_detected": False,
+                "drifted_features": [],
+                "features": {},
+            }
+            if baseline is not None:
+                report["features"] = compare(baseline, current, self.config)
+                report["drifted_features"] = [name for name, entry in report["features"].items() if entry["drifted"]]
+                report["drift_detected"] = bool(report["drifted_features"])
+            if report["drift_detected"] and not self._drifted:
+                log_event("drift_detected", logging.WARNING, features=report["drifted_features"],
+                          records=report["records"])
+            self._drifted = report["drift_detected"]
+            self._report = (report["checked_at"], report)
+            return report
+        except Exception as e:
+            raise CustomException(e, sys)
+
+    def stats(self):
+        """Flat view of the last report, for /stats and /metrics."""
+        report = self.check()
+        stats = {
+            "records": report["records"],
+            "detected": int(report["drift_detected"]),
+            "features_drifted": len(report["drifted_features"]),
+        }
+        for name, entry in report["features"].items():
+            if entry["psi"] is not None:
+                stats[f"{name}_psi"] = entry["psi"]
+        return stats
+
+
+# one monitor per worker process
+drift_monitor = DriftMonitor()
+
+
+def build_baseline(train_path, preprocessor_path, model_path, baseline_path, config=None):
+    """
+    Summarizes train_csv (the data DataTransformation fitted the imputers
+    and scaler on) and the trained model's predictions on it into the
+    baseline DriftMonitor compares served records against.
+    """
+    from src.pipeline.input_schema import InputSchema
+    from src.utils import load_frame, load_object
+
+    try:
+        preprocessor = load_object(preprocessor_path)
+        model = load_object(model_path)
+        schema = InputSchema.from_preprocessor(preprocessor)
+        if schema is None:
+            raise ValueError("preprocessor has no one-hot encoder to read the input columns from")
+
+        df = load_frame(train_path, columns=list(schema.categories) + schema.numerical)
+        X = preprocessor.transform(df)
+        predictions = model.predict(X.toarray() if hasattr(X, "toarray") else X)
+
+        stats = FeatureStats(list(schema.categories), schema.numerical, config)
+        stats.update_frame(df, predictions)
+        os.makedirs(os.path.dirname(baseline_path) or ".", exist_ok=True)
+        with open(baseline_path, "w") as file_obj:
+            json.dump(stats.to_dict(), file_obj)
+        logging.info(f"Drift baseline of {stats.count} records saved to {baseline_path}")
+        return baseline_path
+    except Exception as e:
+        raise CustomException(e, sys)
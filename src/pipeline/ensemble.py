@@ -0,0 +1,188 @@
+import json
+import os
+import queue
+import random
+import threading
+import time
+from dataclasses import dataclass
+import numpy as np
+from src.logger import logging, log_event
+from src.pipeline.model_registry import model_registry
+from src.pipeline.tree_engine import compile_tree_model
+
+
+@dataclass
+class EnsembleConfig:
+    # written by ModelTrainer.save_top_models (TRAIN_TOP_K > 1), relative to artifacts/
+    manifest_file_name: str = os.path.join("models", "manifest.json")
+    # models averaged in SERVING_MODE=ensemble, best first; 0 = every model in the manifest
+    ensemble_size: int = int(os.environ.get("ENSEMBLE_SIZE", 0))
+    # batches waiting for the shadow thread; when full, shadow work is dropped (never the request)
+    shadow_queue_size: int = int(os.environ.get("SHADOW_QUEUE_SIZE", 256))
+    # fraction of batches sent to the challengers, to cap their CPU cost
+    shadow_sample_rate: float = float(os.environ.get("SHADOW_SAMPLE_RATE", 1.0))
+
+
+def score_member(model, engine, X, tree_engine_max_rows):
+    """model.predict, or the compiled tree engine for small batches (see PredictPipeline)."""
+    if engine is not None and X.shape[0] <= tree_engine_max_rows:
+        return engine.predict(X)
+    return model.predict(X)
+
+
+# (manifest mtime/size, entries) - re-read when the manifest file changes
+_manifest = (None, [])
+
+
+def load_manifest(config=None):
+    """Entries of artifacts/models/manifest.json, best first; [] when there is none."""
+    global _manifest
+    config = config or EnsembleConfig()
+    path = model_registry.path_for(config.manifest_file_name)
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        _manifest = (None, [])
+        return []
+    version = (stat.st_mtime_ns, stat.st_size)
+    cached_version, entries = _manifest
+    if cached_version != version:
+        with open(path) as file_obj:
+            entries = sorted(json.load(file_obj)["models"], key=lambda entry: entry["rank"])
+        _manifest = (version, entries)
+    return entries
+
+
+def manifest_version(config=None):
+    """Token that changes when the manifest is rewritten (for prediction cache keys)."""
+    load_manifest(config)
+    return _manifest[0]
+
+
+# (model objects, [(name, model, engine)]) - rebuilt whenever the registry reloads a member
+_members = ((), [])
+
+
+def get_members(entries, tree_engine=True):
+    """Loads (through the model registry) and compiles the models listed in `entries`."""
+    global _members
+    models = tuple(model_registry.get(entry["file"]) for entry in entries)
+    cached_models, members = _members
+    if len(cached_models) != len(models) or any(a is not b for a, b in zip(cached_models, models)):
+        members = [
+            (entry["name"], model, compile_tree_model(model) if tree_engine else None)
+            for entry, model in zip(entries, models)
+        ]
+        _members = (models, members)
+    return members
+
+
+def ensemble_members(tree_engine=True, config=None):
+    config = config or EnsembleConfig()
+    entries = load_manifest(config)
+    if config.ensemble_size:
+        entries = entries[:config.ensemble_size]
+    return get_members(entries, tree_engine)
+
+
+def shadow_members(tree_engine=True, config=None):
+    # rank 1 is the model already served as the primary
+    return get_members(load_manifest(config)[1:], tree_engine)
+
+
+class ShadowScorer:
+    """
+    Scores challenger models on a background thread, so the request only
+    pays for a queue put. A batch is queued either as the primary model's
+    transformed matrix, or as raw rows with the transform to build it, which
+    then runs on the shadow thread (for answers read from the lookup table
+    or the prediction cache, which never built one). Per challenger it
+    tracks how far its predictions are from the primary's and how long it
+    took. When the queue is full the batch is dropped from shadow scoring
+    and counted, so a slow challenger never backs up requests.
+    """
+    def __init__(self, config=None):
+        self.config = config or EnsembleConfig()
+        self._queue = queue.Queue(maxsize=self.config.shadow_queue_size)
+        self._thread = None
+        self._pid = None
+        self._lock = threading.Lock()
+        self._submitted, self._dropped, self._batches = 0, 0, 0
+        self._models = {}
+
+    def submit(self, X, primary_predictions, members, tree_engine_max_rows, transform=None):
+        """X is the transformed matrix, or the raw rows when transform(X) builds it."""
+        if not members or random.random() >= self.config.shadow_sample_rate:
+            return
+        self._ensure_thread()
+        try:
+            self._queue.put_nowait((X, transform, primary_predictions, members, tree_engine_max_rows))
+            with self._lock:
+                self._submitted += 1
+        except queue.Full:
+            with self._lock:
+                self._dropped += 1
+
+    def _ensure_thread(self):
+        # started lazily, and again in each forked worker (threads do not survive fork)
+        if self._pid != os.getpid():
+            with self._lock:
+                if self._pid != os.getpid():
+                    self._queue = queue.Queue(maxsize=self.config.shadow_queue_size)
+                    self._thread = threading.Thread(target=self._run, name="shadow-scorer", daemon=True)
+                    self._thread.start()
+                    self._pid = os.getpid()
+
+    def _run(self):
+        work = self._queue
+        while True:
+            X, transform, primary, members, tree_engine_max_rows = work.get()
+            try:
+                if transform is not None:
+                    X = transform(X)
+                primary = np.asarray(primary, dtype=np.float64)
+                for name, model, engine in members:
+                    start = time.perf_counter()
+                    predictions = score_member(model, engine, X, tree_engine_max_rows)
+                    seconds = time.perf_counter() - start
+                    diff = np.abs(np.asarray(predictions, dtype=np.float64) - primary)
+                    with self._lock:
+                        entry = self._models.setdefault(
+                            name, {"rows": 0, "abs_diff_total": 0.0, "max_abs_diff": 0.0, "seconds": 0.0})
+                        entry["rows"] += len(diff)
+                        entry["abs_diff_total"] += float(diff.sum())
+                        entry["max_abs_diff"] = max(entry["max_abs_diff"], float(diff.max(initial=0.0)))
+                        entry["seconds"] += seconds
+                    log_event("shadow_prediction", logging.DEBUG, model=name, rows=len(diff),
+                              mean_abs_diff=float(diff.mean()) if len(diff) else 0.0)
+                with self._lock:
+                    self._batches += 1
+            except Exception:
+                logging.exception("Shadow scoring failed")
+            finally:
+                work.task_done()
+
+    def join(self):
+        """Blocks until every queued batch has been scored (used by benchmarks)."""
+        if self._pid == os.getpid():
+            self._queue.join()
+
+    def stats(self):
+        with self._lock:
+            stats = {
+                "submitted": self._submitted,
+                "dropped": self._dropped,
+                "batches": self._batches,
+                "queue_depth": self._queue.qsize(),
+            }
+            for name, entry in self._models.items():
+                prefix = name.lower().replace(" ", "_")
+                stats[f"{prefix}_rows"] = entry["rows"]
+                stats[f"{prefix}_mean_abs_diff"] = entry["abs_diff_total"] / entry["rows"] if entry["rows"] else 0.0
+                stats[f"{prefix}_max_abs_diff"] = entry["max_abs_diff"]
+                stats[f"{prefix}_seconds"] = entry["seconds"]
+        return stats
+
+
+# one shadow thread per worker process
+shadow_scorer = ShadowScorer()
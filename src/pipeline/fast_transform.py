@@ -0,0 +1,181 @@
+import math
+import sys
+import numpy as np
+import pandas as pd
+from src.exception import CustomException
+from src.logger import logging
+
+
+class CompiledPreprocessor:
+    """
+    Pandas-free re-implementation of the fitted ColumnTransformer built by
+    DataTransformation.get_data_transformer_object.
+
+    The fitted imputer statistics, one-hot categories and scaler mean/scale
+    are read out of the preprocessor once; a record (dict) is then encoded
+    straight into a NumPy row with a dict lookup per categorical column and
+    one subtract/divide per numerical column - the same float64 operations
+    StandardScaler performs, so the output is bit-for-bit identical.
+
+    Only the steps used by this project are supported (SimpleImputer,
+    OneHotEncoder without drop/infrequent categories, StandardScaler);
+    from_preprocessor raises ValueError for anything else.
+    """
+    def __init__(self, n_features_out, categorical, numerical):
+        self.n_features_out = n_features_out
+        # (column, {category: output index}, imputed value)
+        self.categorical = categorical
+        # (column, output index, imputed value, mean, scale)
+        self.numerical = numerical
+        self.input_columns = [c[0] for c in categorical] + [n[0] for n in numerical]
+
+    @classmethod
+    def from_preprocessor(cls, preprocessor):
+        categorical, numerical = [], []
+        offset = 0
+        for name, pipeline, columns in preprocessor.transformers_:
+            if pipeline == "drop" or len(columns) == 0:
+                continue
+            if pipeline == "passthrough" or not hasattr(pipeline, "steps"):
+                raise ValueError(f"unsupported transformer '{name}'")
+
+            steps = dict(pipeline.steps)
+            imputer = steps.get("imputer")
+            statistics = imputer.statistics_ if imputer is not None else [None] * len(columns)
+
+            encoder = next((s for s in steps.values() if type(s).__name__ == "OneHotEncoder"), None)
+            scaler = next((s for s in steps.values() if type(s).__name__ == "StandardScaler"), None)
+
+            if encoder is not None:
+                if encoder.drop_idx_ is not None or getattr(encoder, "_infrequent_enabled", False):
+                    raise ValueError("OneHotEncoder with drop/infrequent categories is not supported")
+                for column, categories, fill in zip(columns, encoder.categories_, statistics):
+                    lookup = {category: offset + i for i, category in enumerate(categories)}
+                    categorical.append((column, lookup, fill))
+                    offset += len(categories)
+            elif scaler is not None:
+                mean = scaler.mean_ if scaler.mean_ is not None and scaler.with_mean else np.zeros(len(columns))
+                scale = scaler.scale_ if scaler.scale_ is not None else np.ones(len(columns))
+                for i, column in enumerate(columns):
+                    numerical.append((column, offset, statistics[i], mean[i], scale[i]))
+                    offset += 1
+            else:
+                raise ValueError(f"unsupported pipeline '{name}'")
+
+        return cls(offset, categorical, numerical)
+
+    def save(self, file_path):
+        """
+        Exports the fitted parameters to a small flat .npz file, so serving can
+        rebuild the plan without unpickling the sklearn ColumnTransformer.
+        """
+        try:
+            categories = [list(lookup) for _, lookup, _ in self.categorical]
+            np.savez(
+                file_path,
+                n_features_out=np.int64(self.n_features_out),
+                cat_columns=np.array([c[0] for c in self.categorical], dtype=str),
+                cat_offsets=np.array([min(lookup.values()) for _, lookup, _ in self.categorical], dtype=np.int64),
+                cat_sizes=np.array([len(c) for c in categories], dtype=np.int64),
+                cat_values=np.array([v for c in categories for v in c], dtype=str),
+                cat_fills=np.array(["" if c[2] is None else c[2] for c in self.categorical], dtype=str),
+                num_columns=np.array([n[0] for n in self.numerical], dtype=str),
+                num_index=np.array([n[1] for n in self.numerical], dtype=np.int64),
+                num_fills=np.array([np.nan if n[2] is None else n[2] for n in self.numerical], dtype=np.float64),
+                num_means=np.array([n[3] for n in self.numerical], dtype=np.float64),
+                num_scales=np.array([n[4] for n in self.numerical], dtype=np.float64),
+            )
+        except Exception as e:
+            raise CustomException(e, sys)
+
+    @classmethod
+    def load(cls, file_path):
+        try:
+            with np.load(file_path, allow_pickle=False) as params:
+                categorical, start = [], 0
+                for column, offset, size, fill in zip(params["cat_columns"].tolist(), params["cat_offsets"].tolist(),
+                                                      params["cat_sizes"].tolist(), params["cat_fills"].tolist()):
+                    values = params["cat_values"][start:start + size].tolist()
+                    categorical.append((column, {v: offset + i for i, v in enumerate(values)}, fill or None))
+                    start += size
+                numerical = [
+                    (column, index, None if math.isnan(fill) else fill, np.float64(mean), np.float64(scale))
+                    for column, index, fill, mean, scale in zip(
+                        params["num_columns"].tolist(), params["num_index"].tolist(), params["num_fills"].tolist(),
+                        params["num_means"], params["num_scales"])
+                ]
+                return cls(int(params["n_features_out"]), categorical, numerical)
+        except Exception as e:
+            raise CustomException(e, sys)
+
+    def encode(self, record, out=None):
+        """Encodes one normalized record into `out` (a zeroed 1-D float64 row)."""
+        if out is None:
+            out = np.zeros(self.n_features_out)
+        for column, lookup, fill in self.categorical:
+            value = record.get(column)
+            if _is_missing(value):
+                value = fill
+            index = lookup.get(value)
+            # unknown categories encode as all zeros (handle_unknown="ignore")
+            if index is not None:
+                out[index] = 1.0
+        for column, index, fill, mean, scale in self.numerical:
+            value = record.get(column)
+            if _is_missing(value):
+                value = fill
+            out[index] = (np.float64(value) - mean) / scale
+        return out
+
+    def transform_records(self, records):
+        X = np.zeros((len(records), self.n_features_out))
+        for i, record in enumerate(records):
+            self.encode(record, X[i])
+        return X
+
+    def verify(self, preprocessor, records):
+        """Checks the compiled plan against preprocessor.transform, bit for bit."""
+        try:
+            expected = preprocessor.transform(pd.DataFrame.from_records(records, columns=self.input_columns))
+            if hasattr(expected, "toarray"):
+                expected = expected.toarray()
+            got = self.transform_records(records)
+            return expected.shape == got.shape and np.array_equal(
+                expected.astype(np.float64).view(np.uint64), got.view(np.uint64)
+            )
+        except Exception as e:
+            raise CustomException(e, sys)
+
+    def sample_records(self):
+        """One record per known category level, for verify()."""
+        n = max(len(lookup) for _, lookup, _ in self.categorical) if self.categorical else 1
+        records = []
+        for i in range(n):
+            record = {}
+            for column, lookup, _ in self.categorical:
+                categories = list(lookup)
+                record[column] = categories[i % len(categories)]
+            for j, (column, _, fill, _, _) in enumerate(self.numerical):
+                record[column] = float(fill) + i + j
+            records.append(record)
+        return records
+
+
+def _is_missing(value):
+    return value is None or (isinstance(value, float) and math.isnan(value))
+
+
+def compile_preprocessor(preprocessor):
+    """
+    Builds and self-checks a CompiledPreprocessor. Returns None (so callers
+    fall back to preprocessor.transform) if the preprocessor cannot be
+    compiled or the compiled output differs from transform().
+    """
+    try:
+        plan = CompiledPreprocessor.from_preprocessor(preprocessor)
+        if plan.verify(preprocessor, plan.sample_records()):
+            return plan
+        logging.warning("Compiled preprocessor does not match preprocessor.transform; fast path disabled")
+    except Exception as e:
+        logging.warning(f"Could not compile preprocessor, fast path disabled: {e}")
+    return None
@@ -0,0 +1,160 @@
+import os
+import threading
+import time
+from dataclasses import dataclass
+from src.metrics import input_validation_total, input_validation_seconds
+
+
+@dataclass
+class InputSchemaConfig:
+    # "strict": unknown categories and scores outside [score_min, score_max] are rejected
+    # "lenient": only missing fields and non-numeric scores are rejected;
+    #            unknown categories encode as all zeros (OneHotEncoder handle_unknown="ignore")
+    mode: str = os.environ.get("INPUT_VALIDATION", "strict")
+    # the score range of notebook/data/stud.csv (and of the lookup table grid)
+    score_min: float = 0.0
+    score_max: float = 100.0
+
+
+class InputValidationError(ValueError):
+    """A record that does not match the input schema; `reason` labels the validation metrics."""
+    def __init__(self, message, reason):
+        super().__init__(message)
+        self.reason = reason
+
+
+class InputSchema:
+    """
+    The inputs the fitted preprocessor can encode: for each categorical
+    column the fitted OneHotEncoder categories (the stud.csv levels), and a
+    score range for each numerical column.
+
+    Categories are matched case-insensitively through one dict per column
+    ({casefolded value: fitted spelling}) and returned in the fitted
+    spelling, so the encoder's category -> column lookup always hits: the
+    form posts "group A" while older code lowercased it to "group a", which
+    the encoder silently ignored. A bad record is rejected with a few dict
+    lookups and float() calls, before any DataFrame or matrix is built.
+    """
+    def __init__(self, categories, numerical, config=None):
+        self.config = config or InputSchemaConfig()
+        self.strict = self.config.mode == "strict"
+        # {column: [fitted categories]}
+        self.categories = categories
+        self.numerical = list(numerical)
+        # {column: {casefolded category: fitted category}}
+        self.lookups = {
+            column: {str(level).casefold(): level for level in levels}
+            for column, levels in categories.items()
+        }
+
+    @classmethod
+    def from_preprocessor(cls, preprocessor, config=None):
+        """Reads the columns and fitted categories out of a fitted ColumnTransformer; None if it has no encoder."""
+        categories, numerical = {}, []
+        for _, pipeline, columns in getattr(preprocessor, "transformers_", ()):
+            if not hasattr(pipeline, "steps") or len(columns) == 0:
+                continue
+            encoder = next((s for _, s in pipeline.steps if type(s).__name__ == "OneHotEncoder"), None)
+            if encoder is not None:
+                for column, levels in zip(columns, encoder.categories_):
+                    categories[column] = levels.tolist()
+            else:
+                numerical.extend(columns)
+        if not categories:
+            return None
+        return cls(categories, numerical, config)
+
+    def validate(self, record):
+        """
+        Returns the normalized row (fitted category spellings, float scores)
+        or raises InputValidationError.
+        """
+        if not isinstance(record, dict):
+            raise InputValidationError("record must be a JSON object", "invalid")
+
+        row, missing = {}, None
+        for column, lookup in self.lookups.items():
+            value = record.get(column)
+            if value is None or value == "":
+                missing = (missing or []) + [column]
+                continue
+            if not isinstance(value, str):
+                raise InputValidationError(f"{column} must be a string", "type")
+            level = lookup.get(value.casefold())
+            if level is None:
+                if self.strict:
+                    raise InputValidationError(
+                        f"unknown {column} '{value}', expected one of {self.categories[column]}", "unknown_category")
+                level = value.lower()
+            row[column] = level
+
+        for column in self.numerical:
+            value = record.get(column)
+            if value is None or value == "":
+                missing = (missing or []) + [column]
+                continue
+            # float() would take JSON true/false as 1.0/0.0
+            if isinstance(value, bool):
+                raise InputValidationError(f"{column} must be a number", "type")
+            try:
+                number = float(value)
+            except (TypeError, ValueError):
+                raise InputValidationError(f"{column} must be a number", "type")
+            if number != number:
+                raise InputValidationError(f"{column} must be a number", "type")
+            if self.strict and not self.config.score_min <= number <= self.config.score_max:
+                raise InputValidationError(
+                    f"{column} must be between {self.config.score_min:g} and {self.config.score_max:g}",
+                    "out_of_range")
+            row[column] = number
+
+        if missing:
+            raise InputValidationError(f"missing fields: {missing}", "missing")
+        return row
+
+
+class ValidationStats:
+    """Per-process counts and time of schema validation, for /stats and /metrics."""
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counts = {}
+        self._seconds = 0.0
+
+    def record(self, result, seconds):
+        input_validation_total.inc(result)
+        input_validation_seconds.observe(seconds)
+        with self._lock:
+            self._counts[result] = self._counts.get(result, 0) + 1
+            self._seconds += seconds
+
+    def stats(self):
+        with self._lock:
+            checked = sum(self._counts.values())
+            rejected = checked - self._counts.get("ok", 0)
+            stats = {
+                "checked": checked,
+                "rejected": rejected,
+                "error_rate": rejected / checked if checked else 0.0,
+                "mean_us": self._seconds / checked * 1e6 if checked else 0.0,
+            }
+            for result, count in self._counts.items():
+                if result != "ok":
+                    stats[f"rejected_{result}"] = count
+        return stats
+
+
+# one set of counters per worker process
+validation_stats = ValidationStats()
+
+
+def validate_record(schema, record):
+    """schema.validate(record), timed and counted in validation_stats."""
+    start = time.perf_counter()
+    try:
+        row = schema.validate(record)
+    except InputValidationError as e:
+        validation_stats.record(e.reason, time.perf_counter() - start)
+        raise
+    validation_stats.record("ok", time.perf_counter() - start)
+    return row
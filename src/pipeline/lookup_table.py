@@ -0,0 +1,246 @@
+'''
+    Builds the precomputed prediction table for the current artifacts and
+    prints its size, build time and lookup latency.
+
+    running command : python -m src.pipeline.lookup_table [--dtype float32]
+'''
+
+import argparse
+import json
+import os
+import sys
+import time
+from dataclasses import dataclass
+import numpy as np
+from src.exception import CustomException
+from src.logger import logging
+from src.utils import file_digest
+
+SCORE_COLUMNS = ['reading_score', 'writing_score']
+
+
+@dataclass
+class LookupTableConfig:
+    table_file_name: str = "lookup_table.npy"
+    meta_file_name: str = "lookup_table.json"
+    score_min: int = 0
+    score_max: int = 100
+    # grid rows encoded and scored per model.predict call while building
+    build_chunk_rows: int = 65536
+
+
+class LookupTable:
+    """
+    Every prediction the model can make for integer reading/writing scores
+    in [score_min, score_max], stored as one flat, memory-mapped array.
+
+    The grid axes are each categorical column's fitted categories plus one
+    trailing "unknown" level (which the one-hot encoder maps to all zeros,
+    exactly like an unseen value), then reading score, then writing score.
+    A record is answered with a single index into the array; records with
+    missing, non-integer or out-of-range scores are left to the model.
+    """
+    def __init__(self, values, levels, score_min, score_max, fingerprint):
+        self.values = values
+        self.levels = levels
+        self.score_min = score_min
+        self.score_max = score_max
+        self.fingerprint = fingerprint
+
+        n_scores = score_max - score_min + 1
+        self.shape = tuple(len(categories) + 1 for _, categories in levels) + (n_scores, n_scores)
+        strides = np.cumprod((1,) + self.shape[::-1])[::-1][1:]
+        # per column: {category: level * stride}, and the offset of its unknown level
+        self._offsets = [
+            (column, {category: i * int(stride) for i, category in enumerate(categories)},
+             len(categories) * int(stride))
+            for (column, categories), stride in zip(levels, strides)
+        ]
+        self._reading_stride = int(strides[-2])
+
+    def index(self, record):
+        """Flat position of a normalized record in the table, or None if it is not covered."""
+        index = 0
+        for column, offsets, unknown in self._offsets:
+            value = record.get(column)
+            if value is None:
+                return None
+            index += offsets.get(value, unknown)
+
+        reading, writing = record.get(SCORE_COLUMNS[0]), record.get(SCORE_COLUMNS[1])
+        for score in (reading, writing):
+            if not isinstance(score, (int, float)) or score != score or score != int(score) \
+                    or not self.score_min <= score <= self.score_max:
+                return None
+        return index + (int(reading) - self.score_min) * self._reading_stride + int(writing) - self.score_min
+
+    def lookup_many(self, records):
+        """Returns the tabulated prediction, or None, for every record."""
+        preds = [None] * len(records)
+        for i, record in enumerate(records):
+            index = self.index(record)
+            if index is not None:
+                preds[i] = float(self.values[index])
+        return preds
+
+    @classmethod
+    def load(cls, table_path, meta_path):
+        try:
+            with open(meta_path) as file_obj:
+                meta = json.load(file_obj)
+            values = np.load(table_path, mmap_mode="r")
+            return cls(values, [tuple(level) for level in meta["levels"]],
+                       meta["score_min"], meta["score_max"], meta["fingerprint"])
+        except Exception as e:
+            raise CustomException(e, sys)
+
+
+def artifact_fingerprint(model_path, preprocessor_path):
+    return {"model": file_digest(model_path), "preprocessor": file_digest(preprocessor_path)}
+
+
+def grid_features(plan, shape, score_min, start, stop):
+    """Encodes grid rows [start, stop) with the compiled preprocessor's parameters."""
+    coords = np.unravel_index(np.arange(start, stop), shape)
+    X = np.zeros((stop - start, plan.n_features_out))
+    rows = np.arange(stop - start)
+    for (column, lookup, _), level in zip(plan.categorical, coords):
+        output_index = np.fromiter(lookup.values(), dtype=np.int64)
+        known = level < len(lookup)
+        X[rows[known], output_index[level[known]]] = 1.0
+    scores = dict(zip(SCORE_COLUMNS, coords[-2:]))
+    for column, index, _, mean, scale in plan.numerical:
+        # same float64 subtract/divide as StandardScaler
+        X[:, index] = ((scores[column] + score_min).astype(np.float64) - mean) / scale
+    return X
+
+
+def build_lookup_table(model, preprocessor, table_path, meta_path, fingerprint, config=None, dtype="float64"):
+    """
+    Scores the whole grid with `model` and writes the table (.npy) and its
+    metadata (.json). Returns the metadata, which includes the build time.
+    """
+    from src.pipeline.fast_transform import compile_preprocessor
+    from src.pipeline.predict_pipeline import CATEGORICAL_FEATURES, FEATURE_COLUMNS
+    import pandas as pd
+
+    try:
+        config = config or LookupTableConfig()
+        plan = compile_preprocessor(preprocessor)
+        if plan is None:
+            raise ValueError("preprocessor cannot be compiled, lookup table not built")
+        if [c[0] for c in plan.categorical] != CATEGORICAL_FEATURES or [n[0] for n in plan.numerical] != SCORE_COLUMNS:
+            raise ValueError("preprocessor columns do not match the lookup table layout")
+
+        start_time = time.perf_counter()
+        levels = [(column, list(lookup)) for column, lookup, _ in plan.categorical]
+        table = LookupTable(None, levels, config.score_min, config.score_max, fingerprint)
+        n_cells = int(np.prod(table.shape))
+
+        os.makedirs(os.path.dirname(table_path), exist_ok=True)
+        values = np.lib.format.open_memmap(table_path, mode="w+", dtype=dtype, shape=(n_cells,))
+        for start in range(0, n_cells, config.build_chunk_rows):
+            stop = min(start + config.build_chunk_rows, n_cells)
+            values[start:stop] = model.predict(grid_features(plan, table.shape, config.score_min, start, stop))
+        values.flush()
+        build_seconds = time.perf_counter() - start_time
+
+        # spot-check random cells against the regular preprocessor.transform + model.predict path
+        table.values = values
+        rng = np.random.RandomState(42)
+        records = []
+        for index in rng.randint(0, n_cells, 1000):
+            coords = np.unravel_index(index, table.shape)
+            record = {column: categories[level] if level < len(categories) else "unknown"
+                      for (column, categories), level in zip(levels, coords)}
+            record.update({column: float(score + config.score_min) for column, score in zip(SCORE_COLUMNS, coords[-2:])})
+            records.append(record)
+        X = preprocessor.transform(pd.DataFrame.from_records(records, columns=FEATURE_COLUMNS))
+        expected = model.predict(X.toarray() if hasattr(X, "toarray") else X)
+        tolerance = np.finfo(dtype).eps * 4
+        if not np.allclose(table.lookup_many(records), expected, rtol=tolerance, atol=tolerance):
+            raise ValueError("lookup table does not match model.predict")
+
+        del values
+        meta = {
+            "levels": levels,
+            "score_min": config.score_min,
+            "score_max": config.score_max,
+            "shape": list(table.shape),
+            "dtype": dtype,
+            "fingerprint": fingerprint,
+            "build_seconds": build_seconds,
+            "size_bytes": os.path.getsize(table_path),
+        }
+        with open(meta_path, "w") as file_obj:
+            json.dump(meta, file_obj, indent=2)
+        logging.info(f"Lookup table with {n_cells} cells built in {build_seconds:.1f}s")
+        return meta
+    except Exception as e:
+        raise CustomException(e, sys)
+
+
+def load_lookup_table(artifacts_path, model_path, preprocessor_path, config=None):
+    """
+    Opens the table in `artifacts_path` if it exists and was built from the
+    given model and preprocessor files; returns None otherwise.
+    """
+    config = config or LookupTableConfig()
+    table_path = os.path.join(artifacts_path, config.table_file_name)
+    meta_path = os.path.join(artifacts_path, config.meta_file_name)
+    if not (os.path.exists(table_path) and os.path.exists(meta_path)):
+        return None
+    try:
+        table = LookupTable.load(table_path, meta_path)
+        if table.fingerprint != artifact_fingerprint(model_path, preprocessor_path):
+            logging.warning("Lookup table was built for other artifacts; not used until it is rebuilt")
+            return None
+        logging.info(f"Using lookup table {table_path}")
+        return table
+    except Exception as e:
+        logging.warning(f"Could not load lookup table: {e}")
+        return None
+
+
+if __name__ == "__main__":
+    from src.pipeline.model_registry import model_registry
+    from src.pipeline.predict_pipeline import PredictPipeline, PredictPipelineConfig
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--dtype", choices=["float64", "float32"], default="float64")
+    args = parser.parse_args()
+
+    config = LookupTableConfig()
+    model_path = model_registry.path_for(model_registry.model_file_name())
+    preprocessor_path = model_registry.path_for(model_registry.config.preprocessor_file_name)
+    table_path = model_registry.path_for(config.table_file_name)
+    meta_path = model_registry.path_for(config.meta_file_name)
+
+    meta = build_lookup_table(
+        model_registry.get_model(), model_registry.get_preprocessor(), table_path, meta_path,
+        artifact_fingerprint(model_path, preprocessor_path), config, args.dtype,
+    )
+    print(f"cells: {int(np.prod(meta['shape']))} {tuple(meta['shape'])}")
+    print(f"size: {meta['size_bytes'] / 1024 ** 2:.1f} MB ({meta['dtype']})")
+    print(f"build time: {meta['build_seconds']:.1f} s")
+
+    table = LookupTable.load(table_path, meta_path)
+    record = {
+        "gender": "female", "race_ethnicity": "group B", "parental_level_of_education": "bachelor's degree",
+        "lunch": "standard", "test_preparation_course": "none", "reading_score": 72.0, "writing_score": 74.0,
+    }
+    n = 10000
+    start = time.perf_counter()
+    for _ in range(n):
+        table.lookup_many([record])
+    lookup_us = (time.perf_counter() - start) / n * 1e6
+
+    # the same record through the compiled preprocessor + model, without the table or cache
+    pipeline = PredictPipeline(PredictPipelineConfig(lookup_table=False))
+    pipeline.cache.config.enabled = False
+    pipeline.predict_record(record)
+    start = time.perf_counter()
+    for _ in range(200):
+        pipeline.predict_record(record)
+    model_us = (time.perf_counter() - start) / 200 * 1e6
+    print(f"lookup latency: {lookup_us:.1f} us/record (model path: {model_us:.1f} us/record)")
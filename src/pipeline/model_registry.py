@@ -0,0 +1,183 @@
+import json
+import os
+import sys
+import threading
+import time
+from dataclasses import dataclass
+from src.exception import CustomException
+from src.logger import log_event
+from src.metrics import model_load_seconds
+from src.utils import load_object, file_digest
+
+
+@dataclass
+class ModelRegistryConfig:
+    # model.pkl (dill), model.joblib or model.ubj - see ModelTrainerConfig.model_format.
+    # Unset: serve the file the last training run named in model_pointer_file_name
+    # (MODEL_FORMAT=ubj only writes model.ubj when XGBoost wins), else default_model_file_name
+    model_file_name: str = os.environ.get("MODEL_FILE") or None
+    model_pointer_file_name: str = "model_pointer.json"
+    default_model_file_name: str = "model.pkl"
+    preprocessor_file_name: str = "preprocessor.pkl"
+    # "mtime": reload as soon as the file's mtime/size changes
+    # "hash":  on an mtime/size change, only reload if the sha256 of the contents changed too
+    reload_check: str = os.environ.get("MODEL_RELOAD_CHECK", "mtime")
+
+
+def find_artifacts_path():
+    """
+    Locates the artifacts directory, trying the current working directory
+    first (deployment scenario) and then the project root.
+    """
+    # Strategy 1: From current working directory (deployment scenario)
+    if os.path.exists(os.path.join(os.getcwd(), 'artifacts')):
+        return os.path.join(os.getcwd(), 'artifacts')
+
+    # Strategy 2: From project root (calculated from file location)
+    current_dir = os.path.dirname(os.path.abspath(__file__))
+    project_root = os.path.abspath(os.path.join(current_dir, '..', '..'))
+    potential_path = os.path.join(project_root, 'artifacts')
+    if os.path.exists(potential_path):
+        return potential_path
+
+    cwd = os.getcwd()
+    available_files = os.listdir(cwd) if os.path.exists(cwd) else []
+    error_msg = f"""
+    Artifacts directory not found!
+    Current working directory: {cwd}
+    This file location: {current_dir}
+    Files in current dir: {available_files}
+    """
+    raise FileNotFoundError(error_msg)
+
+
+@dataclass
+class _Entry:
+    obj: object
+    mtime_ns: int
+    size: int
+    digest: str = None
+
+
+class ModelRegistry:
+    """
+    Process-wide cache of deserialized artifacts.
+
+    Each artifact is loaded once and handed out on every later call. A cheap
+    os.stat() on each lookup detects a new file on disk, in which case the
+    artifact is reloaded. Loads are serialized by a lock so concurrent
+    threads never deserialize the same file twice.
+    """
+    def __init__(self, config=None, artifacts_path=None):
+        self.config = config or ModelRegistryConfig()
+        self._artifacts_path = artifacts_path
+        self._entries = {}
+        self._lock = threading.RLock()
+        self._stats = {"hits": 0, "misses": 0, "reloads": 0, "load_seconds": 0.0}
+        # ((mtime_ns, size) of the pointer file, model file name it holds)
+        self._pointer = (None, None)
+
+    @property
+    def artifacts_path(self):
+        # resolved lazily: app.py may chdir() before the first request
+        if self._artifacts_path is None:
+            self._artifacts_path = find_artifacts_path()
+        return self._artifacts_path
+
+    def path_for(self, file_name):
+        return os.path.join(self.artifacts_path, file_name)
+
+    def get(self, file_name):
+        try:
+            file_path = self.path_for(file_name)
+            if not os.path.exists(file_path):
+                raise FileNotFoundError(f"Artifact file not found at: {file_path}")
+
+            stat = os.stat(file_path)
+            entry = self._entries.get(file_name)
+            if entry is not None and self._is_current(entry, stat):
+                with self._lock:
+                    self._stats["hits"] += 1
+                return entry.obj
+
+            with self._lock:
+                # another thread may have loaded it while we waited for the lock
+                entry = self._entries.get(file_name)
+                if entry is not None and self._is_current(entry, stat):
+                    self._stats["hits"] += 1
+                    return entry.obj
+
+                digest = None
+                if self.config.reload_check == "hash":
+                    digest = file_digest(file_path)
+                    if entry is not None and entry.digest == digest:
+                        # touched or re-copied, but the contents are unchanged
+                        entry.mtime_ns, entry.size = stat.st_mtime_ns, stat.st_size
+                        self._stats["hits"] += 1
+                        return entry.obj
+
+                self._stats["misses"] += 1
+                if entry is not None:
+                    self._stats["reloads"] += 1
+                start = time.perf_counter()
+                obj = load_object(file_path=file_path)
+                seconds = time.perf_counter() - start
+                self._stats["load_seconds"] += seconds
+                model_load_seconds.observe(seconds, file_name)
+                log_event("artifact_loaded", artifact=file_name, path=file_path,
+                          seconds=round(seconds, 4), reload=entry is not None)
+                self._entries[file_name] = _Entry(obj, stat.st_mtime_ns, stat.st_size, digest)
+                return obj
+
+        except Exception as e:
+            raise CustomException(e, sys)
+
+    def _is_current(self, entry, stat):
+        return entry.mtime_ns == stat.st_mtime_ns and entry.size == stat.st_size
+
+    def model_file_name(self):
+        """
+        The model artifact to serve: MODEL_FILE when set, otherwise the file
+        recorded by the trainer in model_pointer.json (re-read whenever that
+        file changes), otherwise model.pkl for artifacts trained before the
+        pointer existed.
+        """
+        if self.config.model_file_name:
+            return self.config.model_file_name
+        try:
+            stat = os.stat(self.path_for(self.config.model_pointer_file_name))
+        except FileNotFoundError:
+            return self.config.default_model_file_name
+        key, file_name = self._pointer
+        if key != (stat.st_mtime_ns, stat.st_size):
+            with open(self.path_for(self.config.model_pointer_file_name)) as file_obj:
+                file_name = json.load(file_obj)["file"]
+            self._pointer = ((stat.st_mtime_ns, stat.st_size), file_name)
+        return file_name
+
+    def get_model(self):
+        return self.get(self.model_file_name())
+
+    def get_preprocessor(self):
+        return self.get(self.config.preprocessor_file_name)
+
+    def version(self, file_name):
+        """Token that changes whenever the cached artifact is replaced."""
+        entry = self._entries.get(file_name)
+        if entry is None:
+            return None
+        return entry.digest or f"{entry.mtime_ns}-{entry.size}"
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            stats["loaded"] = sorted(self._entries)
+        return stats
+
+
+# one registry per worker process, shared by every PredictPipeline
+model_registry = ModelRegistry()
@@ -1,71 +1,322 @@
-import sys
 import os
+import sys
+from dataclasses import dataclass
+import numpy as np
 import pandas as pd
 from src.exception import CustomException
-from src.utils import load_object 
+from src.metrics import predictions_total
+from src.pipeline.model_registry import model_registry
+from src.pipeline.fast_transform import compile_preprocessor
+from src.pipeline.tree_engine import compile_tree_model
+from src.pipeline.prediction_cache import prediction_cache
+from src.pipeline.lookup_table import load_lookup_table
+from src.pipeline.input_schema import InputSchema, validate_record
+from src.pipeline.drift import drift_monitor
+from src.pipeline.ensemble import (
+    ensemble_members, shadow_members, manifest_version, score_member, shadow_scorer,
+)
+
+CATEGORICAL_FEATURES = ['gender', 'race_ethnicity', 'parental_level_of_education', 'lunch', 'test_preparation_course']
+NUMERICAL_FEATURES = ['reading_score', 'writing_score']
+FEATURE_COLUMNS = CATEGORICAL_FEATURES + NUMERICAL_FEATURES
+
+
+@dataclass
+class PredictPipelineConfig:
+    # number of records sent through one preprocessor.transform / model.predict call
+    batch_chunk_size: int = int(os.environ.get("BATCH_CHUNK_SIZE", 1024))
+    # encode records with the compiled, pandas-free preprocessor when possible
+    fast_path: bool = os.environ.get("FAST_PATH", "1") == "1"
+    # score tree models with the flattened, vectorized tree engine when possible
+    tree_engine: bool = os.environ.get("TREE_ENGINE", "1") == "1"
+    # above this many rows sklearn's compiled predict() is faster than the tree engine
+    tree_engine_max_rows: int = int(os.environ.get("TREE_ENGINE_MAX_ROWS", 256))
+    # answer in-range records from artifacts/lookup_table.npy when it matches the artifacts
+    lookup_table: bool = os.environ.get("LOOKUP_TABLE", "1") == "1"
+    # "single": the primary model only
+    # "ensemble": average of the top models in artifacts/models/manifest.json (TRAIN_TOP_K)
+    # "shadow": the primary model answers; the other top models are scored in the background
+    serving_mode: str = os.environ.get("SERVING_MODE", "single")
+
+
+# (preprocessor object, input schema) - rebuilt whenever the registry reloads the preprocessor
+_input_schema = (None, None)
+
+
+def get_input_schema(preprocessor=None):
+    """The InputSchema of the current preprocessor, or None if it has no one-hot encoder."""
+    global _input_schema
+    preprocessor = preprocessor or model_registry.get_preprocessor()
+    cached_for, schema = _input_schema
+    if cached_for is not preprocessor:
+        schema = InputSchema.from_preprocessor(preprocessor)
+        _input_schema = (preprocessor, schema)
+    return schema
+
+
+def normalize_record(record, schema=None):
+    """
+    Validates one CustomData-shaped mapping against the input schema (see
+    src/pipeline/input_schema.py) and returns it normalized: categoricals
+    in their fitted spelling, float scores. Raises ValueError on bad input.
+    """
+    schema = schema or get_input_schema()
+    if schema is not None:
+        return validate_record(schema, record)
+
+    # preprocessor without a one-hot encoder: type checks and lowercased categoricals only
+    if not isinstance(record, dict):
+        raise ValueError("record must be a JSON object")
+
+    missing = [column for column in FEATURE_COLUMNS if record.get(column) in (None, "")]
+    if missing:
+        raise ValueError(f"missing fields: {missing}")
+
+    row = {}
+    for column in CATEGORICAL_FEATURES:
+        value = record[column]
+        if not isinstance(value, str):
+            raise ValueError(f"{column} must be a string")
+        row[column] = value.lower()
+
+    for column in NUMERICAL_FEATURES:
+        # float() would take JSON true/false as 1.0/0.0
+        if isinstance(record[column], bool):
+            raise ValueError(f"{column} must be a number")
+        try:
+            row[column] = float(record[column])
+        except (TypeError, ValueError):
+            raise ValueError(f"{column} must be a number")
+
+    return row
+
+
+# (preprocessor object, compiled plan) - rebuilt whenever the registry reloads the preprocessor
+_compiled_preprocessor = (None, None)
+
+
+def get_compiled_preprocessor(preprocessor):
+    global _compiled_preprocessor
+    cached_for, plan = _compiled_preprocessor
+    if cached_for is not preprocessor:
+        plan = compile_preprocessor(preprocessor)
+        _compiled_preprocessor = (preprocessor, plan)
+    return plan
+
+
+# (model object, compiled tree engine) - rebuilt whenever the registry reloads the model
+_compiled_model = (None, None)
+
+
+def get_compiled_model(model):
+    global _compiled_model
+    cached_for, engine = _compiled_model
+    if cached_for is not model:
+        engine = compile_tree_model(model)
+        _compiled_model = (model, engine)
+    return engine
+
+
+# (model object, preprocessor object, lookup table) - reopened whenever the registry reloads either
+_lookup_table = (None, None, None)
+
+
+def get_lookup_table(model, preprocessor):
+    global _lookup_table
+    cached_model, cached_preprocessor, table = _lookup_table
+    if cached_model is not model or cached_preprocessor is not preprocessor:
+        table = load_lookup_table(
+            model_registry.artifacts_path,
+            model_registry.path_for(model_registry.model_file_name()),
+            model_registry.path_for(model_registry.config.preprocessor_file_name),
+        )
+        _lookup_table = (model, preprocessor, table)
+    return table
+
+
+def warm_up(config=None):
+    """
+    Loads the artifacts and builds every per-model cache (compiled
+    preprocessor, tree engine, lookup table) in this process, so a
+    gunicorn master can do it once before forking its workers.
+    """
+    try:
+        config = config or PredictPipelineConfig()
+        model = model_registry.get_model()
+        preprocessor = model_registry.get_preprocessor()
+        get_input_schema(preprocessor)
+        if config.fast_path:
+            get_compiled_preprocessor(preprocessor)
+        if config.tree_engine:
+            get_compiled_model(model)
+        if config.lookup_table and config.serving_mode != "ensemble":
+            get_lookup_table(model, preprocessor)
+        if config.serving_mode == "ensemble":
+            ensemble_members(config.tree_engine)
+        elif config.serving_mode == "shadow":
+            shadow_members(config.tree_engine)
+    except Exception as e:
+        raise CustomException(e, sys)
 
 
 class PredictPipeline:
-    def __init__(self):
-        pass
+    def __init__(self, config=None, cache=None):
+        self.config = config or PredictPipelineConfig()
+        self.cache = cache or prediction_cache
+
+    def _predict_model(self, X):
+        # X is transformed once; every ensemble model scores the same matrix
+        if self.config.serving_mode == "ensemble":
+            members = ensemble_members(self.config.tree_engine)
+            if members:
+                return np.mean([
+                    score_member(model, engine, X, self.config.tree_engine_max_rows)
+                    for _, model, engine in members
+                ], axis=0)
+
+        model = model_registry.get_model()
+        engine = get_compiled_model(model) if self.config.tree_engine else None
+        return score_member(model, engine, X, self.config.tree_engine_max_rows)
+
+    def _transform(self, features):
+        # artifacts are deserialized once per process and reused across requests
+        preprocessor = model_registry.get_preprocessor()
+
+        data_scaled = preprocessor.transform(features)
+        # the preprocessor may emit CSR; models are always served dense rows
+        if hasattr(data_scaled, "toarray"):
+            data_scaled = data_scaled.toarray()
+        return data_scaled
+
+    def _transform_rows(self, rows):
+        if self.config.fast_path:
+            plan = get_compiled_preprocessor(model_registry.get_preprocessor())
+            if plan is not None:
+                return plan.transform_records(rows)
+        return self._transform(pd.DataFrame.from_records(rows, columns=FEATURE_COLUMNS))
 
     def predict(self, features):
         try:
-            # Multiple strategies to find artifacts directory
-            artifacts_path = None
-            
-            # Strategy 1: From current working directory (deployment scenario)
-            if os.path.exists(os.path.join(os.getcwd(), 'artifacts')):
-                artifacts_path = os.path.join(os.getcwd(), 'artifacts')
-            
-            # Strategy 2: Relative to this file location
-            elif os.path.exists('artifacts'):
-                artifacts_path = 'artifacts'
-            
-            # Strategy 3: From project root (calculated from file location)
-            else:
-                current_dir = os.path.dirname(os.path.abspath(__file__))
-                project_root = os.path.abspath(os.path.join(current_dir, '..', '..'))
-                potential_path = os.path.join(project_root, 'artifacts')
-                if os.path.exists(potential_path):
-                    artifacts_path = potential_path
-            
-            # If still not found, print debug info and raise error
-            if artifacts_path is None:
-                cwd = os.getcwd()
-                file_dir = os.path.dirname(os.path.abspath(__file__))
-                available_files = os.listdir(cwd) if os.path.exists(cwd) else []
-                error_msg = f"""
-                Artifacts directory not found!
-                Current working directory: {cwd}
-                This file location: {file_dir}
-                Files in current dir: {available_files}
-                """
-                raise FileNotFoundError(error_msg)
-            
-            model_path = os.path.join(artifacts_path, 'model.pkl')
-            preprocessor_path = os.path.join(artifacts_path, 'preprocessor.pkl')
-            
-            print(f"Working directory: {os.getcwd()}")
-            print(f"Using artifacts path: {artifacts_path}")
-            print(f"Model path: {model_path}")
-            print(f"Preprocessor path: {preprocessor_path}")
-            
-            # Verify files exist
-            if not os.path.exists(model_path):
-                raise FileNotFoundError(f"Model file not found at: {model_path}")
-            if not os.path.exists(preprocessor_path):
-                raise FileNotFoundError(f"Preprocessor file not found at: {preprocessor_path}")
-
-            model = load_object(file_path=model_path)
-            preprocessor = load_object(file_path=preprocessor_path)
-
-            data_scaled = preprocessor.transform(features)
-            preds = model.predict(data_scaled)
+            data_scaled = self._transform(features)
+            preds = self._predict_model(data_scaled)
+            if self.config.serving_mode == "shadow":
+                shadow_scorer.submit(data_scaled, preds, shadow_members(self.config.tree_engine),
+                                     self.config.tree_engine_max_rows)
             return preds
         except Exception as e:
             raise CustomException(e, sys)
 
+    def predict_rows(self, rows):
+        """
+        Scores already-normalized records (see normalize_record) in one call.
+        Records covered by the lookup table are read from it, records seen
+        before under the same model/preprocessor come from the prediction
+        cache, and only the rest reach the model. In shadow mode the rows
+        and their answers are then queued for the challengers, whose thread
+        runs the preprocessor itself, so table and cache hits are shadowed
+        too without a transform on the request path.
+        """
+        try:
+            predictions_total.inc(amount=len(rows))
+            preds = self._serve_rows(rows)
+            if self.config.serving_mode == "shadow":
+                shadow_scorer.submit(rows, preds, shadow_members(self.config.tree_engine),
+                                     self.config.tree_engine_max_rows, transform=self._transform_rows)
+            drift_monitor.observe(rows, preds)
+            return preds
+        except Exception as e:
+            raise CustomException(e, sys)
+
+    def _serve_rows(self, rows):
+        try:
+            if not (self.config.lookup_table or self.cache.config.enabled):
+                return self._predict_rows(rows)
+
+            # get_*() reloads changed artifacts first, so tables and versions match what will score
+            model = model_registry.get_model()
+            preprocessor = model_registry.get_preprocessor()
+
+            preds = [None] * len(rows)
+            # the table holds the primary model's scores, not the ensemble's
+            if self.config.lookup_table and self.config.serving_mode != "ensemble":
+                table = get_lookup_table(model, preprocessor)
+                if table is not None:
+                    preds = table.lookup_many(rows)
+            pending = [i for i, pred in enumerate(preds) if pred is None]
+            if not pending:
+                return np.array(preds)
+
+            if not self.cache.config.enabled:
+                for i, pred in zip(pending, self._predict_rows([rows[i] for i in pending])):
+                    preds[i] = float(pred)
+                return np.array(preds)
+
+            version = "/".join(str(model_registry.version(name)) for name in (
+                model_registry.model_file_name(), model_registry.config.preprocessor_file_name))
+            if self.config.serving_mode == "ensemble":
+                version += f"/{self.config.serving_mode}/{manifest_version()}"
+            keys = {i: tuple(rows[i][column] for column in FEATURE_COLUMNS) for i in pending}
+            for i, pred in zip(pending, self.cache.get_many(version, list(keys.values()))):
+                preds[i] = pred
+
+            # repeated records within the batch are scored once
+            missing = {}
+            for i in pending:
+                if preds[i] is None:
+                    missing.setdefault(keys[i], rows[i])
+            if missing:
+                computed = dict(zip(missing, (float(pred) for pred in self._predict_rows(list(missing.values())))))
+                for i in pending:
+                    if preds[i] is None:
+                        preds[i] = computed[keys[i]]
+                self.cache.put_many(version, computed.items())
+            return np.array(preds)
+        except Exception as e:
+            raise CustomException(e, sys)
+
+    def _predict_rows(self, rows):
+        try:
+            return self._predict_model(self._transform_rows(rows))
+        except Exception as e:
+            raise CustomException(e, sys)
+
+    def predict_record(self, row):
+        """Scores a single normalized record; uses the pandas-free path when available."""
+        return self.predict_rows([row])[0]
+
+    def predict_batch(self, records, chunk_size=None):
+        """
+        Scores a list of CustomData-shaped dicts. Valid records are stacked
+        into one DataFrame per chunk so the preprocessor and model run once
+        per chunk instead of once per record.
+
+        Returns one dict per input record, in input order: either
+        {"prediction": value} or {"error": message}.
+        """
+        try:
+            chunk_size = chunk_size or self.config.batch_chunk_size
+            if chunk_size < 1:
+                raise ValueError("chunk_size must be a positive integer")
+
+            results = [None] * len(records)
+            valid_index, valid_rows = [], []
+            schema = get_input_schema()
+            for i, record in enumerate(records):
+                try:
+                    valid_rows.append(normalize_record(record, schema))
+                    valid_index.append(i)
+                except ValueError as e:
+                    results[i] = {"error": str(e)}
+
+            for start in range(0, len(valid_rows), chunk_size):
+                preds = self.predict_rows(valid_rows[start:start + chunk_size])
+                for i, pred in zip(valid_index[start:start + chunk_size], preds):
+                    results[i] = {"prediction": float(pred)}
+
+            return results
+        except Exception as e:
+            raise CustomException(e, sys)
+
 
 class CustomData:
     def __init__(self,
@@ -86,20 +337,29 @@ class CustomData:
         self.writing_score = writing_score
 
 
-    def get_data_as_data_frame(self):
+    def get_data_as_dict(self):
         try:
-            # ✅ Added: lowercase for categorical columns (avoid unseen category errors)
-            custom_data_input_dict = {
-                "gender": [self.gender.lower()],
-                "race_ethnicity": [self.race_ethnicity.lower()],
-                "parental_level_of_education": [self.parental_level_of_education.lower()],
-                "lunch": [self.lunch.lower()],
-                "test_preparation_course": [self.test_preparation_course.lower()],
-                "reading_score": [float(self.reading_score)],
-                "writing_score": [float(self.writing_score)]
-            }
+            # validated against the fitted categories, which also fixes their case
+            # (raises InputValidationError, a ValueError, on bad input)
+            return normalize_record({
+                "gender": self.gender,
+                "race_ethnicity": self.race_ethnicity,
+                "parental_level_of_education": self.parental_level_of_education,
+                "lunch": self.lunch,
+                "test_preparation_course": self.test_preparation_course,
+                "reading_score": self.reading_score,
+                "writing_score": self.writing_score
+            })
+
+        except ValueError:
+            raise
+        except Exception as e:
+            raise CustomException(e, sys)
 
+    def get_data_as_data_frame(self):
+        try:
+            custom_data_input_dict = {key: [value] for key, value in self.get_data_as_dict().items()}
             return pd.DataFrame(custom_data_input_dict)
-        
+
         except Exception as e:
             raise CustomException(e, sys)
@@ -0,0 +1,191 @@
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from src.exception import CustomException
+from src.logger import logging
+
+
+@dataclass
+class PredictionCacheConfig:
+    enabled: bool = os.environ.get("PREDICTION_CACHE", "1") == "1"
+    # most recently used predictions kept per worker process
+    max_entries: int = int(os.environ.get("PREDICTION_CACHE_SIZE", 10000))
+    # seconds an entry stays valid; 0 keeps entries until evicted or the model changes
+    ttl_seconds: float = float(os.environ.get("PREDICTION_CACHE_TTL", 3600))
+    # optional shared second level, e.g. redis://localhost:6379/0, so workers share hits
+    redis_url: str = os.environ.get("REDIS_URL")
+    redis_prefix: str = "prediction:"
+
+
+class RedisBackend:
+    """Shared cache level; the redis client is imported only when REDIS_URL is set."""
+    def __init__(self, url, prefix, ttl_seconds):
+        import redis
+
+        self.client = redis.Redis.from_url(url, socket_timeout=0.05)
+        self.prefix = prefix
+        self.ttl_seconds = ttl_seconds
+
+    def _key(self, version, key):
+        return f"{self.prefix}{version}:{'|'.join(map(str, key))}"
+
+    def get(self, version, key):
+        value = self.client.get(self._key(version, key))
+        return None if value is None else float(value)
+
+    def set(self, version, key, value):
+        # entries of an older model version are never read again and expire on their own
+        ttl = int(self.ttl_seconds) if self.ttl_seconds > 0 else None
+        self.client.set(self._key(version, key), repr(value), ex=ttl)
+
+
+class PredictionCache:
+    """
+    Bounded LRU/TTL cache of predictions keyed by the normalized record
+    (see normalize_record), so repeated inputs skip the preprocessor and
+    the model.
+
+    Every lookup passes the current artifact version (from the model
+    registry); when it differs from the version the entries were computed
+    for, the local cache is dropped. With REDIS_URL set, misses fall through
+    to a shared Redis cache before being computed, and Redis errors are
+    logged and treated as misses.
+    """
+    def __init__(self, config=None):
+        self.config = config or PredictionCacheConfig()
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._version = None
+        self._bytes = 0
+        self._backend = None
+        self._stats = {
+            "hits": 0, "shared_hits": 0, "misses": 0,
+            "evictions": 0, "expirations": 0, "invalidations": 0, "backend_errors": 0,
+        }
+
+    @property
+    def backend(self):
+        if self._backend is None and self.config.redis_url:
+            try:
+                self._backend = RedisBackend(self.config.redis_url, self.config.redis_prefix, self.config.ttl_seconds)
+            except Exception as e:
+                logging.warning(f"Shared prediction cache unavailable, using local cache only: {e}")
+                self.config.redis_url = None
+        return self._backend
+
+    def _check_version(self, version):
+        if version != self._version:
+            if self._version is not None:
+                self._stats["invalidations"] += 1
+                logging.info("Model artifacts changed, prediction cache cleared")
+            self._entries.clear()
+            self._bytes = 0
+            self._version = version
+
+    def get_many(self, version, keys):
+        """Returns a list with the cached prediction, or None, for every key."""
+        try:
+            now = time.monotonic()
+            results = [None] * len(keys)
+            missing = []
+            with self._lock:
+                self._check_version(version)
+                for i, key in enumerate(keys):
+                    entry = self._entries.get(key)
+                    if entry is not None and entry[1] is not None and entry[1] <= now:
+                        self._remove(key)
+                        self._stats["expirations"] += 1
+                        entry = None
+                    if entry is None:
+                        missing.append(i)
+                        continue
+                    self._entries.move_to_end(key)
+                    self._stats["hits"] += 1
+                    results[i] = entry[0]
+
+            if missing and self.backend is not None:
+                shared = {}
+                try:
+                    for i in missing:
+                        value = self.backend.get(version, keys[i])
+                        if value is not None:
+                            shared[i] = value
+                except Exception as e:
+                    with self._lock:
+                        self._stats["backend_errors"] += 1
+                    logging.warning(f"Shared prediction cache lookup failed: {e}")
+                for i, value in shared.items():
+                    results[i] = value
+                self._put_local(version, [(keys[i], value) for i, value in shared.items()])
+                with self._lock:
+                    self._stats["shared_hits"] += len(shared)
+                missing = [i for i in missing if i not in shared]
+
+            with self._lock:
+                self._stats["misses"] += len(missing)
+            return results
+        except Exception as e:
+            raise CustomException(e, sys)
+
+    def put_many(self, version, items):
+        """Stores (key, prediction) pairs for the given artifact version."""
+        try:
+            items = [(key, float(value)) for key, value in items]
+            self._put_local(version, items)
+            if self.backend is not None:
+                try:
+                    for key, value in items:
+                        self.backend.set(version, key, value)
+                except Exception as e:
+                    with self._lock:
+                        self._stats["backend_errors"] += 1
+                    logging.warning(f"Shared prediction cache store failed: {e}")
+        except Exception as e:
+            raise CustomException(e, sys)
+
+    def _put_local(self, version, items):
+        ttl = self.config.ttl_seconds
+        expires_at = time.monotonic() + ttl if ttl > 0 else None
+        with self._lock:
+            self._check_version(version)
+            for key, value in items:
+                if key in self._entries:
+                    self._remove(key)
+                self._entries[key] = (value, expires_at)
+                self._bytes += _entry_size(key, self._entries[key])
+            while len(self._entries) > self.config.max_entries:
+                self._remove(next(iter(self._entries)))
+                self._stats["evictions"] += 1
+
+    def _remove(self, key):
+        entry = self._entries.pop(key)
+        self._bytes -= _entry_size(key, entry)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            stats["size"] = len(self._entries)
+            stats["max_entries"] = self.config.max_entries
+            stats["memory_bytes"] = self._bytes
+        lookups = stats["hits"] + stats["shared_hits"] + stats["misses"]
+        stats["hit_rate"] = (stats["hits"] + stats["shared_hits"]) / lookups if lookups else 0.0
+        stats["backend"] = "redis" if self.config.redis_url else "local"
+        return stats
+
+
+def _entry_size(key, entry):
+    # approximate: key tuple + its items, plus the (value, expiry) tuple and its items
+    return (sys.getsizeof(key) + sum(sys.getsizeof(item) for item in key)
+            + sys.getsizeof(entry) + sum(sys.getsizeof(item) for item in entry))
+
+
+# one cache per worker process, shared by every PredictPipeline
+prediction_cache = PredictionCache()
@@ -0,0 +1,165 @@
+import json
+import os
+import sys
+from dataclasses import dataclass, asdict
+import joblib
+from src.exception import CustomException
+from src.logger import logging
+from src.utils import file_digest
+from src.components.data_ingestion import DataIngestion
+from src.components.data_transformation import DataTransformation
+from src.components.model_trainer import ModelTrainer
+from src.pipeline.drift import DriftConfig, build_baseline
+
+
+@dataclass
+class TrainPipelineConfig:
+    # records, per stage, the hash of its inputs/config and the outputs it produced
+    manifest_path = os.path.join("artifacts", "pipeline_manifest.json")
+    # transformed (X_train, y_train, X_test, y_test), kept so the trainer stage
+    # can run without re-transforming; X may be a sparse matrix
+    transformed_data_path = os.path.join("artifacts", "transformed_data.joblib")
+    # train_csv feature statistics and predictions, compared against served records by DriftMonitor
+    drift_baseline_path = os.path.join("artifacts", DriftConfig.baseline_file_name)
+
+
+class TrainPipeline:
+    """
+    Runs ingestion -> transformation -> training, skipping every stage whose
+    inputs and config hash to the same key as the last successful run and
+    whose outputs are still on disk. A stage's key includes the key of the
+    stage before it, so a change upstream re-runs everything downstream.
+
+    - ingestion:      source CSV contents + DataIngestionConfig
+    - transformation: ingestion key + unfitted preprocessor (column lists, steps)
+    - trainer:        transformation key + models/params dicts + search settings
+    - drift baseline: trainer key
+    """
+    def __init__(self, force=False):
+        self.config = TrainPipelineConfig()
+        self.force = force
+        self.data_ingestion = DataIngestion()
+        self.data_transformation = DataTransformation()
+        self.model_trainer = ModelTrainer()
+
+    def _load_manifest(self):
+        if os.path.exists(self.config.manifest_path):
+            with open(self.config.manifest_path) as file_obj:
+                return json.load(file_obj)
+        return {}
+
+    def _save_manifest(self, manifest):
+        os.makedirs(os.path.dirname(self.config.manifest_path), exist_ok=True)
+        with open(self.config.manifest_path, "w") as file_obj:
+            json.dump(manifest, file_obj, indent=2)
+
+    def _is_fresh(self, manifest, stage, key):
+        entry = manifest.get(stage)
+        return (
+            not self.force
+            and entry is not None
+            and entry["key"] == key
+            and all(os.path.exists(path) for path in entry["outputs"])
+        )
+
+    def ingestion_key(self):
+        ingestion_config = self.data_ingestion.ingestion_config
+        return joblib.hash((file_digest(ingestion_config.source_data_path), asdict(ingestion_config)))
+
+    def transformation_key(self, ingestion_key):
+        preprocessor = self.data_transformation.get_data_transformer_object()
+        return joblib.hash((ingestion_key, preprocessor))
+
+    def trainer_key(self, transformation_key):
+        models, params = self.model_trainer.get_models_and_params()
+        trainer_config = self.model_trainer.model_trainer_config
+        return joblib.hash((
+            transformation_key,
+            {name: (type(model).__name__, model.get_params()) for name, model in models.items()},
+            params,
+            trainer_config.search_strategy,
+            trainer_config.search_n_iter,
+            trainer_config.search_time_budget,
+            trainer_config.dense_only_models,
+            trainer_config.model_format,
+            trainer_config.top_k_models,
+        ))
+
+    def run(self):
+        try:
+            manifest = self._load_manifest()
+            ingestion_config = self.data_ingestion.ingestion_config
+
+            # ---------------- ingestion ----------------
+            key = self.ingestion_key()
+            if self._is_fresh(manifest, "ingestion", key):
+                logging.info("Ingestion unchanged, reusing split files")
+                print("⏭  ingestion (unchanged)")
+                train_path, test_path = ingestion_config.train_data_path, ingestion_config.test_data_path
+            else:
+                print("▶  ingestion")
+                train_path, test_path = self.data_ingestion.initiate_data_ingestion()
+                manifest["ingestion"] = {"key": key, "outputs": [train_path, test_path]}
+                self._save_manifest(manifest)
+
+            # ---------------- transformation ----------------
+            key = self.transformation_key(key)
+            if self._is_fresh(manifest, "transformation", key):
+                logging.info("Transformation unchanged, reusing transformed arrays")
+                print("⏭  transformation (unchanged)")
+                X_train, y_train, X_test, y_test = joblib.load(self.config.transformed_data_path)
+            else:
+                print("▶  transformation")
+                X_train, y_train, X_test, y_test, preprocessor_path = \
+                    self.data_transformation.initiate_data_transformation(train_path, test_path)
+                joblib.dump((X_train, y_train, X_test, y_test), self.config.transformed_data_path)
+                manifest["transformation"] = {
+                    "key": key,
+                    "outputs": [preprocessor_path, self.config.transformed_data_path],
+                }
+                self._save_manifest(manifest)
+
+            # ---------------- trainer ----------------
+            key = self.trainer_key(key)
+            trainer_config = self.model_trainer.model_trainer_config
+            if self._is_fresh(manifest, "trainer", key):
+                logging.info("Trainer unchanged, reusing saved model")
+                print("⏭  trainer (unchanged)")
+                score = manifest["trainer"]["r2_score"]
+            else:
+                print("▶  trainer")
+                score = self.model_trainer.initiate_model_trainer(X_train, y_train, X_test, y_test)
+                outputs = [trainer_config.trained_model_file_path, trainer_config.model_pointer_path]
+                if trainer_config.top_k_models > 1:
+                    outputs.append(trainer_config.top_models_manifest_path)
+                manifest["trainer"] = {
+                    "key": key,
+                    "outputs": outputs,
+                    "r2_score": score,
+                }
+                self._save_manifest(manifest)
+
+            # ---------------- drift baseline ----------------
+            if self._is_fresh(manifest, "drift_baseline", key):
+                logging.info("Model unchanged, reusing drift baseline")
+                print("⏭  drift baseline (unchanged)")
+            else:
+                print("▶  drift baseline")
+                baseline_path = build_baseline(
+                    train_path,
+                    self.data_transformation.data_transformation_config.preprocessor_obj_file_path,
+                    # the model file actually written (MODEL_FORMAT=ubj falls back to joblib for other winners)
+                    manifest["trainer"]["outputs"][0],
+                    self.config.drift_baseline_path,
+                )
+                manifest["drift_baseline"] = {"key": key, "outputs": [baseline_path]}
+                self._save_manifest(manifest)
+            return score
+
+        except Exception as e:
+            raise CustomException(e, sys)
+
+
+if __name__ == "__main__":
+    force = "--force" in sys.argv
+    print(TrainPipeline(force=force).run())
@@ -0,0 +1,150 @@
+import sys
+import numpy as np
+from src.exception import CustomException
+from src.logger import logging
+
+TREE_LEAF = -1
+
+
+class CompiledTreeEnsemble:
+    """
+    Flattened copy of a fitted sklearn tree model (DecisionTree, RandomForest,
+    GradientBoosting or AdaBoost regressor) for low-overhead prediction.
+
+    The nodes of every tree are concatenated into contiguous arrays
+    (feature, threshold, left, right, value) with global node indices, leaves
+    pointing at themselves. A batch is evaluated for all trees at once by
+    stepping every (row, tree) pair one level down per iteration, max_depth
+    times, then combining the leaf values the way the source model does.
+    """
+    def __init__(self, kind, feature, threshold, left, right, value, roots, max_depth,
+                 n_features, base=0.0, scale=1.0, weights=None):
+        self.kind = kind
+        self.feature = feature
+        self.threshold = threshold
+        self.left = left
+        self.right = right
+        self.value = value
+        self.roots = roots
+        self.max_depth = max_depth
+        self.n_features = n_features
+        self.base = base
+        self.scale = scale
+        self.weights = weights
+
+    @classmethod
+    def from_model(cls, model):
+        model_type = type(model).__name__
+        base, scale, weights = 0.0, 1.0, None
+
+        if model_type == "DecisionTreeRegressor":
+            kind, trees = "sum", [model]
+        elif model_type == "RandomForestRegressor":
+            kind, trees = "mean", list(model.estimators_)
+        elif model_type == "GradientBoostingRegressor":
+            kind, trees = "sum", [estimator[0] for estimator in model.estimators_]
+            scale = model.learning_rate
+            if model.init_ != "zero":
+                # the initial estimator (e.g. DummyRegressor) predicts a constant
+                base = float(np.ravel(model.init_.predict(np.zeros((1, model.n_features_in_))))[0])
+        elif model_type == "AdaBoostRegressor":
+            kind, trees = "weighted_median", list(model.estimators_)
+            weights = np.asarray(model.estimator_weights_[:len(trees)], dtype=np.float64)
+        else:
+            raise ValueError(f"{model_type} is not a supported tree model")
+
+        features, thresholds, lefts, rights, values, roots = [], [], [], [], [], []
+        offset, max_depth = 0, 0
+        for tree in trees:
+            tree_ = tree.tree_
+            n_nodes = tree_.node_count
+            is_leaf = tree_.children_left == TREE_LEAF
+            own_index = np.arange(n_nodes)
+
+            features.append(np.where(is_leaf, 0, tree_.feature))
+            thresholds.append(np.where(is_leaf, 0.0, tree_.threshold))
+            lefts.append(np.where(is_leaf, own_index, tree_.children_left) + offset)
+            rights.append(np.where(is_leaf, own_index, tree_.children_right) + offset)
+            values.append(tree_.value[:, 0, 0])
+            roots.append(offset)
+
+            offset += n_nodes
+            max_depth = max(max_depth, tree_.max_depth)
+
+        return cls(
+            kind=kind,
+            feature=np.ascontiguousarray(np.concatenate(features), dtype=np.intp),
+            threshold=np.ascontiguousarray(np.concatenate(thresholds), dtype=np.float64),
+            left=np.ascontiguousarray(np.concatenate(lefts), dtype=np.intp),
+            right=np.ascontiguousarray(np.concatenate(rights), dtype=np.intp),
+            value=np.ascontiguousarray(np.concatenate(values), dtype=np.float64),
+            roots=np.asarray(roots, dtype=np.intp),
+            max_depth=max_depth,
+            n_features=model.n_features_in_,
+            base=base,
+            scale=scale,
+            weights=weights,
+        )
+
+    def leaf_values(self, X):
+        # sklearn trees compare float32 inputs against float64 thresholds
+        X = np.ascontiguousarray(np.asarray(X, dtype=np.float32), dtype=np.float64)
+        # flat offset of each row in X.ravel(), so a lookup is a single take()
+        row_offset = (np.arange(X.shape[0]) * X.shape[1])[:, None]
+        X = X.ravel()
+        node = np.broadcast_to(self.roots, (row_offset.shape[0], self.roots.shape[0])).copy()
+        for _ in range(self.max_depth):
+            go_left = X.take(row_offset + self.feature.take(node)) <= self.threshold.take(node)
+            node = np.where(go_left, self.left.take(node), self.right.take(node))
+        return self.value.take(node)
+
+    def predict(self, X):
+        try:
+            values = self.leaf_values(X)
+            if self.kind == "mean":
+                return values.mean(axis=1)
+            if self.kind == "sum":
+                return self.base + self.scale * values.sum(axis=1)
+
+            # AdaBoostRegressor: weighted median of the estimators' predictions
+            sorted_idx = np.argsort(values, axis=1)
+            weight_cdf = np.cumsum(self.weights[sorted_idx], axis=1)
+            median_or_above = weight_cdf >= 0.5 * weight_cdf[:, -1][:, None]
+            median_idx = median_or_above.argmax(axis=1)
+            rows = np.arange(values.shape[0])
+            return values[rows, sorted_idx[rows, median_idx]]
+        except Exception as e:
+            raise CustomException(e, sys)
+
+    def verify(self, model, X, tolerance=1e-7):
+        expected = model.predict(X)
+        return np.allclose(self.predict(X), expected, rtol=tolerance, atol=tolerance)
+
+    def sample_inputs(self, n_rows=64, seed=42):
+        """Random rows, half of their values set exactly on split thresholds."""
+        rng = np.random.RandomState(seed)
+        X = rng.normal(size=(n_rows, self.n_features))
+        on_threshold = rng.rand(n_rows, self.n_features) < 0.5
+        X[on_threshold] = rng.choice(self.threshold, size=int(on_threshold.sum()))
+        return X
+
+
+def compile_tree_model(model):
+    """
+    Builds and checks a CompiledTreeEnsemble against model.predict. Returns
+    None (callers keep using model.predict) for unsupported models or if the
+    compiled predictions do not match.
+    """
+    try:
+        engine = CompiledTreeEnsemble.from_model(model)
+    except ValueError:
+        return None
+    except Exception as e:
+        logging.warning(f"Could not compile {type(model).__name__}: {e}")
+        return None
+
+    if engine.verify(model, engine.sample_inputs()):
+        logging.info(f"Using compiled tree engine for {type(model).__name__}")
+        return engine
+    logging.warning(f"Compiled {type(model).__name__} does not match model.predict; tree engine disabled")
+    return None
@@ -1,52 +1,536 @@
+import hashlib
 import os
 import sys
+import tempfile
 import dill
 import numpy as np
 import pandas as pd
-from sklearn.metrics import r2_score
-from sklearn.model_selection import GridSearchCV
 from src.exception import CustomException
+from src.logger import logging
+
+# artifact serializers, picked by file extension in save_object / load_object:
+#   .pkl          dill (default)
+#   .joblib       joblib, uncompressed; NumPy arrays are memory-mapped on load
+#   .ubj / .json  XGBoost's native model format (XGBRegressor only)
+SERIALIZER_EXTENSIONS = {".pkl": "dill", ".joblib": "joblib", ".ubj": "xgboost", ".json": "xgboost"}
+
+
+def serializer_for(file_path):
+    return SERIALIZER_EXTENSIONS.get(os.path.splitext(file_path)[1], "dill")
+
 
 def save_object(file_path, obj):
+    """
+    Writes obj to a temporary file next to file_path and renames it into
+    place. Serving workers memory-map .joblib artifacts (load_object with
+    mmap_mode="r"); dumping over the live file would truncate the inode
+    they have mapped and kill them with SIGBUS on the next read, while a
+    rename leaves their old inode intact until they reload.
+    """
+    tmp_path = None
     try:
         dir_path = os.path.dirname(file_path)
-        os.makedirs(dir_path, exist_ok=True)
-        with open(file_path, "wb") as file_obj:
-            dill.dump(obj, file_obj)
+        os.makedirs(dir_path or ".", exist_ok=True)
+        serializer = serializer_for(file_path)
+        # same extension, so joblib and xgboost pick the same format as for file_path
+        fd, tmp_path = tempfile.mkstemp(
+            dir=dir_path or ".", prefix=f".{os.path.basename(file_path)}.", suffix=os.path.splitext(file_path)[1])
+        os.close(fd)
+        # mkstemp creates the file 0600; keep artifacts readable like a plain open() would
+        os.chmod(tmp_path, 0o644)
+        if serializer == "joblib":
+            import joblib
+            joblib.dump(obj, tmp_path)
+        elif serializer == "xgboost":
+            obj.save_model(tmp_path)
+        else:
+            with open(tmp_path, "wb") as file_obj:
+                dill.dump(obj, file_obj)
+        os.replace(tmp_path, file_path)
+        tmp_path = None
+    except Exception as e:
+        raise CustomException(e, sys)
+    finally:
+        if tmp_path is not None and os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def file_digest(file_path):
+    sha = hashlib.sha256()
+    with open(file_path, "rb") as file_obj:
+        for block in iter(lambda: file_obj.read(1 << 20), b""):
+            sha.update(block)
+    return sha.hexdigest()
+
+
+def _frame_format(file_path):
+    if file_path.endswith(".feather"):
+        return "feather"
+    if file_path.endswith(".parquet"):
+        return "parquet"
+    return "csv"
+
+
+def save_frame(df, file_path):
+    """
+    Writes a DataFrame as Feather (Arrow IPC), Parquet or CSV depending on the
+    file extension. The columnar formats keep dtypes, including categoricals.
+    """
+    try:
+        os.makedirs(os.path.dirname(file_path) or ".", exist_ok=True)
+        file_format = _frame_format(file_path)
+        if file_format == "feather":
+            # uncompressed so load_frame can memory-map it without a decode copy
+            df.reset_index(drop=True).to_feather(file_path, compression="uncompressed")
+        elif file_format == "parquet":
+            df.to_parquet(file_path, index=False)
+        else:
+            df.to_csv(file_path, index=False, header=True)
+    except Exception as e:
+        raise CustomException(e, sys)
+
+
+def load_frame(file_path, columns=None):
+    """Reads a frame written by save_frame / FrameWriter; columnar files are memory-mapped."""
+    try:
+        file_format = _frame_format(file_path)
+        if file_format == "feather":
+            import pyarrow.feather as feather
+            return feather.read_table(file_path, columns=columns, memory_map=True).to_pandas()
+        if file_format == "parquet":
+            return pd.read_parquet(file_path, columns=columns, memory_map=True)
+        return pd.read_csv(file_path, usecols=columns)
     except Exception as e:
         raise CustomException(e, sys)
 
 
-def evaluate_models(X_train, y_train, X_test, y_test, models, param):
+def iter_frame_chunks(file_path, chunk_rows, dtype=None):
+    """
+    Streams a Feather, Parquet or CSV file as DataFrames of at most
+    chunk_rows rows, so the whole file is never held in memory. dtype is
+    applied to CSV columns only (the columnar formats carry their own).
+    """
+    file_format = _frame_format(file_path)
+    if file_format == "feather":
+        import pyarrow.feather as feather
+        # memory-mapped: only the sliced rows are paged in
+        table = feather.read_table(file_path, memory_map=True)
+        for start in range(0, table.num_rows, chunk_rows):
+            yield table.slice(start, chunk_rows).to_pandas()
+    elif file_format == "parquet":
+        import pyarrow.parquet as pq
+        for batch in pq.ParquetFile(file_path).iter_batches(batch_size=chunk_rows):
+            yield batch.to_pandas()
+    else:
+        yield from pd.read_csv(file_path, chunksize=chunk_rows, dtype=dtype)
+
+
+class FrameWriter:
+    """
+    Appends DataFrame chunks to one Feather, Parquet or CSV file without
+    holding the whole frame in memory (used by streaming ingestion).
+
+    dtypes ({column: pandas dtype}) fixes the Arrow schema of a columnar file
+    up front, and every chunk is cast to it, so an empty or all-null first
+    chunk cannot pin a column to Arrow's null type. Categorical dtypes must
+    list their categories: they are written as dictionary columns sharing one
+    dictionary, which load_frame reads back as the same categorical. Without
+    dtypes the schema is taken from the first chunk and categoricals are
+    stored as strings.
+    """
+    def __init__(self, file_path, dtypes=None):
+        self.file_path = file_path
+        self.file_format = _frame_format(file_path)
+        self.dtypes = dtypes
+        self._schema = None
+        self._writer = None
+        self._file = None
+
+    def __enter__(self):
+        os.makedirs(os.path.dirname(self.file_path) or ".", exist_ok=True)
+        if self.file_format == "csv":
+            self._file = open(self.file_path, "w", newline="")
+        return self
+
+    def _open(self, schema):
+        import pyarrow as pa
+
+        self._schema = schema
+        if self.file_format == "feather":
+            self._writer = pa.ipc.new_file(self.file_path, schema)
+        else:
+            import pyarrow.parquet as pq
+            self._writer = pq.ParquetWriter(self.file_path, schema)
+
+    def append(self, df):
+        if self.file_format == "csv":
+            df.to_csv(self._file, index=False, header=self._file.tell() == 0)
+            return
+
+        import pyarrow as pa
+
+        if self.dtypes is not None:
+            df = df[list(self.dtypes)].astype(self.dtypes)
+            if self._writer is None:
+                empty = pd.DataFrame({column: pd.Series(dtype=dtype) for column, dtype in self.dtypes.items()})
+                self._open(pa.Schema.from_pandas(empty, preserve_index=False))
+        elif self.file_format == "feather":
+            # the Arrow IPC file format cannot change a dictionary between
+            # batches, and each chunk has its own categories: store as strings
+            df = df.astype({c: "object" for c in df.select_dtypes("category").columns})
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        if self._writer is None:
+            self._open(table.schema)
+        self._writer.write_table(table.cast(self._schema))
+
+    def __exit__(self, *exc_info):
+        if self._writer is not None:
+            self._writer.close()
+        if self._file is not None:
+            self._file.close()
+        return False
+
+
+SEARCH_STRATEGIES = ("grid", "halving", "random", "early_stopping")
+
+# early_stopping strategy: boosting models get a large tree budget and stop
+# once the validation score has not improved for EARLY_STOPPING_ROUNDS rounds
+EARLY_STOPPING_MAX_ESTIMATORS = 1000
+EARLY_STOPPING_ROUNDS = 10
+
+
+def _run_search(model, para, X_train, y_train, n_jobs, strategy, n_iter, time_budget):
+    """
+    Runs one hyperparameter search and returns
+    (best_estimator, best_params, best_cv_score, n_fits).
+    """
+    import time
+    from sklearn.base import clone
+    from sklearn.model_selection import GridSearchCV, ParameterSampler, cross_val_score, train_test_split
+
+    if strategy == "grid":
+        gs = GridSearchCV(model, para, cv=3, n_jobs=n_jobs)
+        gs.fit(X_train, y_train)
+        # refit=True (the default) already fit best_params_ on the full training set
+        return gs.best_estimator_, gs.best_params_, gs.best_score_, len(gs.cv_results_["params"]) * 3 + 1
+
+    if strategy == "halving":
+        from sklearn.experimental import enable_halving_search_cv  # noqa: F401
+        from sklearn.model_selection import HalvingGridSearchCV
+
+        gs = HalvingGridSearchCV(model, para, cv=3, factor=2, n_jobs=n_jobs, random_state=42)
+        gs.fit(X_train, y_train)
+        return gs.best_estimator_, gs.best_params_, gs.best_score_, len(gs.cv_results_["params"]) * 3 + 1
+
+    if strategy == "random":
+        # candidates are tried one by one until the fit budget (n_iter) or
+        # the wall-clock budget (time_budget seconds) runs out
+        started = time.perf_counter()
+        best_params, best_score, n_fits = None, -np.inf, 0
+        for params in ParameterSampler(para, n_iter=n_iter, random_state=42):
+            if best_params is not None and time_budget and time.perf_counter() - started > time_budget:
+                break
+            # ParameterSampler can hand back numpy scalars, which clone() rejects
+            params = {k: v.item() if isinstance(v, np.generic) else v for k, v in params.items()}
+            n_fits += 3
+            try:
+                candidate = clone(model).set_params(**params)
+                score = cross_val_score(candidate, X_train, y_train, cv=3, n_jobs=n_jobs).mean()
+            except Exception as e:
+                # same as GridSearchCV's error_score=nan: skip the candidate
+                logging.warning(f"Skipping {type(model).__name__}{params}: {e}")
+                continue
+            if score > best_score:
+                best_params, best_score = params, score
+        best_params = best_params or {}
+        best_model = clone(model).set_params(**best_params).fit(X_train, y_train)
+        return best_model, best_params, best_score, n_fits + 1
+
+    if strategy == "early_stopping":
+        model_type = type(model).__name__
+        if model_type not in ("XGBRegressor", "GradientBoostingRegressor"):
+            return _run_search(model, para, X_train, y_train, n_jobs, "grid", n_iter, time_budget)
+
+        # n_estimators is no longer searched: early stopping picks it
+        para = {k: v for k, v in para.items() if k != "n_estimators"}
+        model = clone(model)
+        fit_params = {}
+        if model_type == "GradientBoostingRegressor":
+            model.set_params(n_estimators=EARLY_STOPPING_MAX_ESTIMATORS,
+                             n_iter_no_change=EARLY_STOPPING_ROUNDS, validation_fraction=0.1)
+        else:
+            model.set_params(n_estimators=EARLY_STOPPING_MAX_ESTIMATORS,
+                             early_stopping_rounds=EARLY_STOPPING_ROUNDS)
+            X_train, X_val, y_train, y_val = train_test_split(X_train, y_train, test_size=0.1, random_state=42)
+            fit_params = {"eval_set": [(X_val, y_val)], "verbose": False}
+
+        gs = GridSearchCV(model, para, cv=3, n_jobs=n_jobs)
+        gs.fit(X_train, y_train, **fit_params)
+        return gs.best_estimator_, gs.best_params_, gs.best_score_, len(gs.cv_results_["params"]) * 3 + 1
+
+    raise ValueError(f"Unknown search strategy '{strategy}', expected one of {SEARCH_STRATEGIES}")
+
+
+class CVWorkspace:
+    """
+    The training set and its CV folds, split once and shared by every
+    model's search. The full matrices and each fold's train/validation
+    matrices are written to `directory` with joblib and reopened
+    memory-mapped, so parallel search workers read the same pages instead of
+    each receiving a pickled copy and re-splitting it per candidate. Folds
+    are KFold(n_splits) without shuffling, the same as GridSearchCV(cv=3).
+    """
+    def __init__(self, X, y, directory, n_splits=3, dense=False):
+        import joblib
+        from sklearn.model_selection import KFold
+
+        self.directory = directory
+        self.n_splits = n_splits
+        self.dense = dense and hasattr(X, "toarray")
+
+        variants = [("", X)] + ([("_dense", X.toarray())] if self.dense else [])
+        for suffix, X_variant in variants:
+            joblib.dump((X_variant, y), self._path("full", suffix))
+            for fold, (train_index, val_index) in enumerate(KFold(n_splits=n_splits).split(X_variant)):
+                joblib.dump((X_variant[train_index], y[train_index], X_variant[val_index], y[val_index]),
+                            self._path(f"fold{fold}", suffix))
+
+    def _path(self, name, suffix):
+        return os.path.join(self.directory, f"{name}{suffix}.joblib")
+
+    def load_full(self, dense=False):
+        import joblib
+        return joblib.load(self._path("full", "_dense" if dense and self.dense else ""), mmap_mode="r")
+
+    def load_fold(self, fold, dense=False):
+        import joblib
+        return joblib.load(self._path(f"fold{fold}", "_dense" if dense and self.dense else ""), mmap_mode="r")
+
+
+def _score_fold(model, params, workspace, fold, dense):
+    """Fits one candidate on one fold's train matrix and returns R² on its validation matrix."""
+    from sklearn.base import clone
+    from sklearn.metrics import r2_score
+
+    X_fold, y_fold, X_val, y_val = workspace.load_fold(fold, dense)
+    try:
+        estimator = clone(model).set_params(**params).fit(X_fold, y_fold)
+        return r2_score(y_val, estimator.predict(X_val))
+    except Exception as e:
+        # same as GridSearchCV's error_score=nan: the candidate is skipped
+        logging.warning(f"Skipping {type(model).__name__}{params} on fold {fold}: {e}")
+        return np.nan
+
+
+def _run_workspace_search(model, para, workspace, dense, n_jobs, strategy, n_iter, time_budget):
+    """
+    "grid" and "random" searches over a CVWorkspace. Scores, tie-breaking
+    (first best candidate) and the refit match GridSearchCV / the loop in
+    _run_search, so the chosen model is the same.
+    """
+    import time
+    import joblib
+    from sklearn.base import clone
+    from sklearn.model_selection import ParameterGrid, ParameterSampler
+
+    def mean_scores(candidates):
+        scores = joblib.Parallel(n_jobs=n_jobs)(
+            joblib.delayed(_score_fold)(model, params, workspace, fold, dense)
+            for params in candidates for fold in range(workspace.n_splits)
+        )
+        return [np.mean(scores[i:i + workspace.n_splits]) for i in range(0, len(scores), workspace.n_splits)]
+
+    best_params, best_score, n_fits = None, -np.inf, 0
+    if strategy == "grid":
+        candidates = list(ParameterGrid(para))
+        for params, score in zip(candidates, mean_scores(candidates)):
+            if score > best_score:
+                best_params, best_score = params, score
+        n_fits = len(candidates) * workspace.n_splits
+    else:
+        started = time.perf_counter()
+        for params in ParameterSampler(para, n_iter=n_iter, random_state=42):
+            if best_params is not None and time_budget and time.perf_counter() - started > time_budget:
+                break
+            # ParameterSampler can hand back numpy scalars, which clone() rejects
+            params = {k: v.item() if isinstance(v, np.generic) else v for k, v in params.items()}
+            n_fits += workspace.n_splits
+            score = mean_scores([params])[0]
+            if score > best_score:
+                best_params, best_score = params, score
+
+    best_params = best_params or {}
+    X_full, y_full = workspace.load_full(dense)
+    best_model = clone(model).set_params(**best_params).fit(X_full, y_full)
+    return best_model, best_params, best_score, n_fits + 1
+
+
+# strategies _run_workspace_search implements; the others keep their own CV
+WORKSPACE_STRATEGIES = ("grid", "random")
+
+
+def _search_cache_path(cache_dir, model_name, model, para, strategy, n_iter, time_budget, data_key):
+    import joblib
+
+    key = joblib.hash((model_name, type(model).__name__, model.get_params(), para,
+                       strategy, n_iter, time_budget, data_key))
+    # prefixed by strategy, so pruning after one strategy's run leaves the others' entries alone
+    return os.path.join(cache_dir, f"{strategy}_{key}.pkl")
+
+
+def _prune_search_cache(cache_dir, strategy, keep):
+    """
+    Deletes the cached searches of `strategy` other than `keep` (the current
+    run's), so stale grids/data do not pile up. Entries of the other
+    strategies are kept, so switching TRAIN_SEARCH_STRATEGY back and forth
+    still reuses finished searches; unprefixed entries of older versions are
+    unreachable and deleted.
+    """
+    keep = {os.path.abspath(path) for path in keep}
+    prefixes = tuple(f"{name}_" for name in SEARCH_STRATEGIES)
+    for file_name in os.listdir(cache_dir):
+        path = os.path.abspath(os.path.join(cache_dir, file_name))
+        stale = file_name.startswith(f"{strategy}_") or not file_name.startswith(prefixes)
+        if file_name.endswith(".pkl") and stale and path not in keep:
+            try:
+                os.remove(path)
+            except OSError as e:
+                logging.warning(f"Could not remove stale search cache entry {path}: {e}")
+
+
+def _search_model(model_name, model, para, X_train, y_train, n_jobs, cache_dir,
+                  strategy="grid", n_iter=10, time_budget=None, workspace=None, dense=False, data_key=None):
+    """
+    Runs the hyperparameter search for one candidate model (in a worker
+    process) and returns its refit best estimator. Results are cached on disk
+    per (model, base params, grid, search settings, training data) so
+    unchanged searches are skipped. With a CVWorkspace, X_train/y_train are
+    not needed: the search reads the workspace's memory-mapped folds.
+    """
+    import time
+    import joblib
+
+    cache_path = None
+    if cache_dir:
+        data_key = data_key or joblib.hash((X_train, y_train))
+        cache_path = _search_cache_path(cache_dir, model_name, model, para, strategy, n_iter, time_budget, data_key)
+        if os.path.exists(cache_path):
+            cached = load_object(cache_path)
+            cached["from_cache"] = True
+            return cached
+
+    started = time.perf_counter()
+    if workspace is not None:
+        best_estimator, best_params, best_cv_score, n_fits = _run_workspace_search(
+            model, para, workspace, dense, n_jobs, strategy, n_iter, time_budget
+        )
+    else:
+        best_estimator, best_params, best_cv_score, n_fits = _run_search(
+            model, para, X_train, y_train, n_jobs, strategy, n_iter, time_budget
+        )
+
+    result = {
+        "best_estimator": best_estimator,
+        "best_params": best_params,
+        "best_cv_score": best_cv_score,
+        "n_fits": n_fits,
+        "search_seconds": time.perf_counter() - started,
+        "from_cache": False,
+    }
+    if cache_path:
+        save_object(cache_path, result)
+    return result
+
+
+def evaluate_models(X_train, y_train, X_test, y_test, models, param, n_jobs=None, cache_dir=None,
+                    strategy="grid", n_iter=10, time_budget=None, dense_only=(), return_stats=False,
+                    shared_cv=False):
+    workspace_dir = None
     try:
-        from sklearn.model_selection import GridSearchCV
+        import shutil
+        import joblib
         from sklearn.metrics import r2_score
 
-        report = {}
-        trained_models = {}
+        # one global core budget: split it between concurrent searches so the
+        # per-search n_jobs does not multiply into cores x cores processes
+        total_cores = n_jobs if n_jobs and n_jobs > 0 else (os.cpu_count() or 1)
+        outer_jobs = max(1, min(len(models), total_cores))
+        inner_jobs = max(1, total_cores // outer_jobs)
+
+        print(f"\nSearching {len(models)} models ({strategy}) on {outer_jobs} processes x {inner_jobs} cores...")
 
-        for model_name, model in models.items():
-            print(f"\nTraining {model_name}...")
+        # sparse (CSR) features go to every model that accepts them; the
+        # models listed in dense_only share one dense copy, made on demand
+        dense = {}
 
-            para = param.get(model_name, {})
-            gs = GridSearchCV(model, para, cv=3, n_jobs=-1)
-            gs.fit(X_train, y_train)
+        def inputs_for(model_name):
+            if model_name not in dense_only or not hasattr(X_train, "toarray"):
+                return X_train, X_test
+            if not dense:
+                dense["train"], dense["test"] = X_train.toarray(), X_test.toarray()
+            return dense["train"], dense["test"]
 
-            model.set_params(**gs.best_params_)
-            model.fit(X_train, y_train)
+        # the folds are split (and written for memory-mapping) once for all models
+        workspace = None
+        # the search cache key of the training data, hashed once for every model (and only with a cache)
+        data_key = joblib.hash((X_train, y_train)) if cache_dir else None
+        if shared_cv and strategy in WORKSPACE_STRATEGIES:
+            workspace_dir = tempfile.mkdtemp(prefix="cv_workspace_")
+            workspace = CVWorkspace(X_train, y_train, workspace_dir,
+                                    dense=any(model_name in dense_only for model_name in models))
 
-            y_test_pred = model.predict(X_test)
+        with joblib.parallel_config(backend="loky", inner_max_num_threads=inner_jobs):
+            results = joblib.Parallel(n_jobs=outer_jobs)(
+                joblib.delayed(_search_model)(
+                    model_name, model, param.get(model_name, {}),
+                    None if workspace else inputs_for(model_name)[0], None if workspace else y_train,
+                    inner_jobs, cache_dir, strategy, n_iter, time_budget,
+                    workspace=workspace, dense=model_name in dense_only, data_key=data_key,
+                )
+                for model_name, model in models.items()
+            )
+
+        report = {}
+        trained_models = {}
+        stats = {}
+
+        for model_name, result in zip(models, results):
+            model = result["best_estimator"]
+            y_test_pred = model.predict(inputs_for(model_name)[1])
             score = r2_score(y_test, y_test_pred)
 
-            print(f"✅ {model_name} | R²: {score:.4f}")
+            # a cached search took no time in this run; its stored time is from the run that did it
+            search_seconds = 0.0 if result["from_cache"] else result["search_seconds"]
+            cached = f" (cached, searched in {result['search_seconds']:.1f}s)" if result["from_cache"] else ""
+            print(f"✅ {model_name} | R²: {score:.4f} | fits: {result['n_fits']} | {search_seconds:.1f}s{cached}")
 
             report[model_name] = score
             trained_models[model_name] = model  # save trained model
+            stats[model_name] = {
+                "r2": score,
+                "best_params": result["best_params"],
+                "n_fits": result["n_fits"],
+                "search_seconds": search_seconds,
+                "from_cache": result["from_cache"],
+            }
+
+        # of this strategy, only the entries of this run's models/grids/data are still reachable
+        if cache_dir and os.path.isdir(cache_dir):
+            _prune_search_cache(cache_dir, strategy, [
+                _search_cache_path(cache_dir, model_name, model, param.get(model_name, {}),
+                                   strategy, n_iter, time_budget, data_key)
+                for model_name, model in models.items()
+            ])
 
+        if return_stats:
+            return report, trained_models, stats
         return report, trained_models
 
     except Exception as e:
         raise CustomException(e, sys)
+    finally:
+        if workspace_dir:
+            shutil.rmtree(workspace_dir, ignore_errors=True)
 
 
 
@@ -55,9 +539,18 @@ def load_object(file_path):
         if not os.path.exists(file_path):
             raise FileNotFoundError(f"File not found: {file_path}")
         
-        print(f"Attempting to load object from: {file_path}")
+        logging.debug(f"Attempting to load object from: {file_path}")
+        serializer = serializer_for(file_path)
+        if serializer == "joblib":
+            import joblib
+            return joblib.load(file_path, mmap_mode="r")
+        if serializer == "xgboost":
+            from xgboost import XGBRegressor
+            model = XGBRegressor()
+            model.load_model(file_path)
+            return model
         with open(file_path, 'rb') as file_obj:
             return dill.load(file_obj)
     except Exception as e:
-        print(f"Error loading object from {file_path}: {str(e)}")
+        logging.error(f"Error loading object from {file_path}: {str(e)}")
         raise CustomException(e, sys)